@@ -0,0 +1,49 @@
+import pandas as pd
+
+
+def company_totals(store):
+    """Returns {year: {company: total placed}} for every year, summing repeat visits by the same company."""
+    totals = {}
+    table = store.summaries.company_totals
+    for year, company, total in zip(table['Year'], table['Company'], table['Total']):
+        totals.setdefault(str(year), {})[company] = float(total)
+    return totals
+
+
+def department_highest_packages(store):
+    """Returns {department: {year: {'package', 'company', 'median', 'offers'}}} from the summary tables."""
+    packages = {}
+    table = store.summaries.department_packages.sort_values(['Department', 'Year'])
+    for row in table.itertuples(index=False):
+        packages.setdefault(row[0], {})[str(row[1])] = {
+            'package': float(row[2]),
+            'company': row[3] if isinstance(row[3], str) else None,
+            'median': None if pd.isna(row[4]) else float(row[4]),
+            'offers': float(row[5]),
+        }
+    return packages
+
+
+def placement_percentages(store):
+    """Returns {year: {'overall': percentage, 'departments': {department (lower case): percentage}}}."""
+    percentages = store.placement_percentages
+    return {
+        str(year): {'overall': percentages.overall(year), 'departments': percentages.for_year(year)}
+        for year in percentages.years()
+    }
+
+
+def build_aggregate_bundle(store):
+    """
+    Builds the compact, JSON-serializable bundle of every aggregate the dashboard views draw from.
+
+    Memoize it with store.derived('aggregate_bundle', build_aggregate_bundle) so it is built once per
+    data version.
+    """
+    return {
+        'version': store.version,
+        'years': store.years(),
+        'company_totals': company_totals(store),
+        'department_packages': department_highest_packages(store),
+        'placement_percentages': placement_percentages(store),
+    }
@@ -0,0 +1,194 @@
+import os
+import json
+import hashlib
+from flask import Blueprint, Response, request
+from placement_store import get_store, OVERALL
+from schema import resolve_department
+
+API_PREFIX = '/api/v1'
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# How long clients may reuse a response before revalidating it with its ETag
+API_MAX_AGE = int(os.environ.get('API_MAX_AGE', 60))
+
+
+class ApiError(Exception):
+    """A request the API rejects; rendered as a JSON {'error': message} response."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(value):
+    """A JSON-safe float (None for NaN)."""
+    return None if value != value else float(value)
+
+
+def _companies_per_year(summaries):
+    table = summaries.companies.sort_values('Year')
+    return [{'year': int(year), 'companies': int(count)} for year, count in zip(table['Year'], table['Companies'])]
+
+
+def _department_packages(summaries):
+    table = summaries.department_packages.sort_values(['Department', 'Year'])
+    return [
+        {'department': department, 'year': int(year), 'highest_package': float(highest),
+         'company': company if isinstance(company, str) else None, 'median_package': _number(median),
+         'offers': int(offers)}
+        for department, year, highest, company, median, offers in table.itertuples(index=False)
+    ]
+
+
+def _company_totals(summaries):
+    table = summaries.company_totals.sort_values(['Year', 'Company'])
+    return [
+        {'year': int(year), 'company_id': int(company_id), 'company': company, 'total': int(total)}
+        for year, company_id, company, total in table[['Year', 'Company ID', 'Company', 'Total']].itertuples(index=False)
+    ]
+
+
+def _placement_percentages(summaries):
+    table = summaries.placement_percentages.sort_values(['Year', 'Department', 'Level'])
+    return [
+        {'year': int(year), 'department': department, 'level': level, 'percentage': float(percentage)}
+        for year, department, level, percentage in table.itertuples(index=False)
+    ]
+
+
+def _department(value):
+    """A department filter value: its canonical name, or OVERALL for 'overall' in any case."""
+    if value.casefold() == OVERALL.casefold():
+        return OVERALL
+    return resolve_department(value) or value
+
+
+# Resource name -> (rows builder, fields, {filter parameter: value parser}); a filter matches the field of
+# the same name, and takes comma-separated values
+RESOURCES = {
+    'companies-per-year': (_companies_per_year, ['year', 'companies'], {'year': int}),
+    'department-packages': (_department_packages,
+                            ['department', 'year', 'highest_package', 'company', 'median_package', 'offers'],
+                            {'department': _department, 'year': int}),
+    'company-totals': (_company_totals, ['year', 'company_id', 'company', 'total'],
+                       {'year': int, 'company_id': int}),
+    'placement-percentages': (_placement_percentages, ['year', 'department', 'level', 'percentage'],
+                              {'year': int, 'department': _department, 'level': str.upper}),
+}
+
+
+def _query(resource):
+    """Validates a resource request's parameters and returns (filters, fields, offset, limit)."""
+    _, fields, parsers = RESOURCES[resource]
+    unknown = set(request.args) - set(parsers) - {'fields', 'offset', 'limit'}
+    if unknown:
+        raise ApiError(f"Unknown parameter(s) {sorted(unknown)}; '{resource}' accepts "
+                       f"{sorted(parsers) + ['fields', 'limit', 'offset']}.")
+
+    filters = {}
+    for name, parse in parsers.items():
+        if name in request.args:
+            try:
+                filters[name] = {parse(value.strip()) for value in request.args[name].split(',') if value.strip()}
+            except ValueError:
+                raise ApiError(f"Invalid value for '{name}': {request.args[name]!r}.")
+
+    selected = fields
+    if 'fields' in request.args:
+        selected = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        invalid = [field for field in selected if field not in fields]
+        if invalid or not selected:
+            raise ApiError(f"Invalid fields {invalid}; '{resource}' has {fields}.")
+
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError("'offset' and 'limit' must be integers.")
+    if offset < 0 or not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f"'offset' must be >= 0 and 'limit' between 1 and {MAX_LIMIT}.")
+    return filters, selected, offset, limit
+
+
+def _cacheable(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={API_MAX_AGE}'
+    return response
+
+
+def _json_response(body, etag):
+    return _cacheable(Response(json.dumps(body, separators=(',', ':')), mimetype='application/json'), etag)
+
+
+def _etag(version):
+    """Tag of a response: the data version plus the normalized query, so it changes exactly when the body can."""
+    query = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+    return hashlib.sha256(f'{version} {request.path}?{query}'.encode()).hexdigest()[:20]
+
+
+def create_api(data_folder):
+    """
+    Returns the read-only JSON API over the summary tables, as a Flask blueprint to register on app.server.
+
+        GET /api/v1/                        the resources, their fields and filters, and the data version
+        GET /api/v1/<resource>              rows of a resource: companies-per-year, department-packages,
+                                            company-totals (the yearly comparison rows) or placement-percentages
+
+    Resource requests take comma-separated filters named after fields (e.g. ?year=2023,2024&department=CST),
+    'fields' to select fields, and 'offset'/'limit' to page through the rows. Rows are built from the
+    in-memory summaries once per data version; every response carries the version's ETag, and a request
+    whose If-None-Match still matches gets a 304 without touching the data.
+    """
+    api = Blueprint('api', __name__, url_prefix=API_PREFIX)
+
+    @api.errorhandler(ApiError)
+    def api_error(error):
+        return Response(json.dumps({'error': str(error)}), status=error.status, mimetype='application/json')
+
+    def conditional(snapshot):
+        """Returns the request's ETag, and a 304 response if the client's copy is still current."""
+        etag = _etag(snapshot.version)
+        return etag, _cacheable(Response(status=304), etag) if request.if_none_match.contains_weak(etag) else None
+
+    @api.route('/')
+    def index():
+        snapshot = get_store(data_folder).snapshot()
+        etag, not_modified = conditional(snapshot)
+        if not_modified is not None:
+            return not_modified
+        return _json_response({
+            'version': snapshot.version,
+            'resources': {
+                name: {'path': f'{API_PREFIX}/{name}', 'fields': fields, 'filters': sorted(parsers)}
+                for name, (_, fields, parsers) in RESOURCES.items()
+            },
+        }, etag)
+
+    @api.route('/<resource>')
+    def rows(resource):
+        if resource not in RESOURCES:
+            raise ApiError(f"Unknown resource '{resource}'; see {API_PREFIX}/ for the list.", status=404)
+        filters, fields, offset, limit = _query(resource)
+
+        # Read the version and the rows from one snapshot so a concurrent reload can't mix them
+        snapshot = get_store(data_folder).snapshot()
+        etag, not_modified = conditional(snapshot)
+        if not_modified is not None:
+            return not_modified
+
+        build = RESOURCES[resource][0]
+        matching = snapshot.derived(f'api:{resource}', lambda snap: build(snap.summaries))
+        if filters:
+            matching = [row for row in matching if all(row[name] in values for name, values in filters.items())]
+        page = matching[offset:offset + limit]
+        return _json_response({
+            'version': snapshot.version,
+            'total': len(matching),
+            'offset': offset,
+            'limit': limit,
+            'next_offset': offset + limit if offset + limit < len(matching) else None,
+            'data': [{field: row[field] for field in fields} for row in page],
+        }, etag)
+
+    return api
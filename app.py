@@ -1,32 +1,126 @@
 import os
-from dash import Dash, html, dcc
-from dash.dependencies import Input, Output
-from data_processing import convert_xlsx_to_csv
+import logging
+import tempfile
+from flask import Response, send_from_directory
+from dash import Dash, DiskcacheManager, html, dcc
+from dash.dependencies import Input, Output, ClientsideFunction
+from data_processing import sync_xlsx_to_csv
 from functionalities.total_companies import create_total_companies_graph
-from functionalities.yearly_comparison import create_yearly_comparison_graph
+from functionalities.yearly_comparison import create_yearly_comparison_graph, create_multi_year_comparison_graph
 from functionalities.department_yearly_comparison import department_yearly_comparison
 from functionalities.placement_percentage import generate_placement_graphs
+from functionalities.offer_explorer import offer_explorer
+from functionalities.ctc_distribution import ctc_distribution_graph
+from functionalities.department_trends import department_trends
+from trend_matrix import METRICS as TREND_METRICS
+from placement_facts import load_explorer_values
+from metrics import callback_metrics, instrument, record_responses
+from placement_store import get_store
+from aggregates import build_aggregate_bundle
+from data_watcher import DataWatcher
+from api import create_api
+from profiling import profiler, create_profiling_api
+from http_cache import enable_compression, enable_conditional, code_fingerprint
+from views import (YEAR_OPTIONS, RECENT_YEAR_OPTIONS, TOP_K_OPTIONS, DEPARTMENT_OPTIONS, PLACEMENT_DEPARTMENT_OPTIONS,
+                   EXPLORER_GROUP_OPTIONS)
+
+try:
+    import diskcache
+except ImportError:  # Without it, the department trends callback runs in the request worker
+    diskcache = None
+
+# Diagnostic logging is off by default; set LOG_LEVEL=INFO or DEBUG to enable it
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+                    format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
 # Define paths
 data_folder = 'data/'
 
-# Convert all XLSX files to CSV
-convert_xlsx_to_csv(data_folder)
+# 'server' renders every view in a Python callback; 'client' ships the aggregates to the browser once
+# (in a dcc.Store) and redraws the views with clientside callbacks; 'static' fetches views pre-rendered
+# by prerender.py (the multi-year comparison, which has too many combinations, is drawn as in 'client')
+DASHBOARD_MODE = os.environ.get('DASHBOARD_MODE', 'server')
+
+# Where static mode finds the pre-rendered views: the folder prerender.py writes, and the URL it is served
+# from, either by this app (a path) or by a CDN the folder is uploaded to
+STATIC_VIEWS_DIR = os.environ.get('STATIC_VIEWS_DIR', 'static_views')
+STATIC_VIEWS_URL = os.environ.get('STATIC_VIEWS_URL', '/static-views/')
+
+# The code the dashboard's responses are built by, whose fingerprint is part of the layout's ETag
+CODE_PATHS = ['app.py', 'views.py', 'figures.py', 'aggregates.py', 'api.py', 'placement_store.py', 'placement_facts.py',
+              'summaries.py', 'schema.py', 'companies.py', 'trend_matrix.py', 'ctc_distributions.py', 'functionalities',
+              'assets']
+
+# Where background callbacks queue their jobs and keep their results; shared by the workers of one host
+BACKGROUND_CACHE_DIR = os.environ.get('BACKGROUND_CACHE_DIR',
+                                      os.path.join(tempfile.gettempdir(), 'placement-background-jobs'))
+
+# Convert new or changed XLSX files to CSV and build the summary tables of the new data
+sync_xlsx_to_csv(data_folder)
+
+def start_data_watcher():
+    """Polls the data folder and hot-reloads new or updated records (DATA_WATCH_INTERVAL=0 disables this)."""
+    data_watch_interval = float(os.environ.get('DATA_WATCH_INTERVAL', 30))
+    if data_watch_interval > 0:
+        DataWatcher(data_folder, data_watch_interval).start()
+
+# Under gunicorn's preload_app this module is imported in the master, which must not run threads
+# before forking; gunicorn.conf.py starts the watcher in each worker instead
+if os.environ.get('GUNICORN_PRELOAD') != '1':
+    start_data_watcher()
+
+# Load the shared store (its summary tables) now, so preloaded workers inherit it
+get_store(data_folder)
+
+# Background callbacks run in separate processes; their results are kept per data version, so a view
+# computed once is served from the cache until the data changes
+background_callback_manager = None
+if diskcache is not None:
+    background_callback_manager = DiskcacheManager(diskcache.Cache(BACKGROUND_CACHE_DIR),
+                                                   cache_by=[lambda: get_store(data_folder).version])
 
 # Initialize the Dash app
-app = Dash(__name__)
+app = Dash(__name__, background_callback_manager=background_callback_manager)
 server = app.server
 app.title = "Campus Placement Dashboard"
 
 # Suppress callback exceptions
 app.config.suppress_callback_exceptions = True
 
-# List of departments
-departments = [
-    'CST', 'ETC', 'EE', 'IT', 'ME', 'CE', 'MET', 'MIN', 'ARC', 'AERO',
-    'VLSI', 'Mat Science', 'Mechatronics', 'Food Proc.', 'REST', 'Bio-Medical',
-    'Safety', 'Physics', 'Maths', 'Chem', 'MBA', 'Earth Science'
-]
+# Callback latency, payload size, cache and error metrics in Prometheus text format
+@server.route('/metrics')
+def metrics():
+    return Response(callback_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Read-only JSON API over the summary tables, for scripts and other consumers
+server.register_blueprint(create_api(data_folder))
+
+# On-demand profiling of named callbacks, only when PROFILING_TOKEN is set
+if profiler is not None:
+    server.register_blueprint(create_profiling_api())
+
+# Compress responses, and let browsers revalidate the layout (which embeds the data) by data version.
+# Register compression first: after_request hooks run in reverse, so it sees the layout's ETag.
+enable_compression(server)
+code_version = code_fingerprint(os.path.dirname(os.path.abspath(__file__)), CODE_PATHS)
+enable_conditional(server, {app.config.routes_pathname_prefix + '_dash-layout'},
+                   lambda: f'{get_store(data_folder).version} {DASHBOARD_MODE} {code_version}')
+
+# Callback response sizes, measured before compression (this hook runs ahead of the ones above)
+record_responses(server)
+
+# Pre-rendered views never change (each data version has its own folder), so browsers and proxies may keep them
+if DASHBOARD_MODE == 'static' and STATIC_VIEWS_URL.startswith('/'):
+    @server.route(STATIC_VIEWS_URL.rstrip('/') + '/<path:path>')
+    def static_view(path):
+        response = send_from_directory(os.path.abspath(STATIC_VIEWS_DIR), path)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+
+if DASHBOARD_MODE == 'static' and not os.path.exists(
+        os.path.join(STATIC_VIEWS_DIR, get_store(data_folder).version, 'manifest.json')):
+    logging.getLogger(__name__).warning("No pre-rendered views for data version %s in %s; run python -m prerender",
+                                        get_store(data_folder).version, STATIC_VIEWS_DIR)
 
 # Uniform styling for sections
 section_style = {
@@ -38,110 +132,326 @@ section_style = {
     'margin': '20px'
 }
 
+def output_area(output_id, graph_ids, drawn_in_browser=DASHBOARD_MODE == 'client'):
+    """Returns a section's output container; for views drawn in the browser it holds the graphs the clientside callbacks draw."""
+    if drawn_in_browser:
+        return html.Div([dcc.Graph(id=graph_id) for graph_id in graph_ids], id=output_id)
+    return html.Div(id=output_id)
+
 # Layout of the app
-app.layout = html.Div([
-    # Header
-    html.H1("Campus Placement Dashboard", style={'textAlign': 'center', 'color': '#4A90E2'}),
-
-    # Total companies graph
-    create_total_companies_graph(data_folder),
-
-    # Yearly comparison section
-    html.Div([
-        html.H2("Yearly Comparison", style={'color': '#333333'}),
-        html.Label("Select Year 1:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
-        dcc.Dropdown(id='year1-dropdown',
-                     options=[{'label': str(year), 'value': str(year)} for year in range(2015, 2025)],
-                     value='2023'),
-        html.Label("Select Year 2:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
-        dcc.Dropdown(id='year2-dropdown',
-                     options=[{'label': str(year), 'value': str(year)} for year in range(2015, 2025)],
-                     value='2024'),
-        html.Div(id='yearly-comparison-output')
-    ], style=section_style),
-
-    # Department-wise comparison section
-    html.Div([
-        html.H2("Department Yearly Comparison", style={'color': '#333333'}),
-        html.Label("Select Department:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
-        dcc.Dropdown(id='department-dropdown',
-                     options=[{'label': dept, 'value': dept} for dept in departments],
-                     value='CST'),
-        html.Label("Select Years:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
-        dcc.Dropdown(id='department-years-dropdown',
-                     options=[{'label': str(year), 'value': str(year)} for year in range(2020, 2025)],
-                     value=['2023', '2024'],
-                     multi=True),
-        html.Div(id='department-comparison-output')
-    ], style=section_style),
-
-    # Placement percentage section
-    html.Div([
-        html.H2("Placement Percentage Analysis", style={'color': '#333333'}),
-        html.Label("Select Placement Year:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
-        dcc.Dropdown(
-            id='placement-year-dropdown',
-            options=[{'label': str(year), 'value': str(year)} for year in range(2020, 2025)],
-            value='2023'
-        ),
-        html.Label("Select Department (Optional):", style={'fontWeight': 'bold', 'fontSize': '14px'}),
-        dcc.Dropdown(
-            id='placement-department-dropdown',
-            options=[{'label': dept, 'value': dept} for dept in departments] + [{'label': 'Overall', 'value': ''}],
-            value=''
-        ),
-        html.Button(
-            id='placement-plot-button',
-            n_clicks=0,
-            children='Plot Graph',
-            style={
-                'backgroundColor': '#4CAF50',
-                'color': 'white',
-                'padding': '10px 20px',
-                'border': 'none',
-                'cursor': 'pointer',
-                'borderRadius': '10px',  # Rounded edges
-                'marginTop': '20px'  # Padding above the button
-            }
-        ),
-        html.Div(id='placement-percentage-output')
-    ], style=section_style),
-
-
-])
+def serve_layout():
+    """
+    Builds the page layout on each visit; the total companies graph is cached per data version, and the
+    offer explorer's dropdown values are read from the summaries rather than from the fact table.
+    """
+    explorer_values = load_explorer_values(data_folder)
+    return html.Div([
+        # Header
+        html.H1("Campus Placement Dashboard", style={'textAlign': 'center', 'color': '#4A90E2'}),
+
+        # Total companies graph
+        create_total_companies_graph(data_folder),
+
+        # Yearly comparison section
+        html.Div([
+            html.H2("Yearly Comparison", style={'color': '#333333'}),
+            html.Label("Select Year 1:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='year1-dropdown',
+                         options=YEAR_OPTIONS,
+                         value='2023'),
+            html.Label("Select Year 2:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='year2-dropdown',
+                         options=YEAR_OPTIONS,
+                         value='2024'),
+            output_area('yearly-comparison-output', ['yearly-comparison-graph'])
+        ], style=section_style),
+
+        # Multi-year comparison section
+        html.Div([
+            html.H2("Multi-Year Comparison", style={'color': '#333333'}),
+            html.Label("Select Years:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='multi-years-dropdown',
+                         options=YEAR_OPTIONS,
+                         value=['2022', '2023', '2024'],
+                         multi=True),
+            html.Label("Show Companies:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='multi-top-k-dropdown',
+                         options=[{'label': f'Top {k}' if k else 'All', 'value': k} for k in TOP_K_OPTIONS],
+                         value=25,
+                         clearable=False),
+            output_area('multi-year-comparison-output', ['multi-year-comparison-graph'],
+                        drawn_in_browser=DASHBOARD_MODE in ('client', 'static'))
+        ], style=section_style),
+
+        # Department-wise comparison section
+        html.Div([
+            html.H2("Department Yearly Comparison", style={'color': '#333333'}),
+            html.Label("Select Department:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='department-dropdown',
+                         options=DEPARTMENT_OPTIONS,
+                         value='CST'),
+            html.Label("Select Years:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='department-years-dropdown',
+                         options=RECENT_YEAR_OPTIONS,
+                         value=['2023', '2024'],
+                         multi=True),
+            output_area('department-comparison-output', ['department-comparison-graph'])
+        ], style=section_style),
+
+        # Placement percentage section
+        html.Div([
+            html.H2("Placement Percentage Analysis", style={'color': '#333333'}),
+            html.Label("Select Placement Year:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(
+                id='placement-year-dropdown',
+                options=RECENT_YEAR_OPTIONS,
+                value='2023'
+            ),
+            html.Label("Select Department (Optional):", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(
+                id='placement-department-dropdown',
+                options=[{'label': dept or 'Overall', 'value': dept} for dept in PLACEMENT_DEPARTMENT_OPTIONS],
+                value=''
+            ),
+            html.Button(
+                id='placement-plot-button',
+                n_clicks=0,
+                children='Plot Graph',
+                style={
+                    'backgroundColor': '#4CAF50',
+                    'color': 'white',
+                    'padding': '10px 20px',
+                    'border': 'none',
+                    'cursor': 'pointer',
+                    'borderRadius': '10px',  # Rounded edges
+                    'marginTop': '20px'  # Padding above the button
+                }
+            ),
+            output_area('placement-percentage-output',
+                        ['placement-overall-graph', 'placement-department-graph'])
+        ], style=section_style),
+
+        # CTC distribution section
+        html.Div([
+            html.H2("CTC Distribution", style={'color': '#333333'}),
+            html.Label("Select Department:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='ctc-department-dropdown', options=DEPARTMENT_OPTIONS, value='CST'),
+            html.Label("Select Years:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='ctc-years-dropdown', options=YEAR_OPTIONS, value=RECENT_YEAR_OPTIONS, multi=True),
+            html.Div(id='ctc-distribution-output')
+        ], style=section_style),
+
+        # Department trends section: every department across every year, computed in the background
+        html.Div([
+            html.H2("Department Trends", style={'color': '#333333'}),
+            html.Label("Select Metric:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='trend-metric-dropdown', options=list(TREND_METRICS), value='Highest CTC (LPA)',
+                         clearable=False),
+            html.Progress(id='trend-progress', value='0', max='1', style={'display': 'none', 'width': '100%'}),
+            html.Div(id='department-trends-output')
+        ], style=section_style),
+
+        # Offer explorer section: ad hoc filters over every year's offers
+        html.Div([
+            html.H2("Offer Explorer", style={'color': '#333333'}),
+            html.Label("Years:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='explorer-years-dropdown', options=YEAR_OPTIONS, value=[], multi=True,
+                         placeholder='All years'),
+            html.Label("Departments:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='explorer-departments-dropdown', options=DEPARTMENT_OPTIONS, value=[], multi=True,
+                         placeholder='All departments'),
+            html.Label("Offer Types:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='explorer-offer-types-dropdown', options=explorer_values['offer_type'],
+                         value=[], multi=True, placeholder='All offer types'),
+            html.Label("CTC Bands:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='explorer-ctc-dropdown', options=explorer_values['ctc_bucket'],
+                         value=[], multi=True, placeholder='All CTC bands'),
+            html.Label("CTC Range (LPA):", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            html.Div([
+                dcc.Input(id='explorer-min-ctc-input', type='number', min=0, placeholder='Min', debounce=True),
+                dcc.Input(id='explorer-max-ctc-input', type='number', min=0, placeholder='Max', debounce=True),
+            ]),
+            html.Label("Date of Visit (where recorded):", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.DatePickerRange(id='explorer-visit-dates', display_format='YYYY-MM-DD', clearable=True,
+                                start_date_placeholder_text='From', end_date_placeholder_text='To'),
+            html.Label("Status:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='explorer-status-dropdown', options=explorer_values['status'],
+                         value=[], multi=True, placeholder='Any status'),
+            html.Label("Group By:", style={'fontWeight': 'bold', 'fontSize': '14px'}),
+            dcc.Dropdown(id='explorer-group-dropdown', options=EXPLORER_GROUP_OPTIONS, value='Year',
+                         clearable=False),
+            html.Div(id='offer-explorer-output')
+        ], style=section_style),
+
+        # Aggregates for the clientside callbacks, built once per data version
+        *([dcc.Store(id='aggregate-bundle',
+                     data=get_store(data_folder).derived('aggregate_bundle', build_aggregate_bundle))]
+          if DASHBOARD_MODE in ('client', 'static') else []),
+
+        # Base URL of the current data version's pre-rendered views
+        *([dcc.Store(id='static-views', data=f"{STATIC_VIEWS_URL.rstrip('/')}/{get_store(data_folder).version}/")]
+          if DASHBOARD_MODE == 'static' else []),
+    ])
+
+
+# Dash calls the layout function per page load, so nothing is rendered at import time
+app.layout = serve_layout
 
 # Callbacks
 
-# Yearly comparison callback
-@app.callback(
-    Output('yearly-comparison-output', 'children'),
-    [Input('year1-dropdown', 'value'), Input('year2-dropdown', 'value')]
-)
-def update_yearly_comparison(year1, year2):
-    return create_yearly_comparison_graph(data_folder, year1, year2)
+if DASHBOARD_MODE in ('client', 'static'):
+    app.clientside_callback(
+        ClientsideFunction(namespace='placements', function_name='multiYearComparison'),
+        Output('multi-year-comparison-graph', 'figure'),
+        [Input('multi-years-dropdown', 'value'), Input('multi-top-k-dropdown', 'value'),
+         Input('aggregate-bundle', 'data')]
+    )
+
+if DASHBOARD_MODE == 'static':
+    app.clientside_callback(
+        ClientsideFunction(namespace='staticViews', function_name='yearlyComparison'),
+        Output('yearly-comparison-output', 'children'),
+        [Input('year1-dropdown', 'value'), Input('year2-dropdown', 'value'), Input('static-views', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='staticViews', function_name='departmentComparison'),
+        Output('department-comparison-output', 'children'),
+        [Input('department-dropdown', 'value'), Input('department-years-dropdown', 'value'),
+         Input('static-views', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='staticViews', function_name='placementPercentage'),
+        Output('placement-percentage-output', 'children'),
+        [
+            Input('placement-plot-button', 'n_clicks'),
+            Input('placement-year-dropdown', 'value'),
+            Input('placement-department-dropdown', 'value'),
+            Input('static-views', 'data')
+        ]
+    )
+elif DASHBOARD_MODE == 'client':
+    app.clientside_callback(
+        ClientsideFunction(namespace='placements', function_name='yearlyComparison'),
+        Output('yearly-comparison-graph', 'figure'),
+        [Input('year1-dropdown', 'value'), Input('year2-dropdown', 'value'), Input('aggregate-bundle', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='placements', function_name='departmentComparison'),
+        Output('department-comparison-graph', 'figure'),
+        [Input('department-dropdown', 'value'), Input('department-years-dropdown', 'value'),
+         Input('aggregate-bundle', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='placements', function_name='placementPercentage'),
+        [Output('placement-overall-graph', 'figure'), Output('placement-department-graph', 'figure')],
+        [
+            Input('placement-plot-button', 'n_clicks'),
+            Input('placement-year-dropdown', 'value'),
+            Input('placement-department-dropdown', 'value'),
+            Input('aggregate-bundle', 'data')
+        ]
+    )
+else:
+    # Yearly comparison callback
+    @app.callback(
+        Output('yearly-comparison-output', 'children'),
+        [Input('year1-dropdown', 'value'), Input('year2-dropdown', 'value')]
+    )
+    @instrument
+    def update_yearly_comparison(year1, year2):
+        return create_yearly_comparison_graph(data_folder, year1, year2)
+
+    # Multi-year comparison callback
+    @app.callback(
+        Output('multi-year-comparison-output', 'children'),
+        [Input('multi-years-dropdown', 'value'), Input('multi-top-k-dropdown', 'value')]
+    )
+    @instrument
+    def update_multi_year_comparison(years, top_k):
+        return create_multi_year_comparison_graph(data_folder, years, top_k)
+
+    # Department comparison callback
+    @app.callback(
+        Output('department-comparison-output', 'children'),
+        [Input('department-dropdown', 'value'), Input('department-years-dropdown', 'value')]
+    )
+    @instrument
+    def update_department_comparison(department, years):
+        return department_yearly_comparison(data_folder, department, years)
+
+    # Placement percentage callback
+    @app.callback(
+        Output('placement-percentage-output', 'children'),
+        [
+            Input('placement-plot-button', 'n_clicks'),
+            Input('placement-year-dropdown', 'value'),
+            Input('placement-department-dropdown', 'value')
+        ]
+    )
+    @instrument
+    def update_placement_percentage(n_clicks, year, department):
+        if n_clicks > 0:  # Ensure the graph is plotted only after the button is clicked
+            file_path = "data/Placement-Record-Overall.csv"
+            return generate_placement_graphs(file_path, year, department)
+        return html.Div("Click the button to generate the graph.", style={'color': 'blue'})
 
-# Department comparison callback
+# The CTC distribution and offer explorer sections are drawn from the offer fact table, in every mode
+
+# CTC distribution callback
 @app.callback(
-    Output('department-comparison-output', 'children'),
-    [Input('department-dropdown', 'value'), Input('department-years-dropdown', 'value')]
+    Output('ctc-distribution-output', 'children'),
+    [Input('ctc-department-dropdown', 'value'), Input('ctc-years-dropdown', 'value')]
 )
-def update_department_comparison(department, years):
-    return department_yearly_comparison(data_folder, department, years)
+@instrument
+def update_ctc_distribution(department, years):
+    return ctc_distribution_graph(data_folder, department, years)
+
 
-# Placement percentage callback
+# Offer explorer callback
 @app.callback(
-    Output('placement-percentage-output', 'children'),
+    Output('offer-explorer-output', 'children'),
     [
-        Input('placement-plot-button', 'n_clicks'),
-        Input('placement-year-dropdown', 'value'),
-        Input('placement-department-dropdown', 'value')
+        Input('explorer-group-dropdown', 'value'),
+        Input('explorer-years-dropdown', 'value'),
+        Input('explorer-departments-dropdown', 'value'),
+        Input('explorer-offer-types-dropdown', 'value'),
+        Input('explorer-ctc-dropdown', 'value'),
+        Input('explorer-status-dropdown', 'value'),
+        Input('explorer-min-ctc-input', 'value'),
+        Input('explorer-max-ctc-input', 'value'),
+        Input('explorer-visit-dates', 'start_date'),
+        Input('explorer-visit-dates', 'end_date')
     ]
 )
-def update_placement_percentage(n_clicks, year, department):
-    if n_clicks > 0:  # Ensure the graph is plotted only after the button is clicked
-        file_path = "data/Placement-Record-Overall.csv"
-        return generate_placement_graphs(file_path, year, department)
-    return html.Div("Click the button to generate the graph.", style={'color': 'blue'})
+@instrument
+def update_offer_explorer(group_by, years, departments, offer_types, ctc_buckets, statuses, min_ctc, max_ctc,
+                          visited_from, visited_to):
+    return offer_explorer(data_folder, group_by, years, departments, offer_types, ctc_buckets, statuses,
+                          min_ctc, max_ctc, visited_from, visited_to)
+
+
+# Department trends callback: a background job when diskcache is installed, reporting its progress per department
+if background_callback_manager is not None:
+    @app.callback(
+        Output('department-trends-output', 'children'),
+        Input('trend-metric-dropdown', 'value'),
+        background=True,
+        progress=[Output('trend-progress', 'value'), Output('trend-progress', 'max')],
+        running=[(Output('trend-progress', 'style'), {'display': 'block', 'width': '100%'},
+                  {'display': 'none', 'width': '100%'})]
+    )
+    # Not instrumented: the job runs in a diskcache worker process, whose metrics /metrics doesn't serve
+    def update_department_trends(set_progress, metric):
+        return department_trends(data_folder, metric, DEPARTMENT_OPTIONS, YEAR_OPTIONS,
+                                 lambda done, total: set_progress((str(done), str(total))))
+else:
+    @app.callback(
+        Output('department-trends-output', 'children'),
+        Input('trend-metric-dropdown', 'value')
+    )
+    @instrument
+    def update_department_trends(metric):
+        return department_trends(data_folder, metric, DEPARTMENT_OPTIONS, YEAR_OPTIONS)
 
 
 # Run the app
@@ -0,0 +1,166 @@
+// Clientside callbacks for DASHBOARD_MODE=client: every view is redrawn in the browser from the
+// aggregate bundle held in the 'aggregate-bundle' dcc.Store, without a server round trip.
+(function () {
+    function messageFigure(text) {
+        return {
+            data: [],
+            layout: {
+                xaxis: {visible: false},
+                yaxis: {visible: false},
+                annotations: [{text: text, showarrow: false, font: {size: 16, color: 'red'}}]
+            }
+        };
+    }
+
+    function pieFigure(label, percentage, title, colors) {
+        return {
+            data: [{
+                type: 'pie',
+                labels: [label, 'Not Placed'],
+                values: [percentage, 100 - percentage],
+                textinfo: 'percent+label',
+                textfont: {size: 15},
+                pull: [0.1, 0],
+                marker: {colors: colors, line: {color: '#000000', width: 1.5}}
+            }],
+            layout: {
+                title: {text: title, x: 0.5, y: 0.9, font: {size: 22, family: 'Arial Black', color: 'black'}}
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        placements: {
+            yearlyComparison: function (year1, year2, bundle) {
+                if (!bundle) {
+                    return window.dash_clientside.no_update;
+                }
+                var years = [String(year1), String(year2)].sort();
+                var totals = years.map(function (year) { return bundle.company_totals[year]; });
+                if (!totals[0] || !totals[1]) {
+                    return messageFigure('No placement record for the selected years.');
+                }
+                var companies = Object.keys(Object.assign({}, totals[0], totals[1])).sort();
+                return {
+                    data: years.map(function (year, i) {
+                        return {
+                            type: 'scatter',
+                            mode: 'lines',
+                            name: 'Total ' + year,
+                            x: companies,
+                            y: companies.map(function (company) { return totals[i][company] || 0; })
+                        };
+                    }),
+                    layout: {
+                        title: {text: 'Yearly Comparison: ' + years[0] + ' vs ' + years[1], x: 0.5,
+                                font: {size: 20, color: '#4A90E2'}},
+                        plot_bgcolor: '#f9f9f9',
+                        paper_bgcolor: '#ffffff',
+                        xaxis: {title: {text: 'Company Visited'}},
+                        yaxis: {title: {text: 'Total Students Placed'}},
+                        legend: {title: {text: 'Year'}}
+                    }
+                };
+            },
+
+            multiYearComparison: function (years, topK, bundle) {
+                if (!bundle) {
+                    return window.dash_clientside.no_update;
+                }
+                var selected = Array.from(new Set((years || []).map(String))).sort();
+                if (!selected.length) {
+                    return messageFigure('Select at least one year to compare.');
+                }
+                var totals = selected.map(function (year) { return bundle.company_totals[year]; });
+                if (totals.some(function (yearTotals) { return !yearTotals; })) {
+                    return messageFigure('No placement record for the selected years.');
+                }
+                var overall = {};
+                totals.forEach(function (yearTotals) {
+                    Object.keys(yearTotals).forEach(function (company) {
+                        overall[company] = (overall[company] || 0) + yearTotals[company];
+                    });
+                });
+                var companies = Object.keys(overall).sort();
+                if (topK) {
+                    // Array.prototype.sort is stable, so ties keep alphabetical order
+                    companies = companies.sort(function (a, b) { return overall[b] - overall[a]; }).slice(0, topK);
+                }
+                var title = 'Multi-Year Comparison: ' + selected.join(', ') + (topK ? ' (top ' + topK + ' companies)' : '');
+                return {
+                    data: selected.map(function (year, i) {
+                        return {
+                            type: companies.length > 200 ? 'scattergl' : 'scatter',
+                            mode: 'lines',
+                            name: 'Total ' + year,
+                            x: companies,
+                            y: companies.map(function (company) { return totals[i][company] || 0; })
+                        };
+                    }),
+                    layout: {
+                        title: {text: title, x: 0.5, font: {size: 20, color: '#4A90E2'}},
+                        plot_bgcolor: '#f9f9f9',
+                        paper_bgcolor: '#ffffff',
+                        xaxis: {title: {text: 'Company Visited'}},
+                        yaxis: {title: {text: 'Total Students Placed'}},
+                        legend: {title: {text: 'Year'}}
+                    }
+                };
+            },
+
+            departmentComparison: function (department, years, bundle) {
+                if (!bundle) {
+                    return window.dash_clientside.no_update;
+                }
+                var packages = bundle.department_packages[department] || {};
+                var selected = (years || []).map(String).sort().filter(function (year) { return packages[year]; });
+                if (!selected.length) {
+                    return messageFigure('No data available for the selected department and years.');
+                }
+                return {
+                    data: selected.map(function (year) {
+                        var company = packages[year].company || 'Unknown';
+                        return {
+                            type: 'bar',
+                            name: company,
+                            x: [year],
+                            y: [packages[year].package],
+                            text: [company],
+                            textposition: 'outside'
+                        };
+                    }),
+                    layout: {
+                        title: {text: department + ' Department Placement Comparison'},
+                        xaxis: {title: {text: 'Year'}, type: 'category'},
+                        yaxis: {title: {text: 'Highest Placement Package (LPA)'}},
+                        legend: {title: {text: 'Company'}}
+                    }
+                };
+            },
+
+            placementPercentage: function (n_clicks, year, department, bundle) {
+                if (!bundle || !n_clicks) {
+                    var prompt = messageFigure('Click the button to generate the graph.');
+                    return [prompt, prompt];
+                }
+                var entry = bundle.placement_percentages[String(year)];
+                if (!entry || entry.overall === null) {
+                    var missing = messageFigure('No data found for year ' + year + '.');
+                    return [missing, missing];
+                }
+                var overall = pieFigure('Placed', entry.overall, 'Overall Placement Percentage (' + year + ')',
+                                        ['#63cdda', '#f3a683']);
+                if (!department) {
+                    return [overall, messageFigure('Select a department to see its placement percentage.')];
+                }
+                var percentage = entry.departments[department.trim().toLowerCase()];
+                if (percentage === undefined) {
+                    return [overall, messageFigure('Department ' + department + ' not found in data.')];
+                }
+                return [overall, pieFigure(department, percentage,
+                                           'Placement Percentage for ' + department + ' (' + year + ')',
+                                           ['#f8a5c2', '#3dc1d3'])];
+            }
+        }
+    });
+})();
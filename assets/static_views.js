@@ -0,0 +1,55 @@
+// Clientside callbacks for DASHBOARD_MODE=static: each view is fetched as a pre-rendered component tree
+// (written by prerender.py) from the base URL in the 'static-views' dcc.Store, without calling Python.
+// The paths mirror views.py.
+(function () {
+    function message(text, color) {
+        return {type: 'Div', namespace: 'dash_html_components',
+                props: {children: text, style: {color: color || 'red'}}};
+    }
+
+    function slug(value) {
+        return value.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-+|-+$/g, '') || 'overall';
+    }
+
+    function fetchView(base, path) {
+        return fetch(base + path).then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            return response.json();
+        }).catch(function () {
+            return message('This view has not been pre-rendered for the current data.');
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        staticViews: {
+            yearlyComparison: function (year1, year2, base) {
+                if (!base || !year1 || !year2) {
+                    return window.dash_clientside.no_update;
+                }
+                return fetchView(base, 'yearly/' + [String(year1), String(year2)].sort().join('-') + '.json');
+            },
+
+            departmentComparison: function (department, years, base) {
+                if (!base || !department) {
+                    return window.dash_clientside.no_update;
+                }
+                var unique = (years || []).map(String).filter(function (year, i, all) {
+                    return all.indexOf(year) === i;
+                }).sort();
+                return fetchView(base, 'department/' + slug(department) + '/' + (unique.join('-') || 'none') + '.json');
+            },
+
+            placementPercentage: function (n_clicks, year, department, base) {
+                if (!n_clicks) {
+                    return message('Click the button to generate the graph.', 'blue');
+                }
+                if (!base || !year) {
+                    return window.dash_clientside.no_update;
+                }
+                return fetchView(base, 'placement/' + year + '/' + slug(department || '') + '.json');
+            }
+        }
+    });
+})();
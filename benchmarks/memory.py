@@ -0,0 +1,146 @@
+"""
+Compares the memory cost of N dashboard workers under two loading strategies (Linux only):
+
+    per-worker    every worker parses the CSVs into private pandas frames (the default)
+    preload-fork  one master loads the data and forks the workers (gunicorn preload_app + gc.freeze)
+
+Usage:
+    python -m benchmarks.memory [--workers 4] [--scale 30x1000x22]
+
+Each worker loads the store and renders every view once, so the data it would touch while serving
+is resident. PSS (proportional set size) splits shared pages between the processes mapping them, so
+the PSS total is the real memory bill; RSS counts shared pages in full for every process.
+"""
+import os
+import gc
+import sys
+import shutil
+import signal
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.synthetic_archive import generate_archive
+
+
+def _memory_kb(pid):
+    """Returns (rss, pss) in kB for a process, from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0]] = int(parts[1])
+    return values['Rss:'], values['Pss:']
+
+
+def _exercise(folder):
+    """Loads the store and renders every view once, as a worker would while serving."""
+    from placement_store import get_store
+    from aggregates import build_aggregate_bundle
+    from functionalities.yearly_comparison import create_yearly_comparison_graph
+    from functionalities.department_yearly_comparison import department_yearly_comparison
+    from functionalities.placement_percentage import generate_placement_graphs
+
+    store = get_store(folder)
+    years = store.years()
+    create_yearly_comparison_graph.uncached(folder, years[0], years[-1])
+    department_yearly_comparison.uncached(folder, 'CST', years)
+    generate_placement_graphs(os.path.join(folder, 'Placement-Record-Overall.csv'), years[-1], 'CST')
+    store.derived('aggregate_bundle', build_aggregate_bundle)
+
+
+def _serve_forever():
+    print('ready', flush=True)
+    signal.pause()
+
+
+def worker_main(folder):
+    _exercise(folder)
+    _serve_forever()
+
+
+def preload_main(folder, workers):
+    """Loads everything in this (master) process, then forks the workers."""
+    _exercise(folder)
+    gc.freeze()
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            _exercise(folder)
+            _serve_forever()
+    signal.pause()
+
+
+def _spawn(args, env=None):
+    return subprocess.Popen([sys.executable, '-m', 'benchmarks.memory', *args], stdout=subprocess.PIPE,
+                            text=True, env=env)
+
+
+def measure(mode, folder, workers):
+    """Starts the workers for a mode and returns [(role, rss_kb, pss_kb)] once they are all loaded."""
+    processes = []
+    try:
+        if mode == 'preload-fork':
+            master = _spawn(['--preload', folder, '--workers', str(workers)])
+            processes.append(master)
+            ready = 0
+            while ready < workers:
+                if master.stdout.readline().strip() == 'ready':
+                    ready += 1
+            children = subprocess.check_output(['ps', '--ppid', str(master.pid), '-o', 'pid=']).split()
+            pids = [('master', master.pid)] + [('worker', int(pid)) for pid in children]
+        else:
+            for _ in range(workers):
+                processes.append(_spawn(['--worker', folder]))
+            for process in processes:
+                process.stdout.readline()
+            pids = [('worker', process.pid) for process in processes]
+        return [(role, *_memory_kb(pid)) for role, pid in pids]
+    finally:
+        for process in processes:
+            os.killpg(process.pid, signal.SIGTERM) if mode == 'preload-fork' else process.terminate()
+            process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--scale', default='30x1000x22', help='YEARSxCOMPANIESxDEPARTMENTS of the synthetic archive')
+    parser.add_argument('--worker', metavar='FOLDER', help=argparse.SUPPRESS)
+    parser.add_argument('--preload', metavar='FOLDER', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return worker_main(args.worker)
+    if args.preload:
+        os.setpgid(0, 0)
+        return preload_main(args.preload, args.workers)
+
+    if not sys.platform.startswith('linux'):
+        parser.error('memory measurement needs /proc (Linux)')
+
+    years, companies, departments = (int(part) for part in args.scale.lower().split('x'))
+    folder = tempfile.mkdtemp(prefix='placement-mem-')
+    try:
+        generate_archive(folder, years=years, companies=companies, departments=departments, xlsx=False)
+        # Build the summary tables up front, as the ingest step would
+        subprocess.run([sys.executable, '-c', 'import sys; from placement_store import build_summaries; '
+                        'build_summaries(sys.argv[1])', folder], check=True)
+
+        print(f"{args.workers} workers, archive {args.scale}")
+        print(f"{'mode':<14}{'RSS/worker':>14}{'PSS/worker':>14}{'PSS total':>14}")
+        for mode in ('per-worker', 'preload-fork'):
+            samples = measure(mode, folder, args.workers)
+            worker_samples = [sample for sample in samples if sample[0] == 'worker']
+            rss = sum(sample[1] for sample in worker_samples) / len(worker_samples)
+            pss = sum(sample[2] for sample in worker_samples) / len(worker_samples)
+            total = sum(sample[2] for sample in samples)
+            print(f"{mode:<14}{rss / 1024:>11.1f} MB{pss / 1024:>11.1f} MB{total / 1024:>11.1f} MB")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Measures the bytes the dashboard sends for a first page visit and each view, uncompressed and with the
+encodings the server supports, and what a repeat visit with a cached layout costs.
+
+Usage:
+    python -m benchmarks.payloads [--mode server|client]
+
+Runs against the data in data/, through the Flask test client.
+"""
+import os
+import re
+import argparse
+
+
+def _callback(output, inputs):
+    output_id, prop = output.split('.')
+    return {'output': output, 'outputs': {'id': output_id, 'property': prop}, 'inputs': inputs,
+            'changedPropIds': [f"{inputs[0]['id']}.{inputs[0]['property']}"]}
+
+
+def _value(component_id, value, prop='value'):
+    return {'id': component_id, 'property': prop, 'value': value}
+
+
+CALLBACKS = {
+    'yearly comparison': _callback('yearly-comparison-output.children',
+                                   [_value('year1-dropdown', '2023'), _value('year2-dropdown', '2024')]),
+    'multi-year comparison': _callback('multi-year-comparison-output.children',
+                                       [_value('multi-years-dropdown', [str(year) for year in range(2015, 2025)]),
+                                        _value('multi-top-k-dropdown', 0)]),
+    'department comparison': _callback('department-comparison-output.children',
+                                       [_value('department-dropdown', 'CST'),
+                                        _value('department-years-dropdown', ['2020', '2021', '2022', '2023', '2024'])]),
+    'placement percentage': _callback('placement-percentage-output.children',
+                                      [_value('placement-plot-button', 1, 'n_clicks'),
+                                       _value('placement-year-dropdown', '2024'),
+                                       _value('placement-department-dropdown', 'CST')]),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['server', 'client'], default='server')
+    args = parser.parse_args()
+
+    os.environ['DASHBOARD_MODE'] = args.mode
+    os.environ.setdefault('DATA_WATCH_INTERVAL', '0')
+    import app
+    from http_cache import brotli
+
+    client = app.server.test_client()
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+    index = client.get('/').get_data(as_text=True)
+    requests = [('index', 'GET', '/', None), ('layout', 'GET', '/_dash-layout', None),
+                ('dependencies', 'GET', '/_dash-dependencies', None)]
+    requests += [(f'script {path.split("/")[-1].split("?")[0]}', 'GET', path, None)
+                 for path in re.findall(r'<script src="([^"]+)"', index)]
+    if args.mode == 'server':
+        requests += [(name, 'POST', '/_dash-update-component', body) for name, body in CALLBACKS.items()]
+    requests += [('api company-totals', 'GET', '/api/v1/company-totals?limit=1000', None)]
+
+    print(f"{'response':<40}" + ''.join(f'{encoding:>12}' for encoding in encodings))
+    totals = dict.fromkeys(encodings, 0)
+    for name, method, path, body in requests:
+        sizes = {}
+        for encoding in encodings:
+            response = client.open(path, method=method, json=body, headers={'Accept-Encoding': encoding})
+            sizes[encoding] = len(response.get_data())
+            totals[encoding] += sizes[encoding]
+        print(f'{name[:40]:<40}' + ''.join(f'{sizes[encoding]:>12,}' for encoding in encodings))
+    print(f"{'total':<40}" + ''.join(f'{totals[encoding]:>12,}' for encoding in encodings))
+    for encoding in encodings[1:]:
+        print(f'{encoding}: {totals["identity"] - totals[encoding]:,} bytes saved '
+              f'({1 - totals[encoding] / totals["identity"]:.0%})')
+
+    layout = client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip'})
+    repeat = client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip', 'If-None-Match': layout.headers['ETag']})
+    print(f'repeat layout request: {repeat.status_code}, {len(repeat.get_data())} bytes '
+          f'(first visit {len(layout.get_data()):,} bytes)')
+
+
+if __name__ == '__main__':
+    main()
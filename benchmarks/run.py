@@ -0,0 +1,164 @@
+"""
+Times the dashboard's data and view functions against synthetic archives of increasing size.
+
+Usage:
+    python -m benchmarks.run [--scales 10x150x22,30x1000x22] [--output benchmark-results.json]
+                             [--thresholds benchmarks/thresholds.json]
+
+A scale is YEARSxCOMPANIESxDEPARTMENTS. Results are written as JSON (tagged with the git commit) so runs
+can be compared across commits, and the process exits with status 1 if any timing exceeds its threshold.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import csv
+import platform
+import statistics
+import subprocess
+import tempfile
+
+from benchmarks.synthetic_archive import generate_archive
+from data_processing import convert_xlsx_to_csv
+from placement_store import PlacementStore, build_summaries, get_store
+from summaries import SUMMARY_DIR
+from functionalities.yearly_comparison import create_yearly_comparison_graph
+from functionalities.department_yearly_comparison import department_yearly_comparison
+from functionalities.placement_percentage import generate_placement_graphs
+from placement_facts import PlacementFacts, build_fact_table
+from companies import CompanyIndex
+from ctc_distributions import compute_ctc_distributions
+
+DEFAULT_SCALES = '10x150x22,30x1000x22'
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+
+
+def _time(func, repeat):
+    """Returns the median wall time of `repeat` calls to func, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def count_csv_records(file_path):
+    """Counts the data rows of a CSV without building a DataFrame (same count as len(pd.read_csv(file_path)))."""
+    with open(file_path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Header row
+        return sum(1 for row in reader if row)
+
+
+def load_placement_data(folder_path):
+    """
+    Counts the rows of each yearly CSV by year: the pass over the raw CSVs that the companies-per-year
+    view used to make per request, kept as the baseline the summary tables are measured against.
+    """
+    company_counts = {}
+    for file_name in sorted(os.listdir(folder_path)):
+        if file_name.endswith('.csv') and file_name != 'Placement-Record-Overall.csv':
+            year = file_name.split('-')[-1].replace('.csv', '')
+            company_counts[year] = count_csv_records(os.path.join(folder_path, file_name))
+    return company_counts
+
+
+def run_scale(years, companies, departments, repeat):
+    """Generates an archive of the given size in a temporary folder and times every benchmark on it."""
+    folder = tempfile.mkdtemp(prefix='placement-bench-')
+    try:
+        generated = generate_archive(folder, years=years, companies=companies, departments=departments)
+        first, last = generated[-2] if len(generated) > 1 else generated[0], generated[-1]
+        overall_path = os.path.join(folder, 'Placement-Record-Overall.csv')
+
+        results = {
+            'convert_xlsx_to_csv': _time(lambda: convert_xlsx_to_csv(folder), 1),
+            'load_placement_data': _time(lambda: load_placement_data(folder), repeat),
+            # Ingest: parse every sheet and compute the summary tables from scratch
+            'build_summaries': _time(lambda: (shutil.rmtree(os.path.join(folder, SUMMARY_DIR), ignore_errors=True),
+                                              build_summaries(folder)), repeat),
+            # Start with the summaries already persisted
+            'store_load': _time(lambda: PlacementStore(folder), repeat),
+        }
+
+        # Warm the shared store once; the view timings below bypass the figure cache
+        get_store(folder)
+        results['create_yearly_comparison_graph'] = _time(
+            lambda: create_yearly_comparison_graph.uncached(folder, first, last), repeat)
+        results['department_yearly_comparison'] = _time(
+            lambda: department_yearly_comparison.uncached(folder, 'CST', generated), repeat)
+        results['generate_placement_graphs'] = _time(
+            lambda: generate_placement_graphs(overall_path, last, 'CST'), repeat)
+
+        # Query engine: build the fact table of every year with its indexes, then a filtered group-by
+        snapshot = get_store(folder).snapshot()
+        results['build_facts'] = _time(lambda: PlacementFacts(build_fact_table(snapshot, CompanyIndex())), repeat)
+        facts = PlacementFacts(build_fact_table(snapshot, CompanyIndex()))
+        results['facts_query'] = _time(
+            lambda: facts.query('Offer Type', year=[first, last], department='CST', ctc_bucket=['10-15 LPA']), repeat)
+        # Offer-weighted CTC percentiles and bands of every (department, year)
+        results['ctc_distributions'] = _time(lambda: compute_ctc_distributions(facts.table), repeat)
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check_thresholds(results, thresholds):
+    """Returns a message for every timing that exceeds its threshold ({scale: {benchmark: seconds}})."""
+    failures = []
+    for scale, limits in thresholds.items():
+        for name, limit in limits.items():
+            measured = results.get(scale, {}).get(name)
+            if measured is not None and measured > limit:
+                failures.append(f"{scale} {name}: {measured:.3f}s > {limit:.3f}s")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help='Comma-separated YEARSxCOMPANIESxDEPARTMENTS scales (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the median is kept')
+    parser.add_argument('--output', default='benchmark-results.json', help='Where to write the JSON results')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS,
+                        help='JSON file of {scale: {benchmark: max seconds}}; pass "" to skip the check')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scale in args.scales.split(','):
+        years, companies, departments = (int(part) for part in scale.lower().split('x'))
+        results[scale] = run_scale(years, companies, departments, args.repeat)
+        for name, seconds in results[scale].items():
+            print(f"{scale:>14}  {name:<32} {seconds * 1000:10.1f} ms")
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            failures = check_thresholds(results, json.load(f))
+        if failures:
+            print("Thresholds exceeded:\n  " + "\n  ".join(failures))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import os
+import csv
+import random
+from openpyxl import Workbook
+
+# Real department columns, in sheet order, with the levels each one is split into
+REAL_DEPARTMENTS = [
+    ('CST', ['UG', 'PG']), ('ETC', ['UG', 'PG']), ('EE', ['UG', 'PG']), ('IT', ['UG', 'PG']),
+    ('ME', ['UG', 'PG']), ('CE', ['UG', 'PG']), ('MET', ['UG', 'PG']), ('MIN', ['UG', 'PG']),
+    ('ARC', ['UG', 'PG']), ('AERO', ['UG', 'PG']), ('Geo Informatics', ['PG']), ('VLSI', ['PG']),
+    ('Mat Science', ['PG']), ('Mechatronics', ['PG']), ('Food Proc.', ['PG']), ('REST', ['PG']),
+    ('Bio\n-\nMedical', ['PG']), ('Phys', ['PG']), ('Mths', ['PG']), ('Chem', ['PG']), ('MBA', ['PG']),
+    ('Earth Science', ['PG']),
+]
+
+META_COLUMNS = ['SL', 'Date of Visit', 'Company Visited', 'Type of Offer', 'Eligible Students',
+                'Applied Students', 'Status', 'Annual CTC\nOffered']
+OFFER_TYPES = ['Core Engineering', 'Development', 'Consulting', 'Analytics', 'Finance']
+
+
+def department_layout(departments):
+    """Returns [(name, levels)] for the first `departments` departments, padding with synthetic ones."""
+    layout = REAL_DEPARTMENTS[:departments]
+    for i in range(len(layout), departments):
+        layout.append((f'DEPT{i + 1}', ['UG', 'PG']))
+    return layout
+
+
+def _yearly_rows(year, companies, layout, rng):
+    """Builds the two header rows and the company rows of one yearly sheet."""
+    header = list(META_COLUMNS)
+    levels = [''] * (len(META_COLUMNS) - 1) + ['Rs. In\nLakh(p/a)']
+    for name, dept_levels in layout:
+        header.extend([name] * len(dept_levels))
+        levels.extend(dept_levels)
+    header.append('Total')
+    levels.append('')
+
+    rows = []
+    for i in range(companies):
+        # Most companies hire from a handful of departments
+        counts = [rng.choice([0, 0, 0, 0, 1, 2, 3, 5]) or '' for _ in range(len(levels) - len(META_COLUMNS) - 1)]
+        total = sum(count for count in counts if count)
+        rows.append([
+            float(i + 1), f'{year - 1}-08-{rng.randint(1, 28):02d}', f'Company {rng.randint(1, companies * 2)}',
+            rng.choice(OFFER_TYPES), rng.randint(20, 400), rng.randint(10, 300), 'Offered',
+            round(rng.uniform(3, 45), 2), *counts, float(total),
+        ])
+    return header, levels, rows
+
+
+def _dedupe(header):
+    """Renames repeated header cells the way pandas does when reading a sheet (CST, CST.1, ...)."""
+    seen = {}
+    names = []
+    for name in header:
+        count = seen.get(name, 0)
+        names.append(name if count == 0 else f'{name}.{count}')
+        seen[name] = count + 1
+    return names
+
+
+def _overall_rows(years, layout, rng):
+    """Builds an Overall sheet with one header block and 'DEPARTMENT PLACEMENT' row per year."""
+    width = 3 + sum(len(levels) for _, levels in layout) + 1
+    rows = [['Year', 'fields', 'Percentage', 'departments'] + [''] * (width - 4)]
+    for year in sorted(years, reverse=True):
+        names = ['', '', '']
+        levels = ['', '', '']
+        for name, dept_levels in layout:
+            names.extend([name] * len(dept_levels))
+            levels.extend(dept_levels)
+        rows.append(names + ['Total'])
+        rows.append(levels + [''])
+        for label in ['Total Offers', 'NO. OF COMPANY VISITED FOR DIFFERENT BRANCHES', 'ELIGIBLE / INTERESTED BATCH SIZE']:
+            rows.append([year, label, ''] + [rng.randint(0, 100) for _ in range(width - 3)])
+        percentages = [year, 'DEPARTMENT PLACEMENT PERCENT', round(rng.uniform(50, 95), 2)]
+        for name, dept_levels in layout:
+            percentages.append(f"{' '.join(name.split())}:{round(rng.uniform(0, 100), 1)}")
+            percentages.extend([''] * (len(dept_levels) - 1))
+        rows.append(percentages + [''])
+    return rows
+
+
+def generate_archive(folder, years=10, companies=150, departments=22, first_year=2015, xlsx=True, seed=0):
+    """
+    Writes a synthetic placement archive with the real sheet layout into `folder`.
+
+    Creates Placement-Record-YYYY.csv for each year (and the matching .xlsx workbook with the raw
+    two-row UG/PG header if `xlsx` is set) plus Placement-Record-Overall.csv.
+
+    Returns:
+        list: The generated years as strings.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    layout = department_layout(departments)
+    year_numbers = list(range(first_year, first_year + years))
+
+    for year in year_numbers:
+        header, levels, rows = _yearly_rows(year, companies, layout, rng)
+
+        with open(os.path.join(folder, f'Placement-Record-{year}.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(_dedupe(header))
+            writer.writerow(levels)
+            writer.writerows(rows)
+
+        if xlsx:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(header)
+            sheet.append(levels)
+            for row in rows:
+                sheet.append(row)
+            workbook.save(os.path.join(folder, f'Placement-Record-{year}.xlsx'))
+
+    with open(os.path.join(folder, 'Placement-Record-Overall.csv'), 'w', newline='') as f:
+        csv.writer(f).writerows(_overall_rows(year_numbers, layout, rng))
+
+    return [str(year) for year in year_numbers]
@@ -0,0 +1,354 @@
+import os
+import re
+import logging
+from collections import Counter
+import pandas as pd
+from data_processing import write_atomic
+from schema import clean_label
+
+logger = logging.getLogger(__name__)
+
+# The alias table, kept with the summaries under data/. Versioned by the matching rules: bump it when they
+# change, so spellings they merged are matched again (and carry over the rows added to it by hand)
+ALIASES_FILE = 'company_aliases.v2.csv'
+
+# Spellings the matcher can't connect on its own: short forms of names that go on with more than qualifiers,
+# which it can't tell from other companies ('Tata Steel BSL' isn't 'Tata Steel'), and acronyms expanded with
+# other words. Other variants ('Wipro Ltd.', 'P W C (B. Tech)', 'Cambium Networtks', 'TCS Ninja',
+# 'TCS' for 'Tata Consultancy Services') are matched without being listed here. Misspellings it misses
+# ('Tega Industriws') are data: add a row for them to the alias table, with their company's ID.
+COMPANY_ALIASES = {
+    'Tata Consultancy Services': ['TCS Research & Innovation', 'TCS R&I'],
+    'Maruti Suzuki India Ltd.': ['Maruti'],
+    'Hyundai Motor India Ltd.': ['Hyundai', 'Hyundai Motors'],
+    'Shapoorji Pallonji & Co. Ltd.': ['Shapoorji'],
+    'Cadence Design Systems': ['Cadence'],
+    'Daikin Air-Conditioning India': ['Daikin'],
+    'Samsung R&D Institute India': ['Samsung R&D'],
+    'Codenation Innovation Labs': ['Codenation'],
+    'DX Corr Hardware Technologies': ['DX Corr'],
+    'Abzooba India Infotech': ['Abzooba'],
+    'Microsoft IDC': ['Microsoft', 'Microsoft IT India'],
+    'Wells Fargo EGS': ['Wells Fargo'],
+    'Jindal Stainless Ltd.': ['Jindal Stainless Steel'],
+    'Daimler Truck Innovation Center India Pvt. Ltd.': ['Daimler Truck Innovation India'],
+    'Samsung Research Institute': ['Samsung Research Institute Delhi'],
+    'Techno Electric': ['Techno Electric & Engg.'],
+}
+
+# Words left out of the matching key: legal forms always, descriptors when the name has enough else to go by
+LEGAL_WORDS = {'ltd', 'lt', 'limited', 'pvt', 'private', 'co', 'company', 'inc', 'llc', 'llp', 'corp',
+               'corporation', 'pte', 'plc', 'gmbh', 'the', 'and', 'of', 'for'}
+DESCRIPTOR_WORDS = {'india', 'technologies', 'technology', 'solutions', 'solution', 'services', 'service',
+                    'systems', 'system', 'software', 'industries', 'international', 'global', 'group'}
+# Descriptors that name a line of business, by their singular: two names that differ only in these ('Reve
+# System', 'Reve Solution') are different companies
+BUSINESS_LINES = {'technologies': 'technology', 'technology': 'technology', 'solutions': 'solution',
+                  'solution': 'solution', 'services': 'service', 'service': 'service', 'systems': 'system',
+                  'system': 'system', 'software': 'software', 'industries': 'industries'}
+# Hiring programs, roles and levels: the only words by which a spelling may extend a known company's name
+# ('TCS Ninja', 'Infosys System Engineer') and still be that company, not another one ('IndianOil Petronas')
+QUALIFIER_WORDS = {'ninja', 'digital', 'nqt', 'codevita', 'prime', 'hiring', 'ini', 'ine', 'atlas', 'cto', 'mass',
+                   'recruit', 'freshers', 'phase', 'ppo', 'intern', 'internship', 'graduate', 'trainee', 'trainees',
+                   'engineer', 'engineers', 'associate', 'associates', 'analyst', 'developer', 'get', 'pget', 'mt',
+                   'management', 'tech', 'pg', 'ug'}
+
+# Fuzzy matching: the minimum trigram Jaccard similarity, and the size above which a trigram's block
+# is too common ('com', 'ata') to draw candidates from
+MIN_SIMILARITY = 0.6
+MAX_BLOCK_SIZE = 50
+
+
+def display_name(name):
+    """Returns a company name without role or batch qualifiers: 'TCS Ninja (Through NQT)' -> 'TCS Ninja'."""
+    name = clean_label(re.sub(r'\([^)]*(\)|$)', ' ', clean_label(name)))
+    name = re.sub(r'\s\d+(\.\d+)?L?$', '', name)  # A CTC or count typed into the name cell
+    return name.lstrip(' .,-').rstrip(' ,-')
+
+
+def company_tokens(name):
+    """The significant words of a company name, lower case: 'M.N. Dastur & Co. Pvt. Ltd.' -> ['m', 'n', 'dastur']."""
+    words = [word for word in re.findall(r'[a-z0-9]+', display_name(name).lower()) if word not in LEGAL_WORDS]
+    significant = [word for word in words if word not in DESCRIPTOR_WORDS]
+    # Not down to initials ('L&T Technology Services' isn't 'L&T Ltd.')
+    return significant if len(''.join(significant)) >= 3 else words
+
+
+def company_key(name):
+    """Matching key for a company name: its significant words without spaces, so 'MN Dastur' and 'M.N.Dastur' agree."""
+    return ''.join(company_tokens(name))
+
+
+def business_lines(name):
+    """The lines of business a company name states: 'Reve Systems Pvt. Ltd.' -> {'system'}."""
+    return {BUSINESS_LINES[word] for word in re.findall(r'[a-z0-9]+', display_name(name).lower())
+            if word in BUSINESS_LINES}
+
+
+def _acronym(name):
+    """
+    Initials of a name of three or more words ('Tata Consultancy Services' -> 'tcs'), or None. Names with
+    initials or acronyms of their own ('L & T Infra', 'SRK Mining Services') don't abbreviate reliably.
+    """
+    words = [word for word in re.findall(r'[A-Za-z]+', display_name(name)) if word.lower() not in LEGAL_WORDS]
+    if len(words) < 3 or any(len(word) < 2 or word.isupper() for word in words):
+        return None
+    return ''.join(word[0] for word in words).lower()
+
+
+def _prefixes(tokens):
+    """
+    Keys of the leading words of a name that the rest of it only qualifies ('TCS Ninja (Through NQT)' ->
+    'tcs'), longest first, skipping ones too short to be a company.
+    """
+    keys = (''.join(tokens[:end]) for end in range(len(tokens) - 1, 0, -1)
+            if all(word in QUALIFIER_WORDS for word in tokens[end:]))
+    return [key for key in keys if len(key) >= 3]
+
+
+def _trigrams(key):
+    padded = f'#{key}#'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _extends(words, base):
+    """True if a name's words are another name's words followed by more."""
+    return len(words) > len(base) and words[:len(base)] == base
+
+
+def _lines_key(key, lines):
+    return '/'.join([key, *sorted(lines)])
+
+
+def _unique(ids):
+    return next(iter(ids)) if len(ids) == 1 else None
+
+
+class CompanyIndex:
+    """
+    Resolves company names to stable integer IDs.
+
+    Every spelling seen so far is kept in an alias table ({alias: ID}) that only grows, and is persisted
+    next to the summaries. A new spelling is matched against the known ones through indexes rather than
+    by comparing it with every name: its key, the keys of its leading words when the rest are qualifiers
+    ('TCS Ninja' -> 'TCS'), acronyms ('TCS' <-> 'Tata Consultancy Services'), and trigram blocks for
+    misspellings. A spelling that matches nothing becomes a new company. resolve_all() counts the rows
+    of each spelling, and a company is named after its most frequent one without qualifiers (the latest
+    on a tie), so a misspelling seen first doesn't name it.
+
+    Misspellings the matcher misses are added to the alias table by hand, with their company's ID and
+    the correct spelling in its Spelling column, which they are counted as when the company is named.
+    """
+
+    def __init__(self, aliases=()):
+        self.aliases = {}
+        self.names = {}
+        self.changed = False
+        self._keys = {}
+        self._prefix_ids = {}
+        self._acronym_ids = {}
+        self._trigram_blocks = {}
+        self._key_trigrams = {}
+        self._key_words = {}
+        self._lines = {}
+        self._spellings = {}
+        self._sightings = 0
+        self._corrections = {}
+        self._listed = {company_key(spelling): canonical
+                        for canonical, spellings in COMPANY_ALIASES.items() for spelling in [canonical, *spellings]}
+        for alias, company_id, name, spelling in aliases:
+            self.aliases[alias] = company_id
+            self.names.setdefault(company_id, name)
+            if spelling:
+                self._corrections[alias] = spelling
+            self._index(alias, company_id)
+
+    def _index(self, alias, company_id):
+        tokens = company_tokens(alias)
+        key = ''.join(tokens)
+        if not key:
+            return
+        for prefix in _prefixes(tokens):
+            self._prefix_ids.setdefault(prefix, set()).add(company_id)
+        acronym = _acronym(alias)
+        if acronym:
+            self._acronym_ids.setdefault(acronym, set()).add(company_id)
+        lines = business_lines(alias)
+        self._lines.setdefault(company_id, set()).update(lines)
+        if key not in self._keys:
+            self._keys[key] = company_id
+            self._key_words[key] = tokens
+            self._key_trigrams[key] = _trigrams(key)
+            for gram in self._key_trigrams[key]:
+                self._trigram_blocks.setdefault(gram, []).append(key)
+        elif self._keys[key] != company_id:
+            # Another company's name but for its line of business ('Reve Solution' after 'Reve System')
+            self._keys.setdefault(_lines_key(key, lines), company_id)
+
+    def _conflicts(self, company_id, lines):
+        """True if a known company states other lines of business than a name does (see BUSINESS_LINES)."""
+        known = self._lines.get(company_id)
+        return bool(lines and known) and lines.isdisjoint(known)
+
+    def _match(self, name):
+        """Returns the ID of the known company a new spelling belongs to, or None."""
+        tokens = company_tokens(name)
+        key = ''.join(tokens)
+        if not key:
+            return None
+        lines = business_lines(name)
+        if key in self._keys:
+            if not self._conflicts(self._keys[key], lines):
+                return self._keys[key]
+            return self._keys.get(_lines_key(key, lines))
+        if key in self._listed:
+            company_id = self._listed_id(key)
+            if company_id is not None:
+                return company_id
+            # None of them seen yet: match it as the listed name ('Maruti' as 'Maruti Suzuki India Ltd.')
+            name, tokens = self._listed[key], company_tokens(self._listed[key])
+            key = ''.join(tokens)
+
+        # A known company this name extends with qualifiers ('TCS Ninja', 'Infosys System Engineer'), by name,
+        # listed spelling ('TCS R&I CTO') or acronym
+        for prefix in [key, *_prefixes(tokens)] if len(key) >= 3 else []:
+            if prefix != key and prefix in self._keys:
+                return self._keys[prefix]
+            if prefix != key and prefix in self._listed and self._listed_id(prefix) is not None:
+                return self._listed_id(prefix)
+            company_id = _unique(self._acronym_ids.get(prefix, ()))
+            if company_id is not None:
+                return company_id
+        # A known company that extends this name with qualifiers, or whose name is this one's acronym
+        company_id = _unique(self._prefix_ids.get(key, ()))
+        if company_id is not None and not self._conflicts(company_id, lines):
+            return company_id
+        acronym = _acronym(name)
+        if acronym in self._keys:
+            return self._keys[acronym]
+
+        # Misspellings: count the trigrams shared with the keys in this key's blocks and verify the
+        # closest few; keys with different numbers never match ('Company 12', 'Company 13'), nor names
+        # that extend one another by whole words ('Tata Steel BSL' isn't a misspelling of 'Tata Steel')
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            block = self._trigram_blocks.get(gram, ())
+            if len(block) <= MAX_BLOCK_SIZE:
+                shared.update(block)
+        numbers = re.findall(r'\d+', key)
+        best, best_similarity = None, MIN_SIMILARITY
+        for candidate, _ in shared.most_common(10):
+            if re.findall(r'\d+', candidate) != numbers or self._conflicts(self._keys[candidate], lines):
+                continue
+            if _extends(tokens, self._key_words[candidate]) or _extends(self._key_words[candidate], tokens):
+                continue
+            candidate_grams = self._key_trigrams[candidate]
+            similarity = len(grams & candidate_grams) / len(grams | candidate_grams)
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return self._keys[best] if best is not None else None
+
+    def _listed_id(self, key):
+        """The ID of the company a spelling in COMPANY_ALIASES is listed under, if any of its spellings is known."""
+        canonical = self._listed[key]
+        for spelling in [canonical, *COMPANY_ALIASES[canonical]]:
+            if company_key(spelling) in self._keys:
+                return self._keys[company_key(spelling)]
+        return None
+
+    def resolve(self, name):
+        """Returns the ID of a company name, adding the spelling (and a new company if it matches none)."""
+        alias = clean_label(name)
+        company_id = self.aliases.get(alias)
+        if company_id is not None:
+            return company_id
+
+        company_id = self._match(alias)
+        if company_id is None:
+            company_id = len(self.names)
+            self.names[company_id] = self._listed.get(company_key(alias)) or display_name(alias) or alias
+            logger.debug("New company %d: %r", company_id, alias)
+        self.aliases[alias] = company_id
+        self._index(alias, company_id)
+        self.changed = True
+        return company_id
+
+    def resolve_all(self, names):
+        """
+        Returns the IDs of a sequence of company names as an int32 array, resolving each distinct name
+        once, and renames the companies whose most frequent spelling has changed.
+        """
+        names = pd.Series(names, dtype=object)
+        counts = names.value_counts(sort=False)
+        ids = dict(zip(counts.index, self.resolve_counts(counts.items())))
+        return names.map(ids).fillna(-1).astype('int32').to_numpy()
+
+    def resolve_counts(self, counts):
+        """
+        Like resolve_all, for (name, number of rows) pairs of distinct names, e.g. from a summary part:
+        returns the IDs of the names as a list.
+        """
+        ids = []
+        for name, count in counts:
+            company_id = self.resolve(name)
+            ids.append(company_id)
+            spellings = self._spellings.setdefault(company_id, {})
+            spelling = self._spelling(self._corrections.get(clean_label(name), name), company_id)
+            self._sightings += 1
+            spellings[spelling] = (spellings.get(spelling, (0, 0))[0] + count, self._sightings)
+        for company_id in set(ids):
+            self._rename(company_id)
+        return ids
+
+    def _spelling(self, name, company_id):
+        """
+        A name without qualifiers, for naming its company: 'TCS Ninja (Through NQT)' -> 'TCS', if 'TCS' is
+        a spelling of the same company (otherwise 'Dynamic Digital' would be 'Dynamic').
+        """
+        name = display_name(name) or clean_label(name)
+        words = name.split()
+        for end in range(1, len(words)):
+            rest = re.findall(r'[a-z0-9]+', ' '.join(words[end:]).lower())
+            base = ' '.join(words[:end])
+            if all(word in QUALIFIER_WORDS for word in rest) and self._keys.get(company_key(base)) == company_id:
+                return base
+        return name
+
+    def _rename(self, company_id):
+        """Names a company after its most frequent spelling, unless COMPANY_ALIASES names it."""
+        if self.names[company_id] in COMPANY_ALIASES:
+            return
+        spellings = self._spellings[company_id]
+        name = max(spellings, key=spellings.get)
+        if name != self.names[company_id]:
+            self.names[company_id] = name
+            self.changed = True
+
+    def table(self):
+        """The alias table: one row per spelling, with its company's ID and name, and its correction if any."""
+        rows = sorted(self.aliases.items(), key=lambda item: (item[1], item[0]))
+        return pd.DataFrame([(alias, company_id, self.names[company_id], self._corrections.get(alias, ''))
+                             for alias, company_id in rows], columns=['Alias', 'Company ID', 'Company', 'Spelling'])
+
+    @classmethod
+    def load(cls, folder):
+        """Loads the alias table persisted in a folder, or starts an empty index if there is none."""
+        path = os.path.join(folder, ALIASES_FILE)
+        if not os.path.exists(path):
+            return cls()
+        try:
+            table = pd.read_csv(path, dtype={'Alias': str, 'Company': str, 'Spelling': str}, keep_default_na=False)
+            spellings = table['Spelling'] if 'Spelling' in table.columns else [''] * len(table)
+            return cls(zip(table['Alias'], table['Company ID'].astype(int), table['Company'], spellings))
+        except (OSError, ValueError, KeyError):
+            logger.warning("Could not read the company alias table %s; starting a new one", path, exc_info=True)
+            return cls()
+
+    def save(self, folder):
+        """Persists the alias table (atomically) if spellings were added since it was loaded."""
+        if not self.changed:
+            return
+        os.makedirs(folder, exist_ok=True)
+        write_atomic(folder, ALIASES_FILE, lambda path: self.table().to_csv(path, index=False))
+        self.changed = False
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from placement_store import get_store
+from placement_facts import CTC_BUCKETS, snapshot_facts
+
+# Offer-weighted percentiles reported per (department, year)
+PERCENTILES = {'P25': 0.25, 'Median': 0.5, 'P75': 0.75, 'P90': 0.9}
+BANDS = [label for label, _, _ in CTC_BUCKETS]
+
+
+def compute_ctc_distributions(table):
+    """
+    Computes the offer-weighted CTC distribution of every (department, year) in one batched pass over
+    the fact table (see placement_facts.build_fact_table), counting each offer in a department's UG and
+    PG columns as one observation of its company's CTC. Offers without a recorded CTC are left out.
+
+    A percentile is the lowest CTC at which the cumulative offers reach that fraction of the cell's
+    offers, as if each offer were listed separately. All cells are sorted together by (cell, CTC), so
+    every percentile of every cell is one binary search over the running offer count.
+
+    Returns:
+        pd.DataFrame: One row per (Department, Year) with offers at a known CTC: Offers, Min, P25,
+                      Median, P75, P90, Max (LPA) and the offers in each CTC band (one column per band).
+    """
+    known = table[table['CTC'].notna() & (table['Offers'] > 0) & table['Department'].notna()]
+    columns = ['Department', 'Year', 'Offers', 'Min', *PERCENTILES, 'Max', *BANDS]
+    if known.empty:
+        return pd.DataFrame(columns=columns)
+
+    departments = known['Department'].cat.remove_unused_categories()
+    department_codes = departments.cat.codes.to_numpy()
+    years = known['Year'].to_numpy()
+    year_codes = years - years.min()
+    cells = department_codes.astype(np.int64) * (year_codes.max() + 1) + year_codes
+    ctc = known['CTC'].to_numpy()
+    offers = known['Offers'].to_numpy(dtype=np.int64)
+
+    order = np.lexsort((ctc, cells))
+    cells, ctc, offers = cells[order], ctc[order], offers[order]
+    starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+    ends = np.r_[starts[1:], len(cells)]
+    running = np.cumsum(offers)
+    before = np.r_[0, running][starts]  # Offers in the cells sorted ahead of each cell
+    totals = running[ends - 1] - before
+
+    result = {
+        'Department': departments.cat.categories[department_codes[order][starts]],
+        'Year': years[order][starts],
+        'Offers': totals,
+        'Min': ctc[starts],
+    }
+    for name, fraction in PERCENTILES.items():
+        result[name] = ctc[np.searchsorted(running, before + np.ceil(fraction * totals), side='left')]
+    result['Max'] = ctc[ends - 1]
+
+    # Offers per CTC band: one bincount over (cell, band)
+    bands = np.searchsorted([lower for _, lower, _ in CTC_BUCKETS], ctc, side='right') - 1
+    cell_index = np.repeat(np.arange(len(starts)), ends - starts)
+    per_band = np.bincount(cell_index * len(BANDS) + bands, weights=offers,
+                           minlength=len(starts) * len(BANDS)).reshape(len(starts), len(BANDS))
+    for j, band in enumerate(BANDS):
+        result[band] = per_band[:, j].astype(np.int64)
+
+    distributions = pd.DataFrame(result, columns=columns)
+    return distributions.astype({'Year': 'int16', 'Offers': 'int64'}).sort_values(
+        ['Department', 'Year'], ignore_index=True)
+
+
+def get_ctc_distributions(data_folder):
+    """Returns the CTC distributions of a data folder's current data, computed once per data version."""
+    snapshot = get_store(data_folder).snapshot()
+    # Built before derived() below, which holds the snapshot's lock while it computes
+    facts = snapshot_facts(data_folder, snapshot)
+    return snapshot.derived('ctc_distributions', lambda snap: compute_ctc_distributions(facts.table))
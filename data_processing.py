@@ -1,40 +1,150 @@
 import pandas as pd
 import os
+import logging
+import json
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-def convert_xlsx_to_csv(folder_path):
-    """Converts all XLSX files in the given folder to CSV files, excluding 'Placement-Record-Overall.csv'."""
-    for file_name in os.listdir(folder_path):
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = '.ingest-manifest.json'
+
+
+def write_atomic(folder_path, file_name, write):
+    """Writes a file through a temporary sibling and renames it into place, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{file_name}.', suffix='.tmp', dir=folder_path)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(folder_path, file_name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_digest(file_path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _convert_workbook(folder_path, file_name):
+    """Converts a single placement workbook to CSV and returns the CSV file name."""
+    year = file_name.split('-')[-1].replace('.xlsx', '')
+
+    df = pd.read_excel(os.path.join(folder_path, file_name))
+    df.columns = df.columns.str.strip()  # Remove leading/trailing spaces from column names
+
+    # Convert and save CSV file
+    csv_file_name = f'Placement-Record-{year}.csv'
+    write_atomic(folder_path, csv_file_name, lambda path: df.to_csv(path, index=False))
+    return csv_file_name
+
+
+def _workbooks(folder_path):
+    """Lists the yearly XLSX workbooks in the folder, excluding 'Placement-Record-Overall.xlsx'."""
+    workbooks = []
+    for file_name in sorted(os.listdir(folder_path)):
         if file_name.endswith('.xlsx'):
-            year = file_name.split('-')[-1].replace('.xlsx', '')
             # Exclude 'Placement-Record-Overall.xlsx' by checking its name
             if file_name == 'Placement-Record-Overall.xlsx':
-                print(f"Skipping {file_name}")
+                logger.debug("Skipping %s", file_name)
                 continue
+            workbooks.append(file_name)
+    return workbooks
 
-            df = pd.read_excel(os.path.join(folder_path, file_name))
-            df.columns = df.columns.str.strip()  # Remove leading/trailing spaces from column names
 
-            # Convert and save CSV file
-            csv_file_name = f'Placement-Record-{year}.csv'
-            df.to_csv(os.path.join(folder_path, csv_file_name), index=False)
-            print(f"Converted {file_name} to {csv_file_name}")
+def convert_xlsx_to_csv(folder_path):
+    """Converts all XLSX files in the given folder to CSV files, excluding 'Placement-Record-Overall.csv'."""
+    for file_name in _workbooks(folder_path):
+        csv_file_name = _convert_workbook(folder_path, file_name)
+        logger.info("Converted %s to %s", file_name, csv_file_name)
 
-def load_placement_data(folder_path):
-    """Loads placement data from CSV files and aggregates company counts by year, excluding 'Placement-Record-Overall.csv'."""
-    company_counts = {}
 
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.csv'):
-            # Exclude 'Placement-Record-Overall.csv' by checking its name
-            if file_name == 'Placement-Record-Overall.csv':
-                print(f"Skipping {file_name}")
-                continue
+def load_manifest(folder_path):
+    """Loads the ingestion manifest (source mtime/size/hash per workbook), or an empty one if missing or unreadable."""
+    try:
+        with open(os.path.join(folder_path, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def sync_xlsx_to_csv(folder_path, max_workers=None):
+    """
+    Incrementally converts XLSX files to CSV, skipping workbooks that are unchanged since the last run,
+    then builds the summary tables of the resulting CSVs (see placement_store.build_summaries).
+
+    A manifest in the data folder records the mtime, size and SHA-256 of each converted workbook.
+    Only new or changed workbooks (or those whose CSV is missing) are converted, in parallel over a
+    process pool, and every CSV is written atomically. The summaries are only computed when the
+    CSVs' contents changed.
+
+    Parameters:
+        folder_path (str): Folder containing the placement workbooks.
+        max_workers (int): Size of the process pool. Defaults to the number of CPUs.
+
+    Returns:
+        list: Names of the workbooks that were converted.
+    """
+    # Pool workers re-import app.py under the 'spawn' start method; they must not start ingestion themselves.
+    if multiprocessing.parent_process() is not None:
+        return []
+
+    manifest = load_manifest(folder_path)
+    updated_manifest = {}
+    pending = []
+
+    for file_name in _workbooks(folder_path):
+        file_path = os.path.join(folder_path, file_name)
+        stat = os.stat(file_path)
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        previous = manifest.get(file_name, {})
+        csv_exists = 'csv' in previous and os.path.exists(os.path.join(folder_path, previous['csv']))
+
+        if csv_exists and previous.get('mtime_ns') == entry['mtime_ns'] and previous.get('size') == entry['size']:
+            updated_manifest[file_name] = previous
+            continue
+
+        # The stat changed (e.g. the file was copied or touched); only reconvert if the contents did too
+        entry['sha256'] = file_digest(file_path)
+        if csv_exists and previous.get('sha256') == entry['sha256']:
+            updated_manifest[file_name] = {**previous, **entry}
+            continue
+
+        updated_manifest[file_name] = entry
+        pending.append(file_name)
+
+    if len(pending) == 1 or max_workers == 1:
+        results = [_convert_workbook(folder_path, file_name) for file_name in pending]
+    elif pending:
+        # Spawned rather than forked: this runs in the data watcher's thread, and forking a threaded
+        # process (a gunicorn worker serving requests) can leave the children holding its locks
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(_convert_workbook, [folder_path] * len(pending), pending))
+    else:
+        results = []
+
+    for file_name, csv_file_name in zip(pending, results):
+        updated_manifest[file_name]['csv'] = csv_file_name
+        logger.info("Converted %s to %s", file_name, csv_file_name)
+
+    if updated_manifest != manifest:
+        def write_manifest(path):
+            with open(path, 'w') as f:
+                json.dump(updated_manifest, f, indent=2, sort_keys=True)
 
-            year = file_name.split('-')[-1].replace('.csv', '')
-            df = pd.read_csv(os.path.join(folder_path, file_name))
+        write_atomic(folder_path, MANIFEST_FILE, write_manifest)
 
-            # Count the number of rows which should correspond to the number of companies
-            company_count = len(df)
-            company_counts[year] = company_count
+    # Imported here: placement_store builds on this module
+    from placement_store import build_summaries
+    build_summaries(folder_path)
 
-    return company_counts
+    return pending
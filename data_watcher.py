@@ -0,0 +1,81 @@
+import os
+import logging
+import threading
+from data_processing import sync_xlsx_to_csv
+from placement_store import get_store
+from figure_cache import figure_cache
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: every watcher then ingests, as with a single process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Held by the one watcher, among the processes serving a data folder, that converts its workbooks and
+# builds its summaries; the others only load what it wrote
+INGEST_LOCK_FILE = '.ingest.lock'
+
+
+def refresh_data(data_folder, ingest=True):
+    """
+    Re-ingests changed workbooks and reloads the store. Returns True if the data changed.
+
+    Only workbooks whose contents changed are converted and only the CSVs that changed are parsed
+    again. The store publishes the new data as one snapshot swap, so callbacks already running keep
+    reading the snapshot they started with; cached figures of the old version are then dropped.
+    With ingest=False another process does the ingest step, and only the summaries it wrote are loaded.
+    """
+    converted = sync_xlsx_to_csv(data_folder) if ingest else []
+    changed = get_store(data_folder).reload(compute=ingest)
+    if changed:
+        figure_cache.clear()
+        logger.info("Reloaded placement data from %s (converted: %s)", data_folder, ', '.join(converted) or 'none')
+    return changed
+
+
+class DataWatcher(threading.Thread):
+    """
+    Daemon thread that polls the data folder every `interval` seconds and hot-reloads changes.
+
+    When several processes watch one data folder (gunicorn workers), the first to lock INGEST_LOCK_FILE
+    keeps the lock for its lifetime and is the only one that converts workbooks and builds summaries;
+    if it exits, another watcher takes the lock over at its next poll.
+    """
+
+    def __init__(self, data_folder, interval=30.0):
+        super().__init__(name='data-watcher', daemon=True)
+        self.data_folder = data_folder
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._lock_file = None
+
+    def _ingests(self):
+        """Returns True if this process holds (or just took) the ingest lock, or can't share it."""
+        if self._lock_file is not None or fcntl is None:
+            return True
+        try:
+            lock_file = open(os.path.join(self.data_folder, INGEST_LOCK_FILE), 'a')
+        except OSError:  # A read-only data folder: nothing can be written, so nothing to coordinate
+            return True
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                refresh_data(self.data_folder, ingest=self._ingests())
+            except Exception:
+                # A half-copied or malformed workbook must not kill the watcher; retry on the next poll
+                logger.exception("Failed to reload placement data from %s", self.data_folder)
+
+    def stop(self):
+        self._stopped.set()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
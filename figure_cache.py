@@ -0,0 +1,86 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from placement_store import get_store
+from metrics import record_cache
+from single_flight import flights
+
+
+class FigureCache:
+    """
+    Bounded LRU cache for rendered views, with hit/miss/eviction counters.
+
+    Cached values are shared between requests and must not be mutated by callers.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        """Returns the cached value for key, calling build() and storing its result on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache(True)
+                return self._entries[key]
+            self.misses += 1
+        record_cache(False)
+
+        # Build outside the lock so slow views don't serialize unrelated requests; concurrent misses
+        # of the same key share one build
+        value = flights.run(key, build)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drops every cached entry (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns the cache counters and current size."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+figure_cache = FigureCache(maxsize=int(os.environ.get('FIGURE_CACHE_SIZE', 128)))
+
+
+def cached_view(normalize):
+    """
+    Caches a view function of (data_folder, *args) in the shared figure cache.
+
+    normalize(data_folder, *args) must return the canonical argument tuple, starting with data_folder;
+    the view is always called with those arguments, so requests that normalize alike (e.g. the same
+    two years in either order) share one entry and render identically. The key also carries the
+    store's data version, so entries built from older files are never served.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            canonical = normalize(*args)
+            key = (func.__name__, get_store(canonical[0]).version, canonical)
+            return figure_cache.get_or_build(key, lambda: func(*canonical))
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+import base64
+import numpy as np
+import plotly.io as pio
+
+# Numeric series at least this long are sent as base64 typed arrays ({'dtype', 'bdata'}), which plotly.js
+# decodes straight into a typed array; shorter ones stay plain JSON lists
+TYPED_ARRAY_MIN_LENGTH = 32
+
+# Decimal places kept in plotted values
+DECIMALS = 2
+
+
+def _slim_template():
+    """
+    The parts of Plotly's default template our charts use (colours, fonts, grid and axis styling), built
+    once at import. The full template is about 7.5 kB of JSON in every figure; this is a fraction of that.
+    """
+    full = pio.templates['plotly'].to_plotly_json()
+    layout = full['layout']
+    axis = {key: layout['xaxis'][key] for key in ('automargin', 'gridcolor', 'linecolor', 'ticks',
+                                                   'title', 'zerolinecolor', 'zerolinewidth')}
+    return {
+        'data': {
+            'bar': [{'marker': {'line': {'color': '#E5ECF6', 'width': 0.5}}}],
+            'pie': [{'automargin': True}],
+        },
+        'layout': {
+            'colorway': layout['colorway'],
+            'font': layout['font'],
+            'hoverlabel': layout['hoverlabel'],
+            'hovermode': layout['hovermode'],
+            'paper_bgcolor': layout['paper_bgcolor'],
+            'plot_bgcolor': layout['plot_bgcolor'],
+            'title': layout['title'],
+            'xaxis': axis,
+            'yaxis': axis,
+        },
+    }
+
+
+# Shared by every figure; figures are serialized, never mutated, so one instance is enough
+TEMPLATE = _slim_template()
+
+
+def numbers(values, decimals=DECIMALS):
+    """
+    Returns a numeric series ready for a figure: floats rounded to the given decimals, and long series
+    encoded as typed arrays in the smallest integer dtype that holds them (float64 otherwise). Missing
+    values become null (NaN in typed arrays), which Plotly leaves as gaps.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind == 'f':
+        array = array.round(decimals)
+        if np.isfinite(array).all() and (array == array.round()).all() and len(array):
+            array = array.astype(np.int64)
+    if len(array) < TYPED_ARRAY_MIN_LENGTH:
+        return [None if value != value else value for value in array.tolist()]  # NaN isn't valid JSON
+    dtype = 'f8'
+    if array.dtype.kind in 'iu':
+        dtype = next((candidate for candidate in ('i1', 'i2', 'i4')
+                      if np.iinfo(candidate).min <= array.min() and array.max() <= np.iinfo(candidate).max), 'f8')
+    return {'dtype': dtype, 'bdata': base64.b64encode(array.astype(f'<{dtype}').tobytes()).decode()}
+
+
+def hover_template(*fields):
+    """A hover template listing 'label=value' lines, like Plotly Express's: hover_template(('Year', '%{x}'), ...)."""
+    return '<br>'.join(f'{label}={value}' for label, value in fields) + '<extra></extra>'
+
+
+def figure(traces, **layout):
+    """Returns a plain figure dict (which dcc.Graph accepts) of the given trace dicts, with the shared template."""
+    return {'data': traces, 'layout': {'template': TEMPLATE, **layout}}
@@ -0,0 +1,60 @@
+import logging
+from dash import dcc, html
+from figure_cache import cached_view
+from metrics import StageTimer
+from schema import resolve_department
+from ctc_distributions import BANDS, get_ctc_distributions
+from figures import figure, numbers, hover_template
+
+logger = logging.getLogger(__name__)
+
+
+@cached_view(lambda data_folder, department, years: (data_folder, resolve_department(department) or department,
+                                                    tuple(sorted({str(year) for year in years or []}))))
+def ctc_distribution_graph(data_folder, department, years):
+    """
+    Shows the offer-weighted CTC distribution of a department in each selected year: a box of its
+    P25, median and P75 with whiskers from the lowest to the highest CTC and a P90 marker, and the
+    number of offers in each CTC band.
+
+    Returns:
+        dash.html.Div: The two charts, or a message if no offers with a CTC match.
+    """
+    stages = StageTimer()
+    department = resolve_department(department) or department
+    distributions = get_ctc_distributions(data_folder)
+    rows = distributions[(distributions['Department'] == department)
+                         & distributions['Year'].isin([int(year) for year in years])]
+    stages.mark('load')
+
+    if rows.empty:
+        logger.info("No offers with a CTC for department '%s' in %s", department, years)
+        return html.Div("No offers with a recorded CTC for the selected department and years.")
+
+    x = [str(year) for year in rows['Year']]
+    box = figure(
+        [
+            {'type': 'box', 'name': department, 'x': x, 'q1': numbers(rows['P25']), 'median': numbers(rows['Median']),
+             'q3': numbers(rows['P75']), 'lowerfence': numbers(rows['Min']), 'upperfence': numbers(rows['Max']),
+             'marker': {'color': '#4A90E2'}, 'showlegend': False},
+            {'type': 'scatter', 'mode': 'markers', 'name': 'P90', 'x': x, 'y': numbers(rows['P90']),
+             'customdata': rows['Offers'].tolist(), 'marker': {'symbol': 'diamond', 'color': '#f3a683', 'size': 9},
+             'hovertemplate': hover_template(('Year', '%{x}'), ('P90 CTC (LPA)', '%{y}'), ('Offers', '%{customdata}'))},
+        ],
+        title=dict(text=f'{department} CTC Distribution (offer-weighted)', x=0.5),
+        xaxis=dict(title=dict(text='Year'), type='category'),
+        yaxis=dict(title=dict(text='CTC (LPA)')),
+    )
+    bands = figure(
+        [{'type': 'bar', 'name': band, 'x': x, 'y': numbers(rows[band]),
+          'hovertemplate': hover_template(('CTC Band', band), ('Year', '%{x}'), ('Offers', '%{y}'))}
+         for band in BANDS],
+        title=dict(text=f'{department} Offers per CTC Band', x=0.5),
+        xaxis=dict(title=dict(text='Year'), type='category'),
+        yaxis=dict(title=dict(text='Offers')),
+        legend=dict(title=dict(text='CTC Band')),
+        barmode='stack'
+    )
+    stages.mark('figure')
+
+    return html.Div([dcc.Graph(figure=box), dcc.Graph(figure=bands)])
@@ -0,0 +1,42 @@
+import logging
+from dash import dcc, html
+from metrics import StageTimer
+from trend_matrix import METRICS, load_trend_matrix
+from figures import figure, hover_template
+
+logger = logging.getLogger(__name__)
+
+
+def department_trends(data_folder, metric, departments, years, progress=None):
+    """
+    Shows one metric of the department trend matrix (see trend_matrix.py) as a department x year heatmap.
+
+    Parameters:
+        data_folder (str): Folder containing placement data CSV files.
+        metric (str): One of trend_matrix.METRICS.
+        departments, years (list): The heatmap's rows and columns.
+        progress (callable): Called with (done, total) while the matrix is built, if it has to be.
+
+    Returns:
+        dash.dcc.Graph | dash.html.Div: The heatmap, or a message if the metric is unknown.
+    """
+    if metric not in METRICS:
+        logger.info("Unknown trend metric '%s'", metric)
+        return html.Div(f"Select one of: {', '.join(METRICS)}.")
+
+    stages = StageTimer()
+    matrix = load_trend_matrix(data_folder, departments, years, progress)
+    stages.mark('load')
+
+    heatmap = figure(
+        [{'type': 'heatmap', 'x': matrix['years'], 'y': matrix['departments'], 'z': matrix['metrics'][metric],
+          'colorscale': 'Blues', 'colorbar': {'title': {'text': metric}}, 'texttemplate': '%{z}', 'xgap': 2, 'ygap': 2,
+          'hovertemplate': hover_template(('Department', '%{y}'), ('Year', '%{x}'), (metric, '%{z}'))}],
+        title=dict(text=f'{metric} by Department and Year', x=0.5),
+        xaxis=dict(title=dict(text='Year'), type='category'),
+        yaxis=dict(title=dict(text='Department'), type='category', autorange='reversed'),
+        height=max(400, 28 * len(matrix['departments']) + 150)
+    )
+    stages.mark('figure')
+
+    return dcc.Graph(figure=heatmap)
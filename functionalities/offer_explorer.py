@@ -0,0 +1,80 @@
+import logging
+from dash import dcc, html
+from figure_cache import cached_view
+from metrics import StageTimer
+from placement_facts import get_facts
+from figures import figure, numbers, hover_template
+
+logger = logging.getLogger(__name__)
+
+# Groups shown when grouping by company, most offers first
+MAX_COMPANY_GROUPS = 30
+
+
+def _selection(values):
+    return tuple(sorted({str(value) for value in values or []}))
+
+
+@cached_view(lambda data_folder, group_by, years=None, departments=None, offer_types=None, ctc_buckets=None,
+             statuses=None, min_ctc=None, max_ctc=None, visited_from=None, visited_to=None:
+             (data_folder, group_by, _selection(years), _selection(departments), _selection(offer_types),
+              _selection(ctc_buckets), _selection(statuses), min_ctc, max_ctc, visited_from, visited_to))
+def offer_explorer(data_folder, group_by, years=None, departments=None, offer_types=None, ctc_buckets=None,
+                   statuses=None, min_ctc=None, max_ctc=None, visited_from=None, visited_to=None):
+    """
+    Counts the offers matching the selected filters, grouped by one column of the fact table.
+
+    Parameters:
+        data_folder (str): Folder containing placement data CSV files.
+        group_by (str): 'Year', 'Department', 'Offer Type', 'CTC Bucket', 'Status' or 'Company'.
+        years, departments, offer_types, ctc_buckets, statuses (list): Values to keep; an empty
+            selection keeps every value.
+        min_ctc, max_ctc (float): Inclusive CTC bounds (LPA); None leaves that side open.
+        visited_from, visited_to (str): Inclusive date of visit bounds ('YYYY-MM-DD'); None leaves that
+            side open. Only the sheets that record a date of visit have offers in a date range.
+
+    Returns:
+        dash.html.Div: A summary line and a bar chart of offers per group.
+    """
+    stages = StageTimer()
+    facts = get_facts(data_folder)
+    filters = {'year': list(years or []) or None, 'department': list(departments or []) or None,
+               'offer_type': list(offer_types or []) or None, 'ctc_bucket': list(ctc_buckets or []) or None,
+               'status': list(statuses or []) or None, 'min_ctc': min_ctc, 'max_ctc': max_ctc,
+               'visited_from': visited_from, 'visited_to': visited_to}
+    totals = facts.query(**filters)
+    groups = facts.query(group_by, **filters)
+    stages.mark('compute')
+
+    offers, companies = int(totals['Offers'][0]), int(totals['Companies'][0])
+    if not offers:
+        logger.info("No offers match the filters %s", filters)
+        return html.Div("No offers match the selected filters.")
+
+    groups = groups[groups['Offers'] > 0]
+    if group_by == 'Company':
+        groups = groups.sort_values('Offers', ascending=False, kind='stable').head(MAX_COMPANY_GROUPS)
+    # Plain lists, as customdata pairs can't hold the typed arrays figures.numbers() returns for long series
+    highest = [None if value != value else value  # NaN isn't valid JSON
+               for value in groups['Highest CTC (LPA)'].astype(float).round(2).tolist()]
+    labels = [str(value) if value == value and value is not None else 'Not recorded' for value in groups[group_by]]
+    fig = figure(
+        [{
+            'type': 'bar',
+            'x': labels,
+            'y': numbers(groups['Offers']),
+            'customdata': [list(pair) for pair in zip(groups['Companies'].tolist(), highest)],
+            'marker': {'color': '#4A90E2'},
+            'hovertemplate': hover_template((group_by, '%{x}'), ('Offers', '%{y}'), ('Companies', '%{customdata[0]}'),
+                                            ('Highest CTC (LPA)', '%{customdata[1]}')),
+        }],
+        title=dict(text=f'Offers by {group_by}', x=0.5),
+        xaxis=dict(title=dict(text=group_by), type='category'),
+        yaxis=dict(title=dict(text='Offers')),
+    )
+    stages.mark('figure')
+
+    return html.Div([
+        html.P(f"{offers} offers from {companies} companies match the selected filters."),
+        dcc.Graph(figure=fig),
+    ])
@@ -1,133 +1,101 @@
-import pandas as pd
-import re
+import os
+import logging
 from dash import dcc, html
-import plotly.express as px
+from placement_store import get_store
+from metrics import StageTimer
+from schema import canonical_department
+from figures import figure, numbers, hover_template
+from single_flight import single_flight
 
+logger = logging.getLogger(__name__)
+
+
+def _pie_figure(label, percentage, title, colors):
+    """A placed / not placed pie with a 3D-like effect."""
+    return figure(
+        [{
+            'type': 'pie',
+            'labels': [label, 'Not Placed'],
+            'values': numbers([percentage, 100 - percentage]),
+            'hovertemplate': hover_template(('label', '%{label}'), ('value', '%{value}')),
+            'textinfo': 'percent+label',
+            'textfont': dict(size=15),
+            'pull': [0.1, 0],  # Slightly pull the first slice
+            'marker': dict(
+                colors=colors,
+                line=dict(color='#000000', width=1.5),  # Border for the 3D look
+            )
+        }],
+        title=dict(text=title, font=dict(size=22, family='Arial Black', color='black'), x=0.5, y=0.9)
+    )
+
+
+@single_flight(lambda file_path, year, department=None: (file_path, get_store(os.path.dirname(file_path)).version,
+                                                         str(year), department or ''))
 def generate_placement_graphs(file_path, year, department=None):
     try:
-        # Load the CSV file
-        df = pd.read_csv(file_path, header=0)
-        print("CSV File Loaded Successfully")
-        
-        # Debugging: Print CSV Head
-        print("CSV Head:")
-        print(df.head())
-        
-        # Clean the Year column
-        df['Year'] = pd.to_numeric(df['Year'], errors='coerce').dropna().astype(int)
-        print("Unique Years in DataFrame after Conversion to Integer:")
-        print(df['Year'].unique())
+        stages = StageTimer()
 
-        # Filter the data for the selected year
-        year_filter = df['Year'] == int(year)  # Ensure both are integers
-        print("Filter Match Count after Fix:")
-        print(year_filter.sum())
+        # The Overall sheet is parsed once by the shared store into an indexed percentage table
+        percentages = get_store(os.path.dirname(file_path)).placement_percentages
 
-        if year_filter.sum() == 0:
+        if int(year) not in percentages.years():
             return html.Div(f"No data found for year {year}.", style={'color': 'red'})
-        
-        # Get the row that contains 'DEPARTMENT PLACEMENT' and its corresponding values
-        overall_row = df[(year_filter) & (df.iloc[:, 1].str.contains('DEPARTMENT PLACEMENT', na=False, case=False))]
-        if overall_row.empty:
+
+        overall_percentage = percentages.overall(year)
+        if overall_percentage is None:
             return html.Div(f"No 'DEPARTMENT PLACEMENT' row found for year {year}.", style={'color': 'red'})
 
-        overall_percentage = float(overall_row.iloc[0, 2])
-        print(f"Overall Placement Percentage: {overall_percentage}")
-
-        # Generate Pie Chart for Overall Placement
-        fig_overall = px.pie(
-            names=['Placed', 'Not Placed'],
-            values=[overall_percentage, 100 - overall_percentage],
-            title=f"Overall Placement Percentage ({year})"
-        )
-        # Add a 3D-like effect
-        fig_overall.update_traces(
-            textinfo='percent+label',
-            textfont_size=15,
-            pull=[0.1, 0],  # Slightly pull the "Placed" slice
-            marker=dict(
-                colors=['#63cdda', '#f3a683'],  # Gradient-like colors
-                line=dict(color='#000000', width=1.5),  # Border for the 3D look
-            )
-        )
-        fig_overall.update_layout(
-            title_font=dict(size=22, family='Arial Black', color='black'),
-            title_x=0.5,
-            title_y=0.9,
-        )
-
-        # Extract department information (from 4th column onwards in the row)
-        department_dict = {}
-        dep_info_row = overall_row.iloc[0, 3:]  # Start from the 4th column onward
-        print(f"Processing department data in row: {dep_info_row}")
-
-        for dep_data in dep_info_row:
-            if isinstance(dep_data, str):
-                # Clean the department data string
-                dep_data_clean = dep_data.strip('[]').strip()
-                
-                # Match both ":" and "," format (e.g., "CST:91.5" or "CST,91.5")
-                dep_match = re.split(r'[:,]', dep_data_clean)
-                if len(dep_match) == 2:
-                    dep_name = dep_match[0].strip().lower()  # Clean department name
-                    try:
-                        dep_percentage = float(dep_match[1])  # Parse percentage value
-                        department_dict[dep_name] = dep_percentage
-                        print(f"Extracted Department: {dep_name}, Percentage: {dep_percentage}")
-                    except ValueError:
-                        print(f"Error parsing percentage for {dep_name}. Value: {dep_match[1]}")
-
-        print(f"Department Dictionary: {department_dict}")
+        department_dict = percentages.for_year(year)
+        stages.mark('load')
+
+        # Generate Pie Chart for Overall Placement, in gradient-like colors
+        fig_overall = _pie_figure('Placed', overall_percentage, f"Overall Placement Percentage ({year})",
+                                  ['#63cdda', '#f3a683'])
 
         # Check if the department is in the dictionary (case insensitive match)
         if department:
-            # Clean the department name for matching
-            department_clean = department.strip().lower()
-            print(f"Searching for department: {department_clean}")
+            # Resolve the department's spelling through the schema registry for matching
+            department_clean = canonical_department(department).lower()
 
             if department_clean not in department_dict:
                 available_departments = ", ".join(department_dict.keys())
-                print(f"Department not found. Available departments: {available_departments}")
                 return html.Div(f"Department {department} not found in data. Available departments: {available_departments}", style={'color': 'red'})
 
             dep_percentage = department_dict[department_clean]
-            print(f"{department} Placement Percentage: {dep_percentage}")
-
-            # Ensure both names and values have the same length
-            dep_pie_names = [department, 'Not Placed']
-            dep_pie_values = [dep_percentage, 100 - dep_percentage]
 
             # Generate Pie Chart for the selected department
-            fig_department = px.pie(
-                names=dep_pie_names,
-                values=dep_pie_values,
-                title=f"Placement Percentage for {department} ({year})"
-            )
-            # Add a 3D-like effect
-            fig_department.update_traces(
-                textinfo='percent+label',
-                textfont_size=15,
-                pull=[0.1, 0],
-                marker=dict(
-                    colors=['#f8a5c2', '#3dc1d3'],
-                    line=dict(color='#000000', width=1.5),
-                )
-            )
-            fig_department.update_layout(
-                title_font=dict(size=22, family='Arial Black', color='black'),
-                title_x=0.5,
-                title_y=0.9,
+            fig_department = _pie_figure(department, dep_percentage, f"Placement Percentage for {department} ({year})",
+                                         ['#f8a5c2', '#3dc1d3'])
+
+            # Trend of the department across every year, read from the same index
+            trend = percentages.trend(department)
+            fig_trend = figure(
+                [{
+                    'type': 'scatter',
+                    'mode': 'lines+markers',
+                    'x': [str(trend_year) for trend_year in trend],
+                    'y': numbers(list(trend.values())),
+                    'showlegend': False,
+                    'hovertemplate': hover_template(('Year', '%{x}'), ('Placement Percentage', '%{y}')),
+                }],
+                title=dict(text=f"{department} Placement Percentage by Year", x=0.5),
+                xaxis=dict(title=dict(text='Year')),
+                yaxis=dict(title=dict(text='Placement Percentage'), range=[0, 100])
             )
-            
+
+            stages.mark('figure')
             return html.Div([
                 html.H4(f"Year: {year}"),
                 html.P(f"Overall Placement Percentage: {overall_percentage}%"),
                 dcc.Graph(figure=fig_overall),
                 html.P(f"{department} Placement Percentage: {dep_percentage}%"),
-                dcc.Graph(figure=fig_department)
+                dcc.Graph(figure=fig_department),
+                dcc.Graph(figure=fig_trend)
             ])
         
         # If no department is specified, show only the overall placement pie chart
+        stages.mark('figure')
         return html.Div([
             html.H4(f"Year: {year}"),
             html.P(f"Overall Placement Percentage: {overall_percentage}%"),
@@ -135,5 +103,5 @@ def generate_placement_graphs(file_path, year, department=None):
         ])
         
     except Exception as e:
-        print(f"Error occurred: {str(e)}")
+        logger.exception("Error occurred: %s", e)
         return html.Div(f"An error occurred: {str(e)}", style={'color': 'red'})
@@ -1,32 +1,37 @@
-import plotly.express as px
 from dash import dcc, html
-from data_processing import load_placement_data
+from placement_store import get_store
+from figure_cache import cached_view
+from metrics import StageTimer
+from figures import figure, numbers, hover_template
 
+@cached_view(lambda data_folder: (data_folder,))
 def create_total_companies_graph(data_folder):
     """Creates a 3D-styled bar graph of the total companies visiting each year, within a styled frame."""
 
-    # Load placement data
-    company_counts = load_placement_data(data_folder)
+    stages = StageTimer()
+
+    # Companies per year, from the summary tables
+    company_counts = get_store(data_folder).snapshot().summaries.companies_per_year()
+    stages.mark('load')
 
     # Create the bar graph
     years = list(company_counts.keys())
     counts = list(company_counts.values())
 
-    fig = px.bar(
-        x=years,
-        y=counts,
-        labels={'x': 'Year', 'y': 'Number of Companies'},
-        title='Number of Companies Visiting Each Year'
-    )
-
-    # Add 3D styling and visual effects
-    fig.update_traces(
-    marker=dict(
-        color=['#446BAD' if count > 50 and count<100 else '#008ECC' if count >  100  else '#0147AB' for count in counts]  # Red for >50, Green otherwise
-    )
-)
-    fig.update_layout(
+    fig = figure(
+        [{
+            'type': 'bar',
+            'x': years,
+            'y': numbers(counts),
+            'showlegend': False,
+            'hovertemplate': hover_template(('Year', '%{x}'), ('Number of Companies', '%{y}')),
+            # Add 3D styling and visual effects
+            'marker': dict(
+                color=['#446BAD' if count > 50 and count<100 else '#008ECC' if count >  100  else '#0147AB' for count in counts]  # Red for >50, Green otherwise
+            )
+        }],
         title=dict(
+            text='Number of Companies Visiting Each Year',
             font=dict(size=24, color='#333333'),
             x=0.5,  # Center align
             xanchor='center'
@@ -37,14 +42,15 @@ def create_total_companies_graph(data_folder):
         xaxis=dict(
             showgrid=False,
             zeroline=False,
-            title=dict(font=dict(size=18, color='#333333')),
+            title=dict(text='Year', font=dict(size=18, color='#333333')),
         ),
         yaxis=dict(
             showgrid=True,
             gridcolor='rgba(200, 200, 200, 0.5)',
             zeroline=False,
-            title=dict(font=dict(size=18, color='#333333')),
+            title=dict(text='Number of Companies', font=dict(size=18, color='#333333')),
         ),
+        barmode='relative'
     )
 
     # Create a styled frame for the graph
@@ -67,5 +73,6 @@ def create_total_companies_graph(data_folder):
             'margin': '20px'
         }
     )
+    stages.mark('figure')
 
     return graph_layout
@@ -1,97 +1,73 @@
-import pandas as pd
-import plotly.express as px
 from dash import dcc, html
-import os
-
-def load_and_clean_csv(file_path):
-    """Load and clean the placement CSV file."""
-    try:
-        # Read the CSV file and set the correct header row
-        raw_df = pd.read_csv(file_path, header=0)  # Adjust `header` if necessary
-        
-        # Drop completely empty rows and columns
-        raw_df.dropna(axis=0, how='all', inplace=True)
-        raw_df.dropna(axis=1, how='all', inplace=True)
-        
-        # Normalize column names
-        raw_df.columns = raw_df.columns.str.strip()
-
-        # Print the column names for debugging
-        print("Columns after cleaning:", raw_df.columns.tolist())
-
-        # Validate the presence of the required columns
-        required_columns = {'Company Visited', 'Total'}
-        if not required_columns.issubset(set(raw_df.columns)):
-            raise KeyError(f"Columns {required_columns} are missing in the cleaned data.")
-
-        return raw_df
-    except Exception as e:
-        print(f"Error while processing {file_path}: {e}")
-        raise
-
-
-def load_yearly_data(data_folder, year):
-    """Loads placement data for a specific year and normalizes column names."""
-    csv_file = f"Placement-Record-{year}.csv"
-    file_path = os.path.join(data_folder, csv_file)
-
-    try:
-        df = load_and_clean_csv(file_path)
-    except FileNotFoundError:
-        raise FileNotFoundError(f"The file for year {year} does not exist in the folder '{data_folder}'.")
-    except KeyError as e:
-        raise KeyError(f"Error in file for year {year}: {e}")
-
-    return df
-
-
-def create_yearly_comparison_graph(data_folder, year1, year2):
-    """Creates a comparison line chart for two selected years with enhanced styling."""
-    # Load data for both years
-    df1 = load_yearly_data(data_folder, year1)
-    df2 = load_yearly_data(data_folder, year2)
-
-    # Validate required columns
-    required_columns = {'Company Visited', 'Total'}
-    for year, df in zip([year1, year2], [df1, df2]):
-        missing_columns = required_columns - set(df.columns)
-        if missing_columns:
-            raise KeyError(f"Columns {missing_columns} are missing in Year {year}")
-
-    # Filter and rename columns
-    df1_filtered = df1[['Company Visited', 'Total']].rename(columns={'Total': f'Total {year1}'})
-    df2_filtered = df2[['Company Visited', 'Total']].rename(columns={'Total': f'Total {year2}'})
-
-    # Merge the two datasets
-    merged_df = pd.merge(df1_filtered, df2_filtered, on='Company Visited', how='outer').fillna(0)
-
-    # Create the line chart
-    fig = px.line(
-        merged_df,
-        x='Company Visited',
-        y=[f'Total {year1}', f'Total {year2}'],
-        labels={'value': 'Total Students Placed', 'variable': 'Year'},
-        title=f'Yearly Comparison: {year1} vs {year2}'
-    )
-
-    # Add styling to the chart
-    fig.update_layout(
+from placement_store import get_store
+from figure_cache import cached_view
+from metrics import StageTimer
+from figures import figure, numbers, hover_template
+
+# Above this many companies the comparison lines are drawn with WebGL (Scattergl) instead of SVG
+WEBGL_MIN_COMPANIES = 200
+
+def company_totals_by_year(snapshot, years, top_k=None):
+    """
+    Pivots the long (year, company ID, total) summary table once into one row per company and one
+    'Total <year>' column per selected year, 0 where a company didn't visit that year. Rows are joined
+    across years on company IDs, so every spelling of a company lands on one row.
+
+    Companies are in alphabetical order; with top_k, only the top_k companies by students placed
+    across the selected years are kept, in descending order of that total.
+    """
+    table = snapshot.summaries.company_totals
+    selected = [int(year) for year in years]
+    rows = table[table['Year'].isin(selected)]
+    wide = (rows.pivot_table(index='Company ID', columns='Year', values='Total', aggfunc='sum', fill_value=0)
+            .reindex(columns=selected, fill_value=0))
+    names = rows.drop_duplicates('Company ID').set_index('Company ID')['Company'].astype(object)
+    wide.index = names.reindex(wide.index).to_numpy()
+    wide = wide.sort_index()
+    if top_k:
+        wide = wide.iloc[(-wide.sum(axis=1)).argsort(kind='stable')[:top_k]]
+    wide.columns = [f'Total {year}' for year in years]
+    return wide.rename_axis('Company Visited').reset_index()
+
+
+def _comparison_graph(data_folder, years, top_k, title, summary):
+    """Renders the per-company comparison of the given years as a styled, expandable line chart."""
+    stages = StageTimer()
+
+    # Read the years from one snapshot's summary tables
+    snapshot = get_store(data_folder).snapshot()
+    for year in years:
+        if str(year) not in snapshot.years():
+            raise FileNotFoundError(f"The file for year {year} does not exist in the folder '{data_folder}'.")
+    stages.mark('load')
+
+    merged_df = company_totals_by_year(snapshot, years, top_k)
+    stages.mark('compute')
+
+    # Create the line chart; WebGL keeps it responsive with many companies
+    companies = merged_df['Company Visited'].tolist()
+    trace_type = 'scattergl' if len(merged_df) > WEBGL_MIN_COMPANIES else 'scatter'
+    fig = figure(
+        [
+            {'type': trace_type, 'mode': 'lines', 'name': f'Total {year}', 'x': companies,
+             'y': numbers(merged_df[f'Total {year}']),
+             'hovertemplate': hover_template(('Year', f'Total {year}'), ('Company Visited', '%{x}'),
+                                             ('Total Students Placed', '%{y}'))}
+            for year in years
+        ],
+        title=dict(text=title, font=dict(size=20, color='#4A90E2'), x=0.5),  # Center-align the title
         plot_bgcolor='#f9f9f9',
         paper_bgcolor='#ffffff',
-        title=dict(
-            font=dict(size=20, color='#4A90E2'),
-            x=0.5  # Center-align the title
-        ),
         xaxis=dict(
-            title=dict(font=dict(size=14, color='#333333')),
+            title=dict(text='Company Visited', font=dict(size=14, color='#333333')),
             tickfont=dict(size=12, color='#333333')
         ),
         yaxis=dict(
-            title=dict(font=dict(size=14, color='#333333')),
+            title=dict(text='Total Students Placed', font=dict(size=14, color='#333333')),
             tickfont=dict(size=12, color='#333333')
         ),
         legend=dict(
-            title=dict(font=dict(size=12)),
+            title=dict(text='Year', font=dict(size=12)),
             font=dict(size=12)
         )
     )
@@ -102,7 +78,7 @@ def create_yearly_comparison_graph(data_folder, year1, year2):
             html.Details(
                 children=[
                     html.Summary(
-                        f'Compare {year1} and {year2}',
+                        summary,
                         style={
                             'cursor': 'pointer',
                             'fontWeight': 'bold',
@@ -123,5 +99,30 @@ def create_yearly_comparison_graph(data_folder, year1, year2):
             'margin': '20px'
         }
     )
+    stages.mark('figure')
 
     return graph_layout
+
+
+@cached_view(lambda data_folder, year1, year2: (data_folder, *sorted([str(year1), str(year2)])))
+def create_yearly_comparison_graph(data_folder, year1, year2):
+    """Creates a comparison line chart for two selected years with enhanced styling."""
+    years = list(dict.fromkeys([year1, year2]))
+    return _comparison_graph(data_folder, years, None, f'Yearly Comparison: {year1} vs {year2}',
+                             f'Compare {year1} and {year2}')
+
+
+@cached_view(lambda data_folder, years, top_k=None: (data_folder, tuple(sorted({str(year) for year in years or []})),
+                                                    int(top_k) if top_k else None))
+def create_multi_year_comparison_graph(data_folder, years, top_k=None):
+    """
+    Compares the students placed per company across any set of years in one chart, optionally
+    limited to the top_k companies over those years.
+    """
+    years = sorted({str(year) for year in years or []})
+    if not years:
+        return html.Div("Select at least one year to compare.")
+    top_k = int(top_k) if top_k else None
+    label = ', '.join(years)
+    title = f'Multi-Year Comparison: {label}' + (f' (top {top_k} companies)' if top_k else '')
+    return _comparison_graph(data_folder, years, top_k, title, f'Compare {label}')
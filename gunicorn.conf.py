@@ -0,0 +1,26 @@
+# Gunicorn settings for multi-worker deployments (picked up automatically by `gunicorn app:server`).
+#
+# The app is imported once in the master and the workers are forked from it, so the libraries and
+# the placement data loaded at import are shared copy-on-write instead of being rebuilt per worker.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = True
+
+# Read by app.py: don't start threads in the master
+os.environ['GUNICORN_PRELOAD'] = '1'
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the GC's reach, so collections in the workers don't
+    # write to (and un-share) the pages inherited from the master
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # The master ran the startup ingest when it imported the app. From here on one worker's watcher
+    # converts new workbooks and builds their summaries; the others reload what it wrote (see DataWatcher)
+    import app
+    app.start_data_watcher()
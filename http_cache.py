@@ -0,0 +1,133 @@
+import os
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are gzip-compressed only
+    brotli = None
+
+# Smaller bodies aren't worth the header overhead and CPU
+MIN_COMPRESS_BYTES = 512
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/css', 'text/plain', 'application/javascript',
+                      'text/javascript', 'image/svg+xml'}
+
+# Payload size matters more than CPU for our users, so compress hard; brotli's top qualities are too slow
+# for per-request use
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 6
+
+# Compressed bodies of files (Dash's fingerprinted JS bundles) and of responses with an ETag (API pages,
+# the layout), keyed by (path, ETag, encoding), so each is compressed once
+COMPRESSED_CACHE_SIZE = 64
+
+
+def _encode(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _accepted_encoding():
+    """The best encoding the client accepts: 'br' (if brotli is installed), 'gzip' or None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def enable_compression(server):
+    """
+    Compresses the server's text responses (Dash callbacks, layout, JS bundles, API) with brotli or
+    gzip, whichever the client accepts. Strong ETags become weak, since the compressed body differs
+    byte for byte from the identity one.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @server.after_request
+    def compress(response):
+        if response.mimetype not in COMPRESSIBLE_TYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = _accepted_encoding()
+        if (encoding is None or response.status_code != 200 or 'Content-Encoding' in response.headers
+                or response.is_streamed and not response.direct_passthrough):
+            return response
+
+        etag, weak = response.get_etag()
+        key = (request.full_path, etag, encoding) if etag or response.direct_passthrough else None
+        with lock:
+            body = cache.get(key) if key else None
+            if body is not None:
+                cache.move_to_end(key)
+        if body is None:
+            response.direct_passthrough = False  # Read files served with send_file into memory
+            data = response.get_data()
+            if len(data) < MIN_COMPRESS_BYTES:
+                return response
+            body = _encode(data, encoding)
+            if key:
+                with lock:
+                    cache[key] = body
+                    while len(cache) > COMPRESSED_CACHE_SIZE:
+                        cache.popitem(last=False)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress
+
+
+def code_fingerprint(root, paths):
+    """
+    A hash of the given app files and folders (relative to root; folders are walked for .py, .js and .css
+    files), so responses derived from them change with a deploy but not with anything else in the tree.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        full_path = os.path.join(root, path)
+        files = [full_path] if os.path.isfile(full_path) else sorted(
+            os.path.join(folder, file_name) for folder, dirs, file_names in os.walk(full_path)
+            for file_name in file_names if file_name.endswith(('.py', '.js', '.css')))
+        for file_path in files:
+            with open(file_path, 'rb') as f:
+                digest.update(os.path.relpath(file_path, root).encode() + b'\0' + f.read())
+    return digest.hexdigest()[:12]
+
+
+def enable_conditional(server, paths, tag):
+    """
+    Serves the given GET paths (e.g. Dash's '/_dash-layout') with an ETag of tag() and 'no-cache', and
+    answers a matching If-None-Match with a 304 before the view runs. tag() must change whenever the
+    responses can, e.g. by combining the data version with code_fingerprint().
+    """
+    def etag():
+        return hashlib.sha256(tag().encode()).hexdigest()[:20]
+
+    @server.before_request
+    def not_modified():
+        if request.method == 'GET' and request.path in paths:
+            current = etag()
+            if request.if_none_match.contains_weak(current):
+                response = Response(status=304)
+                response.set_etag(current)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+
+    @server.after_request
+    def tag_response(response):
+        if request.method == 'GET' and request.path in paths and response.status_code == 200:
+            response.set_etag(etag())
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    return not_modified
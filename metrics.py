@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from functools import wraps
+from flask import g, has_request_context
+from dash.exceptions import PreventUpdate
+from profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets for stage durations, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Calls slower than this are logged with their arguments, to find slow dropdown combinations
+SLOW_CALLBACK_SECONDS = float(os.environ.get('SLOW_CALLBACK_SECONDS', 1.0))
+
+
+class _Histogram:
+    """Cumulative Prometheus-style histogram."""
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class CallbackMetrics:
+    """Per-callback stage timings, response sizes, cache hits and error counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = defaultdict(_Histogram)  # (callback, stage) -> histogram
+        self.response_bytes = defaultdict(lambda: [0, 0])  # callback -> [sum, count]
+        self.cache = defaultdict(int)  # (callback, 'hit' | 'miss') -> count
+        self.errors = defaultdict(int)  # callback -> count
+        self.coalesced = defaultdict(int)  # (function, 'thread' | 'process') -> count
+
+    def observe_duration(self, callback, stage, seconds):
+        with self._lock:
+            self.durations[(callback, stage)].observe(seconds)
+
+    def observe_response(self, callback, size):
+        with self._lock:
+            totals = self.response_bytes[callback]
+            totals[0] += size
+            totals[1] += 1
+
+    def count_cache(self, callback, hit):
+        with self._lock:
+            self.cache[(callback, 'hit' if hit else 'miss')] += 1
+
+    def count_error(self, callback):
+        with self._lock:
+            self.errors[callback] += 1
+
+    def count_coalesced(self, function, scope):
+        with self._lock:
+            self.coalesced[(function, scope)] += 1
+
+    def render_prometheus(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines.append('# HELP dashboard_callback_duration_seconds Wall time per callback stage.')
+            lines.append('# TYPE dashboard_callback_duration_seconds histogram')
+            for (callback, stage), histogram in sorted(self.durations.items()):
+                labels = f'callback="{callback}",stage="{stage}"'
+                for bound, count in zip(DURATION_BUCKETS, histogram.buckets):
+                    lines.append(f'dashboard_callback_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'dashboard_callback_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'dashboard_callback_duration_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'dashboard_callback_duration_seconds_count{{{labels}}} {histogram.count}')
+
+            lines.append('# HELP dashboard_callback_response_bytes Size of the JSON-encoded callback output.')
+            lines.append('# TYPE dashboard_callback_response_bytes summary')
+            for callback, (total, count) in sorted(self.response_bytes.items()):
+                lines.append(f'dashboard_callback_response_bytes_sum{{callback="{callback}"}} {total}')
+                lines.append(f'dashboard_callback_response_bytes_count{{callback="{callback}"}} {count}')
+
+            lines.append('# HELP dashboard_callback_cache_total Figure cache lookups made by a callback.')
+            lines.append('# TYPE dashboard_callback_cache_total counter')
+            for (callback, result), count in sorted(self.cache.items()):
+                lines.append(f'dashboard_callback_cache_total{{callback="{callback}",result="{result}"}} {count}')
+
+            lines.append('# HELP dashboard_callback_errors_total Callback invocations that raised.')
+            lines.append('# TYPE dashboard_callback_errors_total counter')
+            for callback, count in sorted(self.errors.items()):
+                lines.append(f'dashboard_callback_errors_total{{callback="{callback}"}} {count}')
+
+            lines.append('# HELP dashboard_coalesced_calls_total Calls that shared the result of an identical '
+                         'call in flight in another thread or process.')
+            lines.append('# TYPE dashboard_coalesced_calls_total counter')
+            for (function, scope), count in sorted(self.coalesced.items()):
+                lines.append(f'dashboard_coalesced_calls_total{{function="{function}",scope="{scope}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+callback_metrics = CallbackMetrics()
+_current = threading.local()
+
+
+class StageTimer:
+    """
+    Splits the running callback's wall time into stages: each mark(name) records the time since the
+    previous mark (or since the timer was created) as stage `name`. Does nothing outside a callback.
+    """
+
+    def __init__(self):
+        self.callback = getattr(_current, 'callback', None)
+        self.last = time.perf_counter()
+
+    def mark(self, name):
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        callback_metrics.observe_duration(self.callback, name, now - self.last)
+        self.last = now
+
+
+def record_cache(hit):
+    """Counts a figure cache hit or miss against the callback running on this thread, if any."""
+    callback = getattr(_current, 'callback', None)
+    if callback is not None:
+        callback_metrics.count_cache(callback, hit)
+
+
+def instrument(func):
+    """
+    Wraps a Dash callback to record its total and per-stage wall time, output size and errors.
+
+    Stages inside the callback are recorded with StageTimer. The output size and the time Dash takes
+    to encode it (the 'serialize' stage) are read off the Flask response by record_responses(), so
+    the output is never encoded twice.
+    """
+    name = func.__name__
+    if profiler is not None:  # Only when PROFILING_TOKEN is set; otherwise the callback runs unwrapped
+        func = profiler.wrap(name, func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _current.callback = name
+        start = time.perf_counter()
+        try:
+            output = func(*args, **kwargs)
+            if has_request_context():  # Not when called outside a request
+                g.instrumented_callback = (name, time.perf_counter())
+            return output
+        except PreventUpdate:
+            raise
+        except Exception:
+            callback_metrics.count_error(name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.callback = None
+            callback_metrics.observe_duration(name, 'total', elapsed)
+            if elapsed > SLOW_CALLBACK_SECONDS:
+                logger.warning("Slow callback %s%r took %.3fs", name, args, elapsed)
+
+    return wrapper
+
+
+def record_responses(server):
+    """
+    Records the size of each instrumented callback's response, and the time from the callback's return
+    to the finished response as its 'serialize' stage. Register it after any hook that rewrites the
+    body (after_request hooks run in reverse), so it measures the JSON Dash encoded.
+    """
+    @server.after_request
+    def observe(response):
+        callback = g.pop('instrumented_callback', None)
+        if callback is None or response.status_code != 200:
+            return response
+        name, returned = callback
+        callback_metrics.observe_duration(name, 'serialize', time.perf_counter() - returned)
+        size = response.content_length
+        if size is None and not response.direct_passthrough:
+            size = len(response.get_data())
+        if size is not None:
+            callback_metrics.observe_response(name, size)
+        return response
@@ -0,0 +1,357 @@
+import os
+import re
+import json
+import logging
+from collections import Counter
+import numpy as np
+import pandas as pd
+from companies import CompanyIndex
+from data_processing import write_atomic
+from placement_store import get_store
+from summaries import SUMMARY_DIR
+from schema import (SL, COMPANY, OFFER_TYPE, CTC, clean_label, department_columns, resolve_department,
+                    canonical_department)
+
+logger = logging.getLogger(__name__)
+
+DATE = ('Date of Visit', '')
+STATUS = ('Status', '')
+
+# CTC bands (LPA), as [lower, upper) bounds; offers without a CTC are in 'Unknown'
+CTC_BUCKETS = [('< 5 LPA', 0, 5), ('5-10 LPA', 5, 10), ('10-15 LPA', 10, 15), ('15-20 LPA', 15, 20),
+               ('20-30 LPA', 20, 30), ('30+ LPA', 30, np.inf)]
+UNKNOWN_CTC = 'Unknown'
+
+# Columns of the fact table that have an index, and the filter parameter each is selected by
+DIMENSIONS = {'year': 'Year', 'department': 'Department', 'offer_type': 'Offer Type', 'status': 'Status',
+              'ctc_bucket': 'CTC Bucket'}
+
+# The dimensions whose values the offer explorer lists, persisted by the ingest step next to each data
+# version's summary tables so a page load doesn't build the fact table to list them
+EXPLORER_DIMENSIONS = ('offer_type', 'ctc_bucket', 'status')
+EXPLORER_VALUES_FILE = 'explorer_values.json'
+
+
+def _label_key(value):
+    return re.sub(r'[^a-z0-9]', '', value.lower())
+
+
+def _label_spellings(counts):
+    """
+    Cleans free-text labels ({spelling: rows}) and picks, for the spellings that differ only in case,
+    spacing or punctuation ('Core\\nEngineering', 'R & D', 'pending'), the most common one:
+    returns {label key: spelling}.
+    """
+    cleaned = Counter()
+    for spelling, count in counts.items():
+        if clean_label(spelling):
+            cleaned[clean_label(spelling)] += count
+    spellings = {}
+    for spelling, _ in cleaned.most_common():
+        spellings.setdefault(_label_key(spelling), spelling)
+    return spellings
+
+
+def _unify_labels(values):
+    """Cleans free-text labels and merges their spellings under the most common one (see _label_spellings)."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))  # Each distinct spelling is cleaned once
+    spellings = _label_spellings(dict(zip(uniques, np.bincount(codes[codes >= 0], minlength=len(uniques)))))
+    labels = [spellings[_label_key(clean_label(spelling))] if clean_label(spelling) else None for spelling in uniques]
+    return np.array(labels + [None], dtype=object)[codes]  # Code -1 (missing) selects the trailing None
+
+
+def _ctc_bands():
+    return [label for label, _, _ in CTC_BUCKETS] + [UNKNOWN_CTC]
+
+
+def _ctc_bucket(ctc):
+    buckets = np.full(len(ctc), UNKNOWN_CTC, dtype=object)
+    for label, lower, upper in CTC_BUCKETS:
+        buckets[(ctc >= lower) & (ctc < upper)] = label
+    return buckets
+
+
+def _offer_rows(df):
+    """
+    Lays out a yearly sheet's fact table rows: returns its company rows (not the 'Total Offers' rows at
+    the foot), their department columns, and per fact row, in sheet order, the company row, the position
+    of its department column (-1 for none) and its offers.
+    """
+    df = df[df[SL].notna()] if SL in df.columns else df
+    columns = [key for keys in department_columns(df).values() for key in keys]
+    counts = df[columns].to_numpy(dtype=np.int32) if columns else np.zeros((len(df), 0), np.int32)
+    offered = counts > 0
+    rows, positions = np.nonzero(offered)
+    without = np.flatnonzero(~offered.any(axis=1))
+    rows = np.concatenate([rows, without])
+    positions = np.concatenate([positions, np.full(len(without), -1)])
+    offers = np.concatenate([counts[offered], np.zeros(len(without), np.int32)])
+    order = np.argsort(rows, kind='stable')  # Sheet order
+    return df, columns, rows[order], positions[order], offers[order]
+
+
+def _clean_ctc(ctc):
+    # CTC is parsed as float32; round away the float32 noise so 39.12 isn't reported as 39.119999
+    ctc = np.asarray(ctc, dtype=float).round(2)
+    return np.where(ctc > 0, ctc, np.nan)
+
+
+def build_fact_table(snapshot, companies):
+    """
+    Builds one table of every offer in every yearly sheet: a row per company row and department column
+    with offers, and a row with no department and 0 offers for a company row without any.
+
+    Columns: Year (int16), Company ID (int32), Company, Department, Level, Offer Type, Status, CTC Bucket
+    (categories), CTC (LPA; NaN when not recorded), Date of Visit (datetime, NaT unless the sheet
+    has a date) and Offers (int32).
+    """
+    parts = []
+    for year in snapshot.years():
+        df = snapshot.get_year(year)
+        if COMPANY not in df.columns:
+            continue
+        df, columns, rows, positions, offers = _offer_rows(df)
+
+        # Per department column, with a trailing entry that position -1 selects
+        departments = np.array([canonical_department(name) for name, _ in columns] + [None], dtype=object)
+        levels = np.array([level or None for _, level in columns] + [None], dtype=object)
+
+        def column(key, default=None):
+            values = df[key].to_numpy(dtype=object) if key in df.columns else np.full(len(df), default, dtype=object)
+            return values[rows]
+
+        # Resolved per company row, so the spellings are counted as often as the summaries count them
+        ids = companies.resolve_all(df[COMPANY].to_numpy(dtype=object))[rows]
+        parts.append(pd.DataFrame({
+            'Year': int(year),
+            'Company ID': ids,
+            'Department': departments[positions],
+            'Level': levels[positions],
+            'Offer Type': column(OFFER_TYPE),
+            'Status': column(STATUS),
+            'CTC': column(CTC, np.nan).astype(np.float32),
+            'Date of Visit': pd.to_datetime(pd.Series(column(DATE)).astype(str), format='%Y-%m-%d %H:%M:%S',
+                                            errors='coerce').to_numpy(),
+            'Offers': offers,
+        }))
+
+    table = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        columns=['Year', 'Company ID', 'Department', 'Level', 'Offer Type', 'Status', 'CTC',
+                 'Date of Visit', 'Offers'])
+    # Named once every year is resolved, as a company is named after its most frequent spelling
+    names = np.array([companies.names[company_id] for company_id in range(len(companies.names))] + [None],
+                     dtype=object)
+    table.insert(2, 'Company', names[table['Company ID'].to_numpy(dtype=int)])  # ID -1 selects the trailing None
+    table['Offer Type'] = _unify_labels(table['Offer Type'])
+    table['Status'] = _unify_labels(table['Status'])
+    table['CTC'] = _clean_ctc(table['CTC'])
+    table['CTC Bucket'] = pd.Categorical(_ctc_bucket(table['CTC'].to_numpy()), categories=_ctc_bands())
+    return table.astype({'Year': 'int16', 'Company ID': 'int32', 'Company': 'category', 'Department': 'category',
+                         'Level': 'category', 'Offer Type': 'category', 'Status': 'category',
+                         'Date of Visit': 'datetime64[ns]', 'Offers': 'int32'})
+
+
+def explorer_part(df):
+    """
+    What one yearly frame adds to the explorer values, as JSON-ready data: how many fact table rows have
+    each spelling of the offer type and status, and the CTC bands that occur. The ingest step keeps it
+    with the sheet's summary part (see summaries.write_part) and merges them with merge_explorer_parts.
+    """
+    if COMPANY not in df.columns:
+        return {'offer_type': {}, 'status': {}, 'ctc_bucket': []}
+    df, _, rows, _, _ = _offer_rows(df)
+
+    def spellings(key):
+        values = pd.Series(df[key].to_numpy(dtype=object)[rows] if key in df.columns else [], dtype=object)
+        return {spelling: int(count) for spelling, count in values.value_counts(sort=False).items()
+                if isinstance(spelling, str)}  # Other cells are no label (see _label_spellings)
+
+    ctc = (df[CTC].to_numpy(dtype=object)[rows].astype(np.float32) if CTC in df.columns
+           else np.full(len(rows), np.nan, np.float32))
+    buckets = set(_ctc_bucket(_clean_ctc(ctc)))
+    return {'offer_type': spellings(OFFER_TYPE), 'status': spellings(STATUS),
+            'ctc_bucket': [label for label in _ctc_bands() if label in buckets]}
+
+
+def merge_explorer_parts(parts):
+    """
+    The values of the EXPLORER_DIMENSIONS, as PlacementFacts.values() lists them for the fact table of
+    the yearly frames the explorer_parts were taken from (in year order), without building it.
+    """
+    labels = {'offer_type': Counter(), 'status': Counter()}
+    buckets = set()
+    for part in parts:
+        for dimension, counts in labels.items():
+            counts.update(part[dimension])
+        buckets.update(part['ctc_bucket'])
+    return {'offer_type': sorted(set(_label_spellings(labels['offer_type']).values())),
+            'ctc_bucket': [label for label in _ctc_bands() if label in buckets],
+            'status': sorted(set(_label_spellings(labels['status']).values()))}
+
+
+def explorer_values(frames):
+    """The values of the EXPLORER_DIMENSIONS in a sequence of yearly frames: {dimension: [value, ...]}."""
+    return merge_explorer_parts(explorer_part(df) for df in frames)
+
+
+def write_explorer_values(data_folder, version, values):
+    """Persists the explorer values of a data version next to its summary tables (atomically)."""
+    folder = os.path.join(data_folder, SUMMARY_DIR, version)
+    write_atomic(folder, EXPLORER_VALUES_FILE, lambda path: _dump_json(values, path))
+
+
+def load_explorer_values(data_folder):
+    """
+    Returns the explorer values ({dimension: values}, see explorer_values) of a data folder's current data:
+    from memory, from the copy the ingest step persisted, or computed from the yearly sheets (and persisted)
+    for data that didn't go through it.
+    """
+    snapshot = get_store(data_folder).snapshot()
+    folder = os.path.join(data_folder, SUMMARY_DIR, snapshot.version or '')
+
+    def build(snap):
+        try:
+            with open(os.path.join(folder, EXPLORER_VALUES_FILE)) as f:
+                values = json.load(f)
+            if set(values) == set(EXPLORER_DIMENSIONS):
+                return values
+        except (OSError, ValueError):
+            pass
+
+        values = explorer_values(snap.get_year(year) for year in snap.years())
+        if os.path.isdir(folder):  # The version's summaries were persisted (the data folder is writable)
+            try:
+                write_explorer_values(data_folder, snap.version, values)
+            except OSError:
+                logger.warning("Could not persist the explorer values in %s", folder, exc_info=True)
+        return values
+
+    return snapshot.derived('explorer_values', build)
+
+
+def _dump_json(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def _postings(values):
+    """{value: sorted row positions} for a column, from one stable argsort."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+
+
+class PlacementFacts:
+    """
+    The fact table of every offer (see build_fact_table) with indexes for ad hoc filtering.
+
+    Each dimension (year, department, offer type, status, CTC bucket) has a posting list per value: the
+    sorted positions of its rows. CTC and date of visit are also kept in sorted order, so a range is two
+    binary searches. A query intersects the posting lists of its filters, smallest first, and touches
+    only the rows they select, never the whole table.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._postings = {dimension: _postings(table[column].astype(object).to_numpy())
+                          for dimension, column in DIMENSIONS.items()}
+        self._sorted = {}
+        for name, column in (('ctc', 'CTC'), ('date', 'Date of Visit')):
+            values = table[column].to_numpy()
+            known = np.flatnonzero(~pd.isna(values))
+            order = known[np.argsort(values[known], kind='stable')].astype(np.int32)
+            self._sorted[name] = (values[order], order)
+
+    def values(self, dimension):
+        """The values of a dimension that occur in the data (e.g. values('offer_type')): CTC buckets in band order, others sorted."""
+        present = [value for value in self._postings[dimension] if value is not None and value == value]
+        if dimension == 'ctc_bucket':
+            return [label for label in self.table['CTC Bucket'].cat.categories if label in present]
+        return sorted(present)
+
+    def _lookup(self, dimension, value):
+        if dimension == 'year':
+            return int(value)
+        if dimension == 'department':
+            return resolve_department(value) or value
+        if dimension in ('offer_type', 'status'):
+            spellings = {_label_key(known): known for known in self._postings[dimension]}
+            return spellings.get(_label_key(str(value)), value)
+        return value
+
+    def _range(self, name, low, high):
+        """Sorted positions of the rows whose CTC or date is in [low, high]."""
+        values, order = self._sorted[name]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return np.sort(order[start:stop])
+
+    def select(self, min_ctc=None, max_ctc=None, visited_from=None, visited_to=None, **filters):
+        """
+        Returns the sorted positions of the rows matching every filter. A filter is a dimension
+        (year, department, offer_type, status, ctc_bucket) with a value or a list of values to match
+        any of; CTC (LPA) and date of visit take inclusive bounds. No filters selects every row.
+        """
+        unknown = set(filters) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s) {sorted(unknown)}; filter on {sorted(DIMENSIONS)}.")
+        lists = []
+        for dimension, selected in filters.items():
+            if selected is None:
+                continue
+            selected = selected if isinstance(selected, (list, tuple, set)) else [selected]
+            postings = self._postings[dimension]
+            matches = [postings.get(self._lookup(dimension, value)) for value in selected]
+            matches = [match for match in matches if match is not None]
+            # Values of one dimension select disjoint rows, so their union is a sorted merge
+            lists.append(np.sort(np.concatenate(matches)) if matches else np.empty(0, np.int32))
+        if min_ctc is not None or max_ctc is not None:
+            lists.append(self._range('ctc', min_ctc, max_ctc))
+        if visited_from is not None or visited_to is not None:
+            lists.append(self._range('date', None if visited_from is None else np.datetime64(visited_from, 'ns'),
+                                     None if visited_to is None else np.datetime64(visited_to, 'ns')))
+        if not lists:
+            return np.arange(len(self.table), dtype=np.int32)
+
+        lists.sort(key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def rows(self, **filters):
+        """The fact table rows matching the filters (see select)."""
+        return self.table.take(self.select(**filters))
+
+    def query(self, group_by=(), **filters):
+        """
+        Aggregates the rows matching the filters (see select) per group of the given columns (e.g.
+        ['Year', 'Offer Type']): Offers (sum), Companies (distinct company IDs) and Highest CTC (LPA).
+        Rows where a grouping column isn't recorded form a group of their own. Without group_by,
+        returns a single row of totals.
+        """
+        rows = self.rows(**filters)
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        if not group_by:
+            return pd.DataFrame({'Offers': [int(rows['Offers'].sum())], 'Companies': [rows['Company ID'].nunique()],
+                                 'Highest CTC (LPA)': [rows['CTC'].max()]})
+        grouped = rows.groupby(group_by, observed=True, sort=True, dropna=False)
+        return pd.DataFrame({
+            'Offers': grouped['Offers'].sum(),
+            'Companies': grouped['Company ID'].nunique(),
+            'Highest CTC (LPA)': grouped['CTC'].max(),
+        }).reset_index()
+
+
+def snapshot_facts(data_folder, snapshot):
+    """Returns the PlacementFacts of a snapshot of a data folder's store, built on first use."""
+    root = os.path.join(data_folder, SUMMARY_DIR)
+    return snapshot.derived('facts', lambda snap: PlacementFacts(build_fact_table(snap, CompanyIndex.load(root))))
+
+
+def get_facts(data_folder):
+    """Returns the PlacementFacts of a data folder's current data, built on first use per data version."""
+    return snapshot_facts(data_folder, get_store(data_folder).snapshot())
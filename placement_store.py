@@ -0,0 +1,362 @@
+import os
+import re
+import logging
+import threading
+import pandas as pd
+from companies import CompanyIndex
+from summaries import (SUMMARY_DIR, PlacementSummaries, compute_summaries, data_version, prune_parts, read_part,
+                       read_summaries, sheet_part, source_digests, source_version, write_part, write_summaries)
+from schema import (read_header, build_columns, read_columns, assemble_frame,
+                    clean_label, canonical_department, parse_level)
+
+OVERALL_FILE = 'Placement-Record-Overall.csv'
+# Department of the overall placement percentage in the percentage table
+OVERALL = 'Overall'
+_YEARLY_FILE = re.compile(r'^Placement-Record-(\d{4})\.csv$')
+
+logger = logging.getLogger(__name__)
+
+
+def read_overall_csv(file_path):
+    """Parses the Overall placement CSV, casting the 'Year' column to numbers."""
+    df = pd.read_csv(file_path, header=0)
+    df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+    return df
+
+
+def parse_placement_percentages(overall_df):
+    """
+    Turns the Overall sheet into a long table of placement percentages.
+
+    Each year's block in the sheet is preceded by two header rows (department names, then UG/PG
+    levels). The 'DEPARTMENT PLACEMENT' row of a block holds the overall percentage in the
+    'Percentage' column and one cell per department column, written either as a plain number or
+    labelled, e.g. "CST:91.5", "[ETC:62.67]" or "EE,77.2". A label takes precedence over the
+    department named in the header. Department names are resolved to their canonical spelling
+    through the schema registry.
+
+    Returns:
+        pd.DataFrame: Columns Year (int16), Department and Level (categorical) and Percentage
+                      (float64). The overall percentage is stored with Department 'Overall' and an
+                      empty Level.
+    """
+    records = []
+    header_rows = []
+    departments, levels = [], []
+
+    for row in overall_df.itertuples(index=False):
+        year = row[0]
+        if pd.isna(year):
+            # Header rows come in pairs: department names, then levels
+            header_rows.append([clean_label(value) for value in row])
+            if len(header_rows) == 2:
+                departments, levels = header_rows
+                header_rows = []
+            continue
+        header_rows = []
+
+        if 'DEPARTMENT PLACEMENT' not in str(row[1]).upper():
+            continue
+
+        year = int(year)
+        overall = pd.to_numeric(row[2], errors='coerce')
+        if pd.notna(overall):
+            records.append((year, OVERALL, '', float(overall)))
+
+        for position in range(3, len(row)):
+            value = row[position]
+            department = departments[position] if position < len(departments) else ''
+            level = parse_level(levels[position]) if position < len(levels) else ''
+            if isinstance(value, str):
+                # Match both ":" and "," format (e.g., "CST:91.5" or "CST,91.5")
+                parts = re.split(r'[:,]', value.strip('[]').strip())
+                if len(parts) == 2:
+                    department, value = parts[0].strip(), parts[1]
+                elif len(parts) != 1:
+                    continue
+            percentage = pd.to_numeric(value, errors='coerce')
+            if department and department != 'Total' and pd.notna(percentage):
+                records.append((year, canonical_department(department), level, float(percentage)))
+
+    return _percentage_table(records)
+
+
+def _percentage_table(records):
+    table = pd.DataFrame(records, columns=['Year', 'Department', 'Level', 'Percentage'])
+    return table.astype({'Year': 'int16', 'Department': 'category', 'Level': 'category', 'Percentage': 'float64'})
+
+
+class PlacementPercentages:
+    """
+    Placement percentages from the Overall sheet, indexed by year and by department. Lookups accept
+    any spelling the schema registry resolves; keys are canonical names in lower case.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._by_year = {}
+        self._by_department = {}
+        for year, department, percentage in zip(table['Year'], table['Department'], table['Percentage']):
+            key = department.lower()
+            self._by_year.setdefault(int(year), {})[key] = float(percentage)
+            self._by_department.setdefault(key, {})[int(year)] = float(percentage)
+
+    def years(self):
+        """Returns the years that have a 'DEPARTMENT PLACEMENT' row, in ascending order."""
+        return sorted(self._by_year)
+
+    def overall(self, year):
+        """Returns the overall placement percentage for a year, or None."""
+        return self._by_year.get(int(year), {}).get('overall')
+
+    def for_year(self, year):
+        """Returns {department (lower case): percentage} for a year, excluding the overall figure."""
+        return {dept: value for dept, value in self._by_year.get(int(year), {}).items() if dept != 'overall'}
+
+    def trend(self, department):
+        """Returns {year: percentage} for one department across every year, in ascending year order."""
+        return dict(sorted(self._by_department.get(canonical_department(department).lower(), {}).items()))
+
+
+class YearlySheet:
+    """
+    One yearly placement CSV, parsed on first use and then kept: nothing is read until a view drills
+    down into the sheet's records.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def frame(self):
+        """
+        Returns the sheet without the rows that are empty in every column. The frame is cached and
+        must be treated as read-only.
+        """
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    layout = build_columns(*read_header(self.file_path))
+                    self._frame = assemble_frame(read_columns(self.file_path, layout), [key for _, key in layout])
+        return self._frame
+
+
+class StoreSnapshot:
+    """
+    An immutable view of the placement data at one data version.
+
+    The dashboard views read the summary tables; the yearly sheets are parsed only when something
+    drills down into the per-company records with get_year().
+
+    A callback that reads several things should take one snapshot and read everything from it, so a
+    reload in the middle of the callback cannot mix old and new data. Indexes memoized with derived()
+    live on the snapshot and are dropped together with it.
+    """
+
+    def __init__(self, version, yearly, summaries):
+        self.version = version
+        self._yearly = yearly
+        self.summaries = summaries
+        self.placement_percentages = PlacementPercentages(summaries.placement_percentages)
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def years(self):
+        """Returns the years with a placement record, in ascending order."""
+        return list(self._yearly)
+
+    def get_year(self, year):
+        """Returns the placement records for a year, or an empty DataFrame if there is no file for it."""
+        sheet = self._yearly.get(str(year))
+        return sheet.frame() if sheet is not None else pd.DataFrame()
+
+    def derived(self, key, build):
+        """Returns build(snapshot), memoized under key for the lifetime of this snapshot."""
+        if key not in self._derived:
+            with self._derived_lock:
+                if key not in self._derived:
+                    self._derived[key] = build(self)
+        return self._derived[key]
+
+
+class PlacementStore:
+    """
+    Serves the placement data of a data folder: the summary tables every view reads, and the yearly
+    sheets for drill-down, which are parsed lazily (see YearlySheet).
+
+    The summary tables are computed once per version of the source CSVs by the ingest step (see
+    build_summaries) and persisted under data/.summaries, so the store only loads them.
+
+    The DataFrames handed out are shared between callbacks and must be treated as read-only.
+    Call reload() to pick up files that were added, changed or removed since the last load;
+    only those files are read again, and the new data is published by swapping in a new
+    StoreSnapshot in one step.
+    """
+
+    def __init__(self, data_folder):
+        self.data_folder = data_folder
+        self._lock = threading.Lock()
+        self._stats = {}
+        empty = compute_summaries({}, _percentage_table([]))
+        self._snapshot = StoreSnapshot(None, {}, PlacementSummaries(empty))
+        self.reload()
+
+    def reload(self, compute=True):
+        """
+        Picks up the CSVs that changed since the last load. Returns True if the data changed (a file
+        that was only touched, with the same contents, is not a change).
+
+        With compute=False, data whose summaries the ingest step hasn't written yet is left for a later
+        reload instead of being computed here (another process is ingesting it).
+        """
+        with self._lock:
+            stats = scan_sources(self.data_folder)
+            if stats == self._stats:
+                return False
+            version = source_version(self.data_folder, stats)
+            current = self._snapshot
+            if version == current.version:
+                self._stats = stats
+                return False
+
+            yearly = {}
+            for year, file_name in _yearly_files(stats):
+                if self._stats.get(file_name) == stats[file_name]:
+                    yearly[year] = current._yearly[year]
+                else:
+                    yearly[year] = YearlySheet(os.path.join(self.data_folder, file_name))
+
+            tables = read_summaries(self.data_folder, version)
+            if tables is None:
+                if not compute:
+                    return False
+                # CSVs that bypassed the ingest step, or a data folder it couldn't write to
+                logger.warning("No summaries for data version %s in %s; computing them from the CSVs",
+                               version, self.data_folder)
+                tables = _summarize(self.data_folder, stats)[1]
+
+            self._snapshot = StoreSnapshot(version, yearly, PlacementSummaries(tables))
+            self._stats = stats
+            return True
+
+    def snapshot(self):
+        """Returns the current StoreSnapshot."""
+        return self._snapshot
+
+    @property
+    def version(self):
+        """Version stamp of the current data: a hash of the source CSVs' contents."""
+        return self._snapshot.version
+
+    def years(self):
+        """Returns the years with a placement record, in ascending order."""
+        return self._snapshot.years()
+
+    def get_year(self, year):
+        """Returns the placement records for a year; see StoreSnapshot.get_year."""
+        return self._snapshot.get_year(year)
+
+    def derived(self, key, build):
+        """Returns build(snapshot), memoized under key until the data changes (for indexes computed from the frames)."""
+        return self._snapshot.derived(key, build)
+
+    @property
+    def summaries(self):
+        """The summary tables of the current data (a PlacementSummaries)."""
+        return self._snapshot.summaries
+
+    @property
+    def placement_percentages(self):
+        """The Overall sheet's placement percentages as an indexed PlacementPercentages table."""
+        return self._snapshot.placement_percentages
+
+
+def scan_sources(data_folder):
+    """Returns {file_name: (mtime_ns, size)} for the placement CSVs in a data folder."""
+    stats = {}
+    for entry in os.scandir(data_folder):
+        if entry.name == OVERALL_FILE or _YEARLY_FILE.match(entry.name):
+            stat = entry.stat()
+            stats[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def _yearly_files(stats):
+    """Yields (year, file_name) for the yearly CSVs among the scanned sources, in year order."""
+    for file_name in sorted(stats):
+        match = _YEARLY_FILE.match(file_name)
+        if match:
+            yield match.group(1), file_name
+
+
+def _summarize(data_folder, stats):
+    """
+    Computes the summary tables and explorer values of the given source CSVs and persists them, if the data
+    folder is writable. Each CSV is parsed only if no earlier build kept its part (see summaries.write_part),
+    so after a change only the changed files are read. Returns (version, tables).
+    """
+    # Imported here: placement_facts builds on this module
+    from placement_facts import explorer_part, merge_explorer_parts, write_explorer_values
+
+    digests = source_digests(data_folder, stats)
+    version = data_version(digests)
+    parts, fresh = {}, {}
+    for year, file_name in _yearly_files(stats):
+        part = read_part(data_folder, digests[file_name])
+        if part is None:
+            df = YearlySheet(os.path.join(data_folder, file_name)).frame()
+            part = fresh[file_name] = {'summary': sheet_part(df), 'explorer': explorer_part(df)}
+        parts[year] = part
+
+    percentages = _percentage_table([])
+    if OVERALL_FILE in stats:
+        part = read_part(data_folder, digests[OVERALL_FILE])
+        if part is None:
+            table = parse_placement_percentages(read_overall_csv(os.path.join(data_folder, OVERALL_FILE)))
+            part = fresh[OVERALL_FILE] = {'percentages': table.astype(object).values.tolist()}
+        percentages = _percentage_table(part['percentages'])
+
+    root = os.path.join(data_folder, SUMMARY_DIR)
+    companies = CompanyIndex.load(root)
+    tables = compute_summaries({year: part['summary'] for year, part in parts.items()}, percentages, companies)
+    try:
+        for file_name, part in fresh.items():
+            write_part(data_folder, digests[file_name], part)
+        companies.save(root)
+        write_summaries(data_folder, version, tables)
+        write_explorer_values(data_folder, version, merge_explorer_parts(part['explorer'] for part in parts.values()))
+        prune_parts(data_folder, digests)
+    except OSError:
+        logger.warning("Could not write summaries for version %s; using them from memory", version, exc_info=True)
+    return version, tables
+
+
+def build_summaries(data_folder):
+    """
+    Computes the summary tables of a data folder's current CSVs and persists them under data/.summaries,
+    with the offer explorer's dropdown values, unless this version already has them. This is the ingest
+    step's last stage (see sync_xlsx_to_csv); the store only loads what it wrote. Only the CSVs that changed
+    since the last build are parsed. Returns the data version.
+    """
+    stats = scan_sources(data_folder)
+    version = source_version(data_folder, stats)
+    if not os.path.isdir(os.path.join(data_folder, SUMMARY_DIR, version)):
+        _summarize(data_folder, stats)
+    return version
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(data_folder):
+    """Returns the shared PlacementStore for a data folder, loading it on first use."""
+    key = os.path.abspath(data_folder)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = PlacementStore(data_folder)
+    return store
@@ -0,0 +1,144 @@
+"""
+Pre-renders every yearly comparison, department comparison and placement percentage view the
+dashboard's dropdowns can select, for DASHBOARD_MODE=static.
+
+Usage:
+    python -m prerender [--data data/] [--output static_views] [--workers N] [--html] [--force]
+
+Views are rendered in parallel over a process pool with the dashboard's own view functions and
+written as component JSON (plus standalone HTML pages with --html) to <output>/<data version>/,
+with a manifest.json of every file written last. The app in static mode fetches these files from
+STATIC_VIEWS_URL, which can point at a CDN that the folder is uploaded to.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from html import escape
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+from data_processing import sync_xlsx_to_csv, write_atomic
+from placement_store import get_store, OVERALL_FILE
+from functionalities.yearly_comparison import create_yearly_comparison_graph
+from functionalities.department_yearly_comparison import department_yearly_comparison
+from functionalities.placement_percentage import generate_placement_graphs
+from views import static_views
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+
+# View name -> function rendering it from (data_folder, *arguments)
+RENDERERS = {
+    'yearly': create_yearly_comparison_graph,
+    'department': department_yearly_comparison,
+    'placement': lambda data_folder, year, department: generate_placement_graphs(
+        os.path.join(data_folder, OVERALL_FILE), year, department),
+}
+
+
+def _page(view):
+    """A standalone HTML page of a serialized view: its figures (Plotly from its CDN) and text, in order."""
+    parts = []
+
+    def walk(node):
+        if isinstance(node, (str, int, float)):
+            parts.append(f'<p>{escape(str(node))}</p>')
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+        elif isinstance(node, dict) and 'props' in node:
+            if node.get('type') == 'Graph':
+                parts.append(pio.to_html(node['props'].get('figure', {}), full_html=False, validate=False,
+                                         include_plotlyjs='cdn' if not any('<script' in part for part in parts)
+                                         else False))
+            else:
+                walk(node['props'].get('children'))
+
+    walk(view)
+    return f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"></head><body>{"".join(parts)}</body></html>\n'
+
+
+def _render(task):
+    """Renders one view into the output folder; returns (path, bytes written, error message or None)."""
+    data_folder, folder, name, arguments, path, html = task
+    try:
+        body = to_json_plotly(RENDERERS[name](data_folder, *arguments))
+    except Exception as error:  # Reported in the manifest; the app shows a message for a missing view
+        logger.exception("Could not render %s%r", name, tuple(arguments))
+        return path, 0, f'{type(error).__name__}: {error}'
+
+    target = os.path.join(folder, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w') as f:
+        f.write(body)
+    size = len(body)
+    if html:
+        page = _page(json.loads(body))
+        with open(target[:-len('.json')] + '.html', 'w') as f:
+            f.write(page)
+        size += len(page)
+    return path, size, None
+
+
+def prerender(data_folder, output, workers=None, html=False, force=False):
+    """
+    Renders every static view of the current data into output/<version>/ and returns its manifest.
+    A version whose manifest exists is complete and is left as is unless force is set.
+    """
+    sync_xlsx_to_csv(data_folder)
+    version = get_store(data_folder).version  # Loaded here, so forked workers inherit it
+    folder = os.path.join(output, version)
+    manifest_path = os.path.join(folder, MANIFEST_FILE)
+    if os.path.exists(manifest_path) and not force:
+        logger.info("Views of data version %s are already rendered in %s", version, folder)
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    tasks = [(data_folder, folder, name, arguments, path, html) for name, arguments, path in static_views()]
+    with ProcessPoolExecutor(max_workers=workers, initializer=get_store, initargs=(data_folder,)) as executor:
+        results = list(executor.map(_render, tasks, chunksize=16))
+
+    manifest = {
+        'version': version,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'views': {path: size for path, size, error in results if error is None},
+        'failed': {path: error for path, _, error in results if error is not None},
+        'bytes': sum(size for _, size, _ in results),
+    }
+    # Written last, so a folder with a manifest is complete
+    os.makedirs(folder, exist_ok=True)
+    write_atomic(folder, MANIFEST_FILE, lambda path: _write_json(path, manifest))
+    return manifest
+
+
+def _write_json(path, value):
+    with open(path, 'w') as f:
+        json.dump(value, f, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='data/', help='placement data folder (default data/)')
+    parser.add_argument('--output', default=os.environ.get('STATIC_VIEWS_DIR', 'static_views'),
+                        help='output folder (default $STATIC_VIEWS_DIR or static_views)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--html', action='store_true', help='also write a standalone HTML page per view')
+    parser.add_argument('--force', action='store_true', help='render again even if this data version is done')
+    args = parser.parse_args()
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    manifest = prerender(args.data, args.output, args.workers, args.html, args.force)
+    print(f"Data version {manifest['version']}: {len(manifest['views'])} views, {manifest['bytes']:,} bytes "
+          f"in {os.path.join(args.output, manifest['version'])}")
+    for path, error in manifest['failed'].items():
+        print(f'failed: {path}: {error}', file=sys.stderr)
+    return 1 if manifest['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+import os
+import sys
+import hmac
+import json
+import time
+import pstats
+import cProfile
+import secrets
+import tempfile
+import threading
+import tracemalloc
+from collections import Counter
+from functools import wraps
+from flask import Blueprint, Response, abort, request, send_from_directory
+
+# Profiling is only wired in when a token is set: without one, callbacks run unwrapped and no route exists
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'placement-profiles'))
+
+PROFILE_PREFIX = '/debug/profile'
+MODES = ('cprofile', 'sample')
+MAX_INVOCATIONS = 100
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+ALLOCATION_LINES = 50  # Allocation sites listed per invocation
+KEEP_SESSIONS = 20
+
+SESSION_FILE = 'session.json'
+PSTATS_FILE = 'profile.pstats'
+COLLAPSED_FILE = 'stacks.collapsed'
+ALLOCATIONS_FILE = 'allocations.txt'
+
+
+def _frame_name(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _sample(thread_id, stop, interval, stacks):
+    """Records the stack of a thread every interval seconds until stop is set, as collapsed stacks."""
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        names = []
+        while frame is not None:
+            names.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        if names:
+            stacks[';'.join(reversed(names))] += 1
+
+
+class _Session:
+    """A request to profile the next `count` invocations of a callback, and what they recorded."""
+
+    def __init__(self, callback, count, mode, interval, memory):
+        self.id = f"{callback}-{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+        self.callback = callback
+        self.count = count
+        self.mode = mode
+        self.interval = interval
+        self.memory = memory
+        self.done = 0
+        self.seconds = []
+        self.stats = None
+        self.stacks = Counter()
+        self.allocations = []
+        self.folder = os.path.join(PROFILE_DIR, self.id)
+
+    def describe(self):
+        return {'id': self.id, 'callback': self.callback, 'mode': self.mode, 'requested': self.count,
+                'profiled': self.done, 'seconds': [round(seconds, 6) for seconds in self.seconds],
+                'memory': self.memory, 'complete': self.done >= self.count,
+                'files': sorted(name for name in os.listdir(self.folder) if name != SESSION_FILE)
+                if os.path.isdir(self.folder) else []}
+
+    def save(self):
+        """Writes the session's results so far, so they can be downloaded from any worker."""
+        os.makedirs(self.folder, exist_ok=True)
+        if self.stats is not None:
+            self.stats.dump_stats(os.path.join(self.folder, PSTATS_FILE))
+        if self.stacks:
+            with open(os.path.join(self.folder, COLLAPSED_FILE), 'w') as f:
+                f.writelines(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+        if self.allocations:
+            with open(os.path.join(self.folder, ALLOCATIONS_FILE), 'w') as f:
+                f.write('\n\n'.join(self.allocations) + '\n')
+        with open(os.path.join(self.folder, SESSION_FILE), 'w') as f:
+            json.dump(self.describe(), f, indent=1)
+
+
+class CallbackProfiler:
+    """
+    Profiles the next N invocations of a named callback on request: with cProfile (a pstats file) or by
+    sampling the callback thread's stack (collapsed stacks, for flamegraph.pl or speedscope), and
+    optionally with tracemalloc (the top allocation sites). Invocations run one at a time under the
+    profiler; concurrent ones run as usual and aren't counted.
+    """
+
+    def __init__(self):
+        self.callbacks = set()
+        self._armed = {}  # callback -> _Session
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+
+    def wrap(self, name, func):
+        """Returns func wrapped so that invocations are profiled while a session for `name` is armed."""
+        self.callbacks.add(name)
+
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            session = self._armed.get(name)
+            if session is None or not self._profiling.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return self._run(session, func, args, kwargs)
+            finally:
+                self._profiling.release()
+
+        return profiled
+
+    def arm(self, callback, count=1, mode='cprofile', interval=DEFAULT_SAMPLE_INTERVAL_MS / 1000, memory=False):
+        """Profiles the next `count` invocations of a callback (replacing a session still armed for it)."""
+        session = _Session(callback, count, mode, interval, memory)
+        session.save()
+        with self._lock:
+            self._armed[callback] = session
+        self._prune()
+        return session
+
+    def _run(self, session, func, args, kwargs):
+        stop = threading.Event()
+        profile = sampler = None
+        if session.mode == 'sample':
+            sampler = threading.Thread(target=_sample, args=(threading.get_ident(), stop, session.interval,
+                                                             session.stacks), daemon=True)
+            sampler.start()
+        else:
+            profile = cProfile.Profile()
+        trace = session.memory and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start(25)
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                return profile.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            session.seconds.append(time.perf_counter() - start)
+            if sampler is not None:
+                stop.set()
+                sampler.join()
+            if profile is not None:
+                if session.stats is None:
+                    session.stats = pstats.Stats(profile)
+                else:
+                    session.stats.add(profile)
+            if trace:
+                # Leave out the profiler's own allocations
+                snapshot = tracemalloc.take_snapshot().filter_traces(
+                    [tracemalloc.Filter(False, path) for path in (cProfile.__file__, tracemalloc.__file__, __file__)])
+                top = snapshot.statistics('lineno')[:ALLOCATION_LINES]
+                tracemalloc.stop()
+                session.allocations.append(f'# invocation {session.done + 1}\n' + '\n'.join(str(stat) for stat in top))
+            session.done += 1
+            if session.done >= session.count:
+                with self._lock:
+                    if self._armed.get(session.callback) is session:
+                        del self._armed[session.callback]
+            session.save()
+
+    def _prune(self):
+        """Removes the oldest sessions' files beyond KEEP_SESSIONS."""
+        entries = sorted(os.scandir(PROFILE_DIR), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:-KEEP_SESSIONS]:
+            for name in os.listdir(entry.path):
+                os.remove(os.path.join(entry.path, name))
+            os.rmdir(entry.path)
+
+
+profiler = CallbackProfiler() if PROFILING_TOKEN else None
+
+
+def _sessions():
+    sessions = []
+    for entry in sorted(os.scandir(PROFILE_DIR), key=lambda entry: entry.name) if os.path.isdir(PROFILE_DIR) else []:
+        try:
+            with open(os.path.join(entry.path, SESSION_FILE)) as f:
+                sessions.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sessions
+
+
+def _json(body, status=200):
+    return Response(json.dumps(body, indent=1), status=status, mimetype='application/json')
+
+
+def create_profiling_api():
+    """
+    Returns the profiling endpoints as a Flask blueprint (only when PROFILING_TOKEN is set). Every request
+    must carry the token in an 'X-Profiling-Token' header.
+
+        POST /debug/profile/<callback>?count=N&mode=cprofile|sample&interval=MS&memory=1
+                                          profile the callback's next N invocations in this worker
+        GET  /debug/profile/              the callbacks that can be profiled, and the sessions
+        GET  /debug/profile/<session>/<file>
+                                          download profile.pstats, stacks.collapsed or allocations.txt
+    """
+    api = Blueprint('profiling', __name__, url_prefix=PROFILE_PREFIX)
+
+    @api.before_request
+    def authorize():
+        token = request.headers.get('X-Profiling-Token', '')
+        if not hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode()):
+            abort(403)
+
+    @api.route('/')
+    def index():
+        return _json({'callbacks': sorted(profiler.callbacks), 'modes': list(MODES), 'sessions': _sessions()})
+
+    @api.route('/<callback>', methods=['POST'])
+    def arm(callback):
+        if callback not in profiler.callbacks:
+            return _json({'error': f"Unknown callback '{callback}'; one of {sorted(profiler.callbacks)}."}, 404)
+        try:
+            count = int(request.args.get('count', 1))
+            interval = float(request.args.get('interval', DEFAULT_SAMPLE_INTERVAL_MS)) / 1000
+        except ValueError:
+            return _json({'error': "'count' and 'interval' must be numbers."}, 400)
+        mode = request.args.get('mode', 'cprofile')
+        if mode not in MODES or not 1 <= count <= MAX_INVOCATIONS or interval <= 0:
+            return _json({'error': f"'mode' must be one of {list(MODES)}, 'count' between 1 and {MAX_INVOCATIONS} "
+                                   f"and 'interval' positive."}, 400)
+        session = profiler.arm(callback, count, mode, interval, request.args.get('memory') == '1')
+        return _json(session.describe(), 201)
+
+    @api.route('/<session>/<file_name>')
+    def download(session, file_name):
+        if file_name not in (PSTATS_FILE, COLLAPSED_FILE, ALLOCATIONS_FILE, SESSION_FILE):
+            abort(404)
+        return send_from_directory(os.path.abspath(PROFILE_DIR), f'{session}/{file_name}', as_attachment=True)
+
+    return api
@@ -0,0 +1,184 @@
+import re
+import csv
+import numpy as np
+import pandas as pd
+
+# Names of the two column levels of a parsed yearly sheet
+COLUMN_LEVELS = ['Department', 'Level']
+
+# Departments shown in the dashboard, in sheet order
+DEPARTMENTS = [
+    'CST', 'ETC', 'EE', 'IT', 'ME', 'CE', 'MET', 'MIN', 'ARC', 'AERO', 'Geo Informatics',
+    'VLSI', 'Mat Science', 'Mechatronics', 'Food Proc.', 'REST', 'Bio-Medical',
+    'Safety', 'Physics', 'Maths', 'Chem', 'MBA', 'Earth Science'
+]
+
+# Departments that only appear in older sheets
+HISTORICAL_DEPARTMENTS = ['AM', 'ICE', 'PDSI', 'Geology', 'HSCI']
+
+# Abbreviations used for a department in some sheets. Case, spacing and punctuation differences
+# ('Bio - MedIcal', 'Foo d Proc.', 'CHEM') are matched without being listed here.
+DEPARTMENT_ALIASES = {
+    'Physics': ['Phys'],
+    'Maths': ['Mths'],
+    'Mat Science': ['Mat Engg'],
+    'Geology': ['GEOY'],
+}
+
+# Non-department columns, with the other headings they appear under
+FIELD_ALIASES = {
+    'SL': [],
+    'Date of Visit': [],
+    'Company Visited': [],
+    'Involved Branches': [],
+    'Type of Offer': [],
+    'Eligible Students': [],
+    'Applied Students': [],
+    'Status': [],
+    'Annual CTC Offered': ['CTC Offered P/A', 'Annual CTC ( As per available information )'],
+    'Total': [],
+}
+
+# Column keys of the fields the views read
+SL = ('SL', '')
+COMPANY = ('Company Visited', '')
+OFFER_TYPE = ('Type of Offer', '')
+CTC = ('Annual CTC Offered', '')
+TOTAL = ('Total', '')
+
+_FLOAT_FIELDS = {'SL', 'Eligible Students', 'Applied Students', 'Annual CTC Offered'}
+_CATEGORY_FIELDS = {'Company Visited', 'Type of Offer'}
+
+
+def clean_label(value):
+    """Returns a header cell with its whitespace collapsed, or '' for empty cells."""
+    if not isinstance(value, str):
+        return ''
+    return re.sub(r'\s+', ' ', value).strip()
+
+
+def _key(name):
+    """Matching key for a heading: lower case, letters and digits only."""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+_DEPARTMENT_KEYS = {}
+for _name in DEPARTMENTS + HISTORICAL_DEPARTMENTS:
+    for _alias in [_name] + DEPARTMENT_ALIASES.get(_name, []):
+        _DEPARTMENT_KEYS[_key(_alias)] = _name
+
+_FIELD_KEYS = {_key(alias): name for name, aliases in FIELD_ALIASES.items() for alias in [name] + aliases}
+
+
+def resolve_department(name):
+    """Returns the canonical name of a department spelling (e.g. 'Bio - MedIcal' -> 'Bio-Medical'), or None."""
+    if not isinstance(name, str):
+        return None
+    return _DEPARTMENT_KEYS.get(_key(name))
+
+
+def canonical_department(name):
+    """Like resolve_department, but returns the cleaned name itself for departments not in the registry."""
+    return resolve_department(name) or clean_label(name)
+
+
+def parse_level(value):
+    """Returns 'UG', 'PG' or 'DD' for a level header cell ('U G', 'P G', 'AM PG', 'PG (ICE)'), else ''."""
+    match = re.match(r'(?:AM)?(UG|PG|DD)', re.sub(r'\s+', '', clean_label(value)).upper())
+    return match.group(1) if match else ''
+
+
+def read_header(file_path):
+    """Returns the two header rows (names, levels) of a yearly CSV."""
+    with open(file_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        names = next(reader, [])
+        levels = next(reader, [])
+    return names, levels + [''] * (len(names) - len(levels))
+
+
+def build_columns(names, levels):
+    """
+    Maps the two header rows of a yearly sheet to column keys.
+
+    Known fields become (field, ''); columns with a UG/PG/DD level, or named after a registered
+    department, become (canonical department, level); anything else keeps its cleaned name.
+    Columns with neither a name nor a level are dropped.
+
+    Returns:
+        list: [(position, key)] for the columns to keep, in sheet order.
+    """
+    columns = []
+    seen = set()
+    for position, (name, level) in enumerate(zip(names, levels)):
+        # pandas suffixes repeated headings (CST, CST.1, ...) and names blank ones 'Unnamed: N'
+        # when it writes the converted CSV
+        name = re.sub(r'^Unnamed: \d+$|\.\d+$', '', clean_label(name))
+        level = parse_level(level)
+        field = _FIELD_KEYS.get(_key(name))
+        if field:
+            key = (field, '')
+        elif level or resolve_department(name):
+            key = (canonical_department(name), level)
+        elif name:
+            key = (name, '')
+        else:
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        columns.append((position, key))
+    return columns
+
+
+def department_columns(df):
+    """Returns {department: [column keys]} for the department columns of a parsed yearly sheet, in sheet order."""
+    departments = {}
+    for key in df.columns:
+        if key[1] or resolve_department(key[0]):
+            departments.setdefault(key[0], []).append(key)
+    return departments
+
+
+def _convert(column, key):
+    """Casts one column: counts to small integers, CTC and other measures to float32, names to categoricals."""
+    name, level = key
+    if name in _CATEGORY_FIELDS:
+        return column.astype('category')
+    if name in _FLOAT_FIELDS:
+        return pd.to_numeric(column, errors='coerce').astype(np.float32)
+    if level or name == 'Total' or resolve_department(name):
+        counts = pd.to_numeric(column, errors='coerce').fillna(0).round()
+        return pd.to_numeric(counts, downcast='integer')
+    return column
+
+
+def read_columns(file_path, columns):
+    """
+    Parses only the given columns of a yearly CSV (with the C parser; the pyarrow engine can't read
+    the line breaks inside quoted header cells).
+
+    Parameters:
+        file_path (str): Path of the yearly CSV.
+        columns (list): [(position, key)] pairs from build_columns.
+
+    Returns:
+        dict: {key: (converted column, mask of the rows where the cell is not empty)}.
+    """
+    if not columns:
+        return {}
+    positions = [position for position, _ in columns]
+    df = pd.read_csv(file_path, header=None, skiprows=2, usecols=positions, dtype=str, engine='c')
+    return {key: (_convert(df[position], key), df[position].notna().to_numpy()) for position, key in columns}
+
+
+def assemble_frame(parsed, keys):
+    """
+    Builds a sheet frame from read_columns output: the given columns, with MultiIndex column keys,
+    without the rows that are empty in every one of them.
+    """
+    if not keys:
+        return pd.DataFrame()
+    frame = pd.DataFrame({key: parsed[key][0] for key in keys})
+    frame.columns = pd.MultiIndex.from_tuples(keys, names=COLUMN_LEVELS)
+    return frame[np.logical_or.reduce([parsed[key][1] for key in keys])]
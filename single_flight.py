@@ -0,0 +1,202 @@
+import os
+import time
+import pickle
+import hashlib
+import logging
+import threading
+from functools import wraps
+from data_processing import write_atomic
+from metrics import callback_metrics
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: calls are then coalesced within a process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Folder for the lock and result files that coalesce calls across worker processes; unset coalesces
+# only the threads of each process
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR')
+
+# How long a result one process computed is handed to the other processes waiting on the same call
+SINGLE_FLIGHT_WINDOW = float(os.environ.get('SINGLE_FLIGHT_WINDOW', 10))
+
+# Result files untouched for this long are removed
+STALE_FILE_SECONDS = 3600
+
+_MISSING = object()
+
+
+class _Flight:
+    """One in-flight call: the threads that join it wait on done, then read value or error."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution: the first caller runs the function
+    and every caller that arrives while it runs waits for, and shares, its result (or exception).
+
+    With a lock_dir, the processes sharing that folder coordinate too: a call holds an flock on a file
+    named after its key while it runs, and leaves its (pickled) result next to it for window seconds, so
+    a process that was waiting on the lock takes that result instead of computing it again. Results
+    must be picklable, and keys must have the same repr() in every process. As unpickling a file can run
+    arbitrary code, results are only shared through a folder that only the current user can access, and
+    only files that user owns are read back.
+
+    Keys are tuples starting with a name (the function's), which the coalesced-call counters are
+    labelled with.
+    """
+
+    def __init__(self, lock_dir=None, window=SINGLE_FLIGHT_WINDOW):
+        self.lock_dir = lock_dir if fcntl is not None else None
+        if lock_dir and fcntl is None:
+            logger.warning("File locks are not available on this platform; calls are coalesced per process only")
+        self._share_results = bool(self.lock_dir) and _private_dir(self.lock_dir)
+        self.window = window
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._last_prune = 0.0
+
+    def _count_coalesced(self, key, scope):
+        with self._lock:
+            self.coalesced += 1
+        callback_metrics.count_coalesced(key[0], scope)
+
+    def run(self, key, func):
+        """Returns func(), computed once for all the concurrent calls with this key."""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            self._count_coalesced(key, 'thread')
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._execute(key, func)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def _execute(self, key, func):
+        if not self.lock_dir:
+            with self._lock:
+                self.executions += 1
+            return func()
+
+        name = hashlib.sha256(repr(key).encode()).hexdigest()[:24]
+        lock_path = os.path.join(self.lock_dir, f'{name}.lock')
+        with open(lock_path, 'a+') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                value = self._shared_result(name)
+                if value is not _MISSING:
+                    self._count_coalesced(key, 'process')
+                    return value
+                with self._lock:
+                    self.executions += 1
+                value = func()
+                self._share(name, value)
+                return value
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _shared_result(self, name):
+        """The result another process of this user left for this key within the window, or _MISSING."""
+        if not self._share_results:
+            return _MISSING
+        path = os.path.join(self.lock_dir, f'{name}.result')
+        try:
+            with open(os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0)), 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+                    logger.warning("Ignoring %s: not owned by this user, or writable by others", path)
+                    return _MISSING
+                if time.time() - stat.st_mtime > self.window:
+                    return _MISSING
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return _MISSING
+
+    def _share(self, name, value):
+        if not self._share_results:
+            return
+        try:
+            write_atomic(self.lock_dir, f'{name}.result', lambda path: _dump(value, path))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            logger.debug("Could not share the result of %s with other processes", name, exc_info=True)
+        now = time.time()
+        if now - self._last_prune > STALE_FILE_SECONDS / 10:
+            self._last_prune = now
+            self._prune(now)
+
+    def _prune(self, now):
+        # Only results: removing a lock file another process has open would let a third one lock a new
+        # file of the same name and run the same call concurrently
+        for entry in os.scandir(self.lock_dir):
+            try:
+                if entry.name.endswith('.result') and now - entry.stat().st_mtime > STALE_FILE_SECONDS:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """Returns the call counters: calls, executions (calls that ran the function) and coalesced calls."""
+        with self._lock:
+            return {'calls': self.calls, 'executions': self.executions, 'coalesced': self.coalesced,
+                    'in_flight': len(self._flights)}
+
+
+def _private_dir(path):
+    """Creates a folder only the current user can access, or returns False if one at path is someone else's."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid():
+        logger.warning("%s belongs to another user; results are not shared between processes", path)
+        return False
+    if stat.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return True
+
+
+def _dump(value, path):
+    with open(path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+flights = SingleFlight(SINGLE_FLIGHT_LOCK_DIR)
+
+
+def single_flight(normalize):
+    """
+    Coalesces concurrent calls of a function with the same normalized arguments (see SingleFlight).
+
+    normalize(*args) returns the key tuple for a call; it must include anything the result depends on
+    beyond the arguments, such as the data version, since a result may be shared across processes.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            return flights.run((func.__name__, *normalize(*args)), lambda: func(*args))
+
+        return wrapper
+    return decorator
@@ -0,0 +1,301 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from data_processing import write_atomic, file_digest
+from companies import ALIASES_FILE, CompanyIndex
+from schema import SL, COMPANY, CTC, TOTAL, department_columns
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_DIR = '.summaries'
+SOURCES_FILE = 'sources.json'
+PARTS_DIR = 'parts'
+
+# Bump when the summary tables or the per-CSV parts change shape or meaning, so summaries written by older
+# code are rebuilt
+SUMMARY_FORMAT = 5
+
+TABLES = ('companies', 'company_totals', 'department_packages', 'placement_percentages')
+_DTYPES = {
+    'companies': {'Year': 'int16', 'Companies': 'int32'},
+    'company_totals': {'Year': 'int16', 'Company ID': 'int32', 'Company': 'category', 'Total': 'int32'},
+    'department_packages': {'Department': 'category', 'Year': 'int16', 'Highest Package (LPA)': 'float64',
+                            'Company': 'object', 'Median Package (LPA)': 'float64', 'Offers': 'int32'},
+    'placement_percentages': {'Year': 'int16', 'Department': 'category', 'Level': 'category', 'Percentage': 'float64'},
+}
+
+
+def compute_department_packages(df):
+    """
+    Computes the highest and median package, the highest package's company and the offer count for
+    every department of one year's sheet in one vectorized pass.
+
+    A company counts towards a department when any of the department's columns records an offer (> 0).
+    Ties for the highest package go to the first company in the sheet, and a department with no
+    positive package gets a highest package of 0, no company and no median.
+
+    Parameters:
+        df (pd.DataFrame): Placement records for a single year.
+
+    Returns:
+        dict: {department: {'Highest Package (LPA)': float, 'Company': str or None,
+              'Median Package (LPA)': float (NaN if none), 'Offers': float}} for every department with
+              columns in the sheet, keyed by canonical department name.
+    """
+    if CTC not in df.columns or COMPANY not in df.columns:
+        return {}
+
+    column_map = department_columns(df)
+    departments = list(column_map)
+    if not departments:
+        return {}
+
+    # One count matrix for every department column, and a column -> department membership matrix
+    columns = [col for dept in departments for col in column_map[dept]]
+    counts = df[columns].to_numpy(dtype=float)
+    membership = np.zeros((len(columns), len(departments)), dtype=int)
+    position = 0
+    for j, dept in enumerate(departments):
+        width = len(column_map[dept])
+        membership[position:position + width, j] = 1
+        position += width
+
+    # CTC is stored as float32; round away the float32 noise so 19.63 isn't reported as 19.629999
+    ctc = df[CTC].to_numpy(dtype=float).round(4)
+    offered = ((counts > 0).astype(int) @ membership) > 0
+    valid = offered & (ctc > 0)[:, None]
+    candidates = np.where(valid, ctc[:, None], -np.inf)
+
+    best_rows = candidates.argmax(axis=0)
+    best_packages = candidates[best_rows, np.arange(len(departments))]
+    medians = np.ma.median(np.ma.array(np.broadcast_to(ctc[:, None], valid.shape), mask=~valid), axis=0)
+    medians = np.ma.filled(np.ma.atleast_1d(medians).astype(float), np.nan)
+    # Offers are summed over company rows only: the summary rows at the foot of a sheet have no 'SL'
+    company_rows = df[SL].notna().to_numpy() if SL in df.columns else slice(None)
+    offers = counts[company_rows].sum(axis=0) @ membership
+    companies = df[COMPANY].to_numpy()
+
+    index = {}
+    for j, dept in enumerate(departments):
+        found = np.isfinite(best_packages[j])
+        index[dept] = {
+            'Highest Package (LPA)': best_packages[j] if found else 0,
+            'Company': companies[best_rows[j]] if found else None,
+            'Median Package (LPA)': round(float(medians[j]), 4),
+            'Offers': offers[j],
+        }
+    return index
+
+
+def sheet_part(df):
+    """
+    The share of one year's sheet in the summary tables, as JSON-ready data that compute_summaries
+    merges: the company spellings of its company rows in sheet order ([spelling, rows, students placed]),
+    and its department packages. Kept per CSV (see read_part), so only a changed sheet is parsed again.
+    """
+    # Only company rows: the 'Total Offers' rows at the foot of a sheet have no 'SL'
+    rows = df[df[SL].notna()] if SL in df.columns else df
+    spellings = None
+    if COMPANY in df.columns:
+        names = rows[COMPANY].astype(object)
+        totals = rows[TOTAL].groupby(names).sum() if TOTAL in df.columns else {}
+        spellings = [[name, int(count), int(totals.get(name, 0))] for name, count in names.value_counts(sort=False).items()]
+    packages = [[department, float(entry['Highest Package (LPA)']), entry['Company'], entry['Median Package (LPA)'],
+                 int(entry['Offers'])] for department, entry in compute_department_packages(df).items()]
+    return {'counted': SL in df.columns, 'rows': len(rows), 'totals': TOTAL in df.columns,
+            'spellings': spellings, 'packages': packages}
+
+
+def compute_summaries(parts, percentages, companies=None):
+    """
+    Computes every summary table from the yearly sheets' parts ({year: sheet_part}) and the Overall sheet's
+    long percentage table. Company names are resolved to IDs through the given CompanyIndex (a new one
+    by default), year by year, so companies are counted and totalled per ID rather than per spelling.
+    """
+    companies = companies or CompanyIndex()
+    counts, totals, packages = [], [], []
+    for year, part in sorted(parts.items()):
+        spellings = part['spellings']
+        ids = companies.resolve_counts((name, count) for name, count, _ in spellings) if spellings is not None else None
+        if part['counted']:
+            counts.append((int(year), len(set(ids)) if ids is not None else part['rows']))
+        if ids is not None and part['totals']:
+            per_company = {}
+            for company_id, (_, _, total) in zip(ids, spellings):
+                per_company[company_id] = per_company.get(company_id, 0) + total
+            totals.extend((int(year), company_id, total) for company_id, total in sorted(per_company.items()))
+        packages.extend((department, int(year), *entry) for department, *entry in part['packages'])
+
+    # Named once every year is resolved, as a company is named after its most frequent spelling
+    totals = [(year, company_id, companies.names[company_id], total) for year, company_id, total in totals]
+    tables = {
+        'companies': pd.DataFrame(counts, columns=list(_DTYPES['companies'])),
+        'company_totals': pd.DataFrame(totals, columns=list(_DTYPES['company_totals'])),
+        'department_packages': pd.DataFrame(packages, columns=list(_DTYPES['department_packages'])),
+        'placement_percentages': percentages,
+    }
+    return {name: table.astype(_DTYPES[name]) for name, table in tables.items()}
+
+
+def source_digests(data_folder, stats):
+    """
+    Returns the content hashes ({file_name: sha256}) of the given source CSVs ({file_name: (mtime_ns, size)}).
+    They are cached by mtime and size in .summaries/sources.json, so only files that changed are read.
+    """
+    root = os.path.join(data_folder, SUMMARY_DIR)
+    try:
+        with open(os.path.join(root, SOURCES_FILE)) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+
+    sources = {}
+    for file_name, stat in sorted(stats.items()):
+        entry = cached.get(file_name)
+        if entry is None or tuple(entry[:2]) != tuple(stat):
+            entry = [*stat, file_digest(os.path.join(data_folder, file_name))]
+        sources[file_name] = entry
+
+    if sources != cached:
+        try:
+            os.makedirs(root, exist_ok=True)
+            write_atomic(root, SOURCES_FILE, lambda path: _dump_json(sources, path))
+        except OSError:
+            logger.warning("Could not cache source hashes in %s", root, exc_info=True)
+    return {file_name: entry[2] for file_name, entry in sources.items()}
+
+
+def data_version(digests):
+    """Returns the version of the summaries for source CSVs with the given content hashes."""
+    digest = hashlib.sha256(f'format {SUMMARY_FORMAT}\n'.encode())
+    for file_name, file_hash in sorted(digests.items()):
+        digest.update(f'{file_name} {file_hash}\n'.encode())
+    return digest.hexdigest()[:12]
+
+
+def source_version(data_folder, stats):
+    """Returns the version of the summaries for the given source CSVs: a hash of their contents."""
+    return data_version(source_digests(data_folder, stats))
+
+
+def _part_path(data_folder, file_hash):
+    return os.path.join(data_folder, SUMMARY_DIR, PARTS_DIR, f'{SUMMARY_FORMAT}-{file_hash}.json')
+
+
+def read_part(data_folder, file_hash):
+    """Returns the part persisted for a source CSV's contents (see write_part), or None."""
+    try:
+        with open(_part_path(data_folder, file_hash)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_part(data_folder, file_hash, part):
+    """
+    Persists what the summaries draw from one source CSV (its sheet_part, explorer labels, ...) under
+    .summaries/parts, keyed by the CSV's content hash, so the next build reads it instead of the CSV.
+    """
+    path = _part_path(data_folder, file_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(os.path.dirname(path), os.path.basename(path), lambda tmp_path: _dump_json(part, tmp_path))
+
+
+def prune_parts(data_folder, digests):
+    """Removes the parts of CSV contents that are no longer among the given sources."""
+    folder = os.path.join(data_folder, SUMMARY_DIR, PARTS_DIR)
+    keep = {os.path.basename(_part_path(data_folder, file_hash)) for file_hash in digests.values()}
+    for entry in os.listdir(folder) if os.path.isdir(folder) else []:
+        if entry not in keep and not entry.startswith('.'):  # Nor the temporary files of a write in progress
+            try:
+                os.remove(os.path.join(folder, entry))
+            except OSError:
+                pass
+
+
+def _dump_json(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def write_summaries(data_folder, version, tables):
+    """Persists the summary tables as .summaries/<version>/<table>.csv (atomically) and prunes older versions."""
+    root = os.path.join(data_folder, SUMMARY_DIR)
+    path = os.path.join(root, version)
+    os.makedirs(root, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix='.tmp-', dir=root)
+    try:
+        for name in TABLES:
+            tables[name].to_csv(os.path.join(tmp_path, f'{name}.csv'), index=False)
+        os.chmod(tmp_path, 0o755)
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.isdir(path):  # Another worker may have won the race to write it
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    for entry in os.listdir(root):
+        if entry not in (version, SOURCES_FILE, ALIASES_FILE, PARTS_DIR) and not entry.startswith('.tmp-'):
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+def read_summaries(data_folder, version):
+    """Loads the summary tables of a version, or returns None if they haven't been written."""
+    path = os.path.join(data_folder, SUMMARY_DIR, version)
+    if not os.path.isdir(path):
+        return None
+    tables = {}
+    for name in TABLES:
+        dtypes = _DTYPES[name]
+        # Read text columns as strings and treat only empty cells as missing, so company names like
+        # 'NA' survive; an empty Level is the overall percentage's level, not a missing one
+        text = {column: str for column, dtype in dtypes.items() if dtype in ('object', 'category')}
+        missing = {column: [''] for column in dtypes if column != 'Level'}
+        table = pd.read_csv(os.path.join(path, f'{name}.csv'), dtype=text, keep_default_na=False, na_values=missing)
+        tables[name] = table.astype(dtypes)
+    return tables
+
+
+class PlacementSummaries:
+    """
+    The summary tables of one data version, which every dashboard view draws from:
+
+        companies              Year, Companies (distinct company IDs among the sheet's company rows)
+        company_totals         Year, Company ID, Company, Total (students placed, summed over every row
+                               and spelling of a company)
+        department_packages    Department, Year, Highest Package (LPA), Company, Median Package (LPA), Offers
+        placement_percentages  Year, Department, Level, Percentage (from the Overall sheet)
+    """
+
+    def __init__(self, tables):
+        for name in TABLES:
+            setattr(self, name, tables[name])
+        self._packages = {}
+        for row in self.department_packages.itertuples(index=False):
+            self._packages.setdefault(row[0], {})[str(row[1])] = {
+                'Highest Package (LPA)': row[2],
+                'Company': row[3] if isinstance(row[3], str) else None,
+                'Median Package (LPA)': None if pd.isna(row[4]) else row[4],
+                'Offers': row[5],
+            }
+
+    def companies_per_year(self):
+        """Returns {year: number of companies}, in ascending year order."""
+        return {str(year): int(count) for year, count in sorted(zip(self.companies['Year'], self.companies['Companies']))}
+
+    def company_totals_for(self, year):
+        """Returns a Series of students placed per company in a year (empty if there is no record for it)."""
+        rows = self.company_totals[self.company_totals['Year'] == int(year)]
+        return pd.Series(rows['Total'].to_numpy(), index=rows['Company'].astype(object).to_numpy(), name='Total')
+
+    def packages_for(self, department):
+        """Returns {year: {'Highest Package (LPA)', 'Company', 'Median Package (LPA)', 'Offers'}} for a canonical department."""
+        return self._packages.get(department, {})
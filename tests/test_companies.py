@@ -0,0 +1,76 @@
+import pytest
+from companies import ALIASES_FILE, CompanyIndex, display_name
+
+
+def resolve(*names):
+    companies = CompanyIndex()
+    return [companies.resolve(name) for name in names]
+
+
+@pytest.mark.parametrize('names', [
+    ('TCS', 'TCS Ninja (Through NQT)', 'TCS Digital', 'TCS R & I (B. Tech)', 'TCS R&I CTO'),
+    ('Tata Consultancy Services', 'TCS', 'Tata Consultancy Services (Ninja)'),
+    ('Wipro', 'Wipro Ltd.', 'Wipro Ltd'),
+    ('M.N.Dastur', 'MN Dastur', 'M.N. Dastur & Co. Ltd.'),
+    ('Cambium Networks', 'Cambium Networtks'),
+    ('Reve System', 'Reve Systems'),
+])
+def test_spellings_of_one_company_share_an_id(names):
+    assert len(set(resolve(*names))) == 1
+
+
+@pytest.mark.parametrize('names', [
+    ('Tata Steel', 'Tata Steel BSL Ltd.'),
+    ('Reve System', 'Reve Solution'),
+    ('IndianOil', 'IndianOil Petronas Pvt. Ltd.'),
+    ('Volvo Eicher Commercial Vehicles', 'Volvo Group India Pvt. Ltd.'),
+    ('L&T Ltd.', 'L&T Technology Services'),
+    ('L&T Ltd.', 'L&T Infra'),
+])
+def test_different_companies_stay_apart(names):
+    assert len(set(resolve(*names))) == 2
+    assert len(set(resolve(*reversed(names)))) == 2
+
+
+def test_listed_short_form_seen_first_is_named_after_the_company():
+    companies = CompanyIndex()
+    maruti = companies.resolve('Maruti')
+    assert companies.resolve('Maruti Suzuki India Ltd. (M.Tech)') == maruti
+    assert companies.names[maruti] == 'Maruti Suzuki India Ltd.'
+
+
+def test_company_is_named_after_its_most_frequent_spelling_without_qualifiers():
+    companies = CompanyIndex()
+    ids = companies.resolve_all(['TCS Ninja (Through NQT)', 'TCS', 'TCS Digital', 'TCS Ninja', 'TCS'])
+    assert len(set(ids)) == 1
+    assert companies.names[ids[0]] == 'TCS'
+
+
+def test_resolve_counts_matches_resolve_all():
+    names = ['Infosys', 'Infosys (DSE)', 'Wipro Ltd.', 'Wipro', 'Wipro', None]
+    by_rows = CompanyIndex()
+    ids = by_rows.resolve_all(names)
+    by_counts = CompanyIndex()
+    counts = [('Infosys', 1), ('Infosys (DSE)', 1), ('Wipro Ltd.', 1), ('Wipro', 2)]
+    assert by_counts.resolve_counts(counts) == [ids[0], ids[1], ids[2], ids[3]]
+    assert ids[-1] == -1
+    assert by_counts.names == by_rows.names
+
+
+def test_alias_table_round_trip_keeps_ids_and_corrections(tmp_path):
+    companies = CompanyIndex()
+    tega = companies.resolve('Tega Industries Ltd.')
+    companies.save(tmp_path)
+    # A misspelling added by hand, with its correction
+    with open(tmp_path / ALIASES_FILE, 'a') as f:
+        f.write(f'Tega Industriws Ltd.,{tega},Tega Industries Ltd.,Tega Industries Ltd.\n')
+
+    loaded = CompanyIndex.load(tmp_path)
+    ids = loaded.resolve_all(['Tega Industriws Ltd.', 'Tega Industriws Ltd.', 'Tega Industries'])
+    assert set(ids) == {tega}
+    assert loaded.names[tega] == 'Tega Industries Ltd.'
+
+
+def test_display_name_drops_qualifiers_and_numbers():
+    assert display_name('TCS Ninja (Through NQT)') == 'TCS Ninja'
+    assert display_name('Dynamic Digital 6') == 'Dynamic Digital'
@@ -0,0 +1,73 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from ctc_distributions import BANDS, PERCENTILES, compute_ctc_distributions
+from companies import CompanyIndex
+from placement_facts import CTC_BUCKETS, build_fact_table
+from placement_store import get_store
+from tests.test_summaries import DATA_FOLDER
+
+
+def fact_table(rows):
+    table = pd.DataFrame(rows, columns=['Department', 'Year', 'CTC', 'Offers'])
+    return table.astype({'Department': 'category', 'Year': 'int16', 'CTC': 'float32', 'Offers': 'int32'})
+
+
+def expected_distributions(table):
+    """Lists every offer separately, one (department, year) at a time, and reads the percentiles off the list."""
+    rows = []
+    known = table[table['CTC'].notna() & (table['Offers'] > 0) & table['Department'].notna()]
+    for (department, year), cell in known.groupby(['Department', 'Year'], observed=True):
+        listed = np.sort(np.repeat(cell['CTC'].to_numpy(), cell['Offers'].to_numpy()))
+        row = {'Department': department, 'Year': year, 'Offers': len(listed), 'Min': listed[0], 'Max': listed[-1]}
+        for name, fraction in PERCENTILES.items():
+            row[name] = listed[math.ceil(fraction * len(listed)) - 1]
+        for label, lower, upper in CTC_BUCKETS:
+            row[label] = int(((listed >= lower) & (listed < upper)).sum())
+        rows.append(row)
+    return rows
+
+
+def assert_matches(table):
+    actual = compute_ctc_distributions(table).to_dict('records')
+    expected = expected_distributions(table)
+    assert len(actual) == len(expected)
+    for row, reference in zip(actual, sorted(expected, key=lambda row: (row['Department'], row['Year']))):
+        for column in ['Department', 'Year', 'Offers', 'Min', *PERCENTILES, 'Max', *BANDS]:
+            assert row[column] == reference[column], (row['Department'], row['Year'], column)
+
+
+def test_percentiles_are_weighted_by_offers():
+    # One company hiring ten at 30 LPA outweighs three hiring one each at 5 LPA
+    table = fact_table([('CST', 2024, 5, 1), ('CST', 2024, 5, 1), ('CST', 2024, 5, 1), ('CST', 2024, 30, 10)])
+    row = compute_ctc_distributions(table).iloc[0]
+    assert row['Offers'] == 13
+    assert row['Min'] == 5 and row['P25'] == 30 and row['Median'] == 30 and row['Max'] == 30
+    assert row['< 5 LPA'] == 0 and row['5-10 LPA'] == 3 and row['30+ LPA'] == 10
+
+
+def test_offers_without_a_ctc_or_department_are_left_out():
+    table = fact_table([('CST', 2023, 8, 2), ('CST', 2023, np.nan, 5), ('CST', 2023, 40, 0), (None, 2023, 12, 3),
+                        ('ETC', 2023, 12, 1), ('ETC', 2024, 4.5, 1)])
+    assert_matches(table)
+    distributions = compute_ctc_distributions(table)
+    assert distributions[['Department', 'Year', 'Offers']].values.tolist() == [['CST', 2023, 2], ['ETC', 2023, 1],
+                                                                                ['ETC', 2024, 1]]
+
+
+def test_no_known_ctc_gives_an_empty_table():
+    distributions = compute_ctc_distributions(fact_table([('CST', 2024, np.nan, 3)]))
+    assert distributions.empty
+    assert list(distributions.columns) == ['Department', 'Year', 'Offers', 'Min', *PERCENTILES, 'Max', *BANDS]
+
+
+def test_percentiles_match_the_listed_offers_on_random_cells():
+    rng = np.random.default_rng(7)
+    rows = [(rng.choice(['CST', 'ETC', 'EE']), int(rng.integers(2018, 2025)), float(rng.integers(300, 4000)) / 100,
+             int(rng.integers(0, 6))) for _ in range(500)]
+    assert_matches(fact_table(rows))
+
+
+def test_percentiles_match_the_listed_offers_on_the_data():
+    assert_matches(build_fact_table(get_store(DATA_FOLDER).snapshot(), CompanyIndex()))
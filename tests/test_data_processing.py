@@ -0,0 +1,76 @@
+import os
+import pandas as pd
+import pytest
+from data_processing import MANIFEST_FILE, file_digest, load_manifest, sync_xlsx_to_csv
+from tests.test_summaries import DATA_FOLDER
+
+
+def write_workbook(folder, year, rows=20):
+    records = pd.read_csv(os.path.join(DATA_FOLDER, f'Placement-Record-{year}.csv')).head(rows)
+    path = folder / f'Placement-Record-{year}.xlsx'
+    records.to_excel(path, index=False)
+    return path
+
+
+@pytest.fixture
+def folder(tmp_path):
+    write_workbook(tmp_path, 2022)
+    write_workbook(tmp_path, 2023)
+    assert sorted(sync_xlsx_to_csv(str(tmp_path), max_workers=1)) == ['Placement-Record-2022.xlsx',
+                                                                       'Placement-Record-2023.xlsx']
+    return tmp_path
+
+
+def test_first_run_converts_and_records_every_workbook(folder):
+    manifest = load_manifest(str(folder))
+    assert sorted(manifest) == ['Placement-Record-2022.xlsx', 'Placement-Record-2023.xlsx']
+    for year in [2022, 2023]:
+        workbook = folder / f'Placement-Record-{year}.xlsx'
+        entry = manifest[workbook.name]
+        stat = os.stat(workbook)
+        assert entry == {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_digest(workbook),
+                         'csv': f'Placement-Record-{year}.csv'}
+        assert len(pd.read_csv(folder / entry['csv'])) == 20
+
+
+def test_second_run_converts_nothing(folder):
+    manifest = (folder / MANIFEST_FILE).read_text()
+    assert sync_xlsx_to_csv(str(folder), max_workers=1) == []
+    assert (folder / MANIFEST_FILE).read_text() == manifest
+
+
+def test_deleted_csv_is_converted_again(folder):
+    os.remove(folder / 'Placement-Record-2022.csv')
+    assert sync_xlsx_to_csv(str(folder), max_workers=1) == ['Placement-Record-2022.xlsx']
+    assert len(pd.read_csv(folder / 'Placement-Record-2022.csv')) == 20
+
+
+def test_touched_workbook_is_not_converted_again(folder):
+    workbook = folder / 'Placement-Record-2023.xlsx'
+    csv_mtime = os.stat(folder / 'Placement-Record-2023.csv').st_mtime_ns
+    later = os.stat(workbook).st_mtime + 60
+    os.utime(workbook, (later, later))
+    assert sync_xlsx_to_csv(str(folder), max_workers=1) == []
+    assert os.stat(folder / 'Placement-Record-2023.csv').st_mtime_ns == csv_mtime
+    # The new mtime is recorded, so the next run skips hashing the workbook
+    assert load_manifest(str(folder))[workbook.name]['mtime_ns'] == os.stat(workbook).st_mtime_ns
+
+
+def test_changed_workbook_is_converted_again(folder):
+    write_workbook(folder, 2023, rows=10)
+    assert sync_xlsx_to_csv(str(folder), max_workers=1) == ['Placement-Record-2023.xlsx']
+    assert len(pd.read_csv(folder / 'Placement-Record-2023.csv')) == 10
+    assert load_manifest(str(folder))['Placement-Record-2023.xlsx']['sha256'] == file_digest(
+        folder / 'Placement-Record-2023.xlsx')
+
+
+def test_removed_workbook_leaves_the_manifest(folder):
+    os.remove(folder / 'Placement-Record-2022.xlsx')
+    assert sync_xlsx_to_csv(str(folder), max_workers=1) == []
+    assert sorted(load_manifest(str(folder))) == ['Placement-Record-2023.xlsx']
+
+
+def test_unreadable_manifest_converts_everything_again(folder):
+    (folder / MANIFEST_FILE).write_text('{not json')
+    assert sorted(sync_xlsx_to_csv(str(folder), max_workers=1)) == ['Placement-Record-2022.xlsx',
+                                                                     'Placement-Record-2023.xlsx']
@@ -0,0 +1,119 @@
+import gzip
+import json
+import pytest
+from flask import Flask, jsonify
+import http_cache
+from http_cache import MIN_COMPRESS_BYTES, code_fingerprint, enable_compression, enable_conditional
+
+LARGE = {'rows': [{'Company': 'Company %d' % i, 'CTC': i} for i in range(100)]}
+
+
+@pytest.fixture
+def version():
+    return {'tag': 'data-1'}
+
+
+@pytest.fixture
+def client(version, monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    server = Flask(__name__)
+    calls = server.config['CALLS'] = []
+
+    @server.route('/layout')
+    def layout():
+        calls.append('layout')
+        return jsonify(LARGE)
+
+    @server.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @server.route('/image')
+    def image():
+        return server.response_class(b'\0' * 2 * MIN_COMPRESS_BYTES, mimetype='image/png')
+
+    # Same order as app.py, so the conditional ETag is set before compression weakens it
+    enable_compression(server)
+    enable_conditional(server, {'/layout'}, lambda: version['tag'])
+    return server.test_client()
+
+
+def test_conditional_path_gets_an_etag_and_no_cache(client):
+    response = client.get('/layout')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag, weak = response.get_etag()
+    assert etag and not weak
+    assert 'ETag' not in client.get('/small').headers
+
+
+def test_matching_if_none_match_answers_304_without_running_the_view(client):
+    etag = client.get('/layout').headers['ETag']
+    calls = client.application.config['CALLS']
+    response = client.get('/layout', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert calls == ['layout']
+
+
+def test_a_new_version_changes_the_etag(client, version):
+    etag = client.get('/layout').headers['ETag']
+    version['tag'] = 'data-2'
+    response = client.get('/layout', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_weak_etag_from_a_compressed_response_still_matches(client):
+    etag = client.get('/layout', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert etag.startswith('W/')
+    assert client.get('/layout', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_gzip_when_accepted(client):
+    response = client.get('/layout', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == LARGE
+
+
+def test_identity_when_gzip_is_not_accepted(client):
+    for headers in [{}, {'Accept-Encoding': 'identity'}, {'Accept-Encoding': 'br'}]:
+        response = client.get('/layout', headers=headers)
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(response.data) == LARGE
+
+
+def test_small_and_binary_bodies_are_not_compressed(client):
+    small = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert small.get_json() == {'ok': True}
+    image = client.get('/image', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in image.headers
+    assert 'Vary' not in image.headers
+
+
+def test_brotli_preferred_when_installed(client, monkeypatch):
+    brotli = pytest.importorskip('brotli')
+    monkeypatch.setattr(http_cache, 'brotli', brotli)
+    response = client.get('/layout', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data)) == LARGE
+
+
+def test_code_fingerprint_covers_only_the_listed_files(tmp_path):
+    (tmp_path / 'app.py').write_text('app = 1\n')
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'assets' / 'style.css').write_text('body {}\n')
+    (tmp_path / 'notes.py').write_text('x = 1\n')
+    fingerprint = code_fingerprint(str(tmp_path), ['app.py', 'assets'])
+
+    (tmp_path / 'notes.py').write_text('x = 2\n')
+    (tmp_path / 'assets' / 'logo.png').write_bytes(b'png')
+    assert code_fingerprint(str(tmp_path), ['app.py', 'assets']) == fingerprint
+
+    (tmp_path / 'assets' / 'style.css').write_text('body { margin: 0 }\n')
+    assert code_fingerprint(str(tmp_path), ['app.py', 'assets']) != fingerprint
@@ -0,0 +1,160 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+import multiprocessing
+import pytest
+from single_flight import SingleFlight, fcntl
+
+needs_flock = pytest.mark.skipif(fcntl is None, reason="File locks are not available on this platform")
+
+
+def run_in_threads(flights, key, func, count):
+    """Starts count threads calling flights.run(key, func); returns them and their results (or exceptions)."""
+    results = [None] * count
+
+    def call(index):
+        try:
+            results[index] = flights.run(key, func)
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def test_concurrent_threads_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(10)
+        return {'value': 42}
+
+    threads, results = run_in_threads(flights, ('compute', 1), compute, 8)
+    wait_for(lambda: flights.stats()['calls'] == 8)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert flights.stats() == {'calls': 8, 'executions': 1, 'coalesced': 7, 'in_flight': 0}
+    assert all(result is results[0] for result in results)
+
+
+def test_concurrent_threads_share_the_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(10)
+        raise ValueError("no data")
+
+    threads, results = run_in_threads(flights, ('fail',), fail, 4)
+    wait_for(lambda: flights.stats()['calls'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert flights.stats()['executions'] == 1
+    assert all(isinstance(result, ValueError) and result is results[0] for result in results)
+
+
+def test_different_keys_and_later_calls_run_again():
+    flights = SingleFlight()
+    assert flights.run(('square', 2), lambda: 4) == 4
+    assert flights.run(('square', 3), lambda: 9) == 9
+    assert flights.run(('square', 2), lambda: 4) == 4
+    assert flights.stats()['executions'] == 3
+
+
+def compute_in_process(lock_dir, log_path, barrier):
+    flights = SingleFlight(lock_dir)
+    barrier.wait()
+
+    def compute():
+        with open(log_path, 'a') as log:
+            log.write(f'{os.getpid()}\n')
+        time.sleep(0.5)
+        return [1, 2, 3]
+
+    assert flights.run(('compute_in_process', 'year'), compute) == [1, 2, 3]
+
+
+@needs_flock
+def test_concurrent_processes_share_one_execution(tmp_path):
+    lock_dir = str(tmp_path / 'flights')
+    log_path = str(tmp_path / 'executions.log')
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(4)
+    processes = [context.Process(target=compute_in_process, args=(lock_dir, log_path, barrier)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    assert [process.exitcode for process in processes] == [0] * 4
+    with open(log_path) as log:
+        assert len(log.read().split()) == 1
+    assert os.stat(lock_dir).st_mode & 0o777 == 0o700
+
+
+@needs_flock
+def test_result_is_handed_to_another_process_within_the_window(tmp_path):
+    lock_dir = str(tmp_path / 'flights')
+    SingleFlight(lock_dir).run(('report', 2024), lambda: 'first')
+
+    # A second instance stands in for another worker process sharing the folder
+    other = SingleFlight(lock_dir)
+    assert other.run(('report', 2024), lambda: 'second') == 'first'
+    assert other.stats()['executions'] == 0 and other.stats()['coalesced'] == 1
+
+    expired = SingleFlight(lock_dir, window=0)
+    time.sleep(0.01)
+    assert expired.run(('report', 2024), lambda: 'third') == 'third'
+
+
+@needs_flock
+def test_untrusted_result_files_are_ignored(tmp_path):
+    lock_dir = tmp_path / 'flights'
+    flights = SingleFlight(str(lock_dir))
+    key = ('report', 2024)
+    name = hashlib.sha256(repr(key).encode()).hexdigest()[:24]
+    planted = lock_dir / f'{name}.result'
+    planted.write_bytes(pickle.dumps('planted'))
+    os.chmod(planted, 0o666)
+    assert flights.run(key, lambda: 'computed') == 'computed'
+
+    # Nor is a symlink to a result followed
+    target = tmp_path / 'elsewhere.result'
+    target.write_bytes(pickle.dumps('planted'))
+    os.remove(planted)
+    os.symlink(target, planted)
+    assert SingleFlight(str(lock_dir)).run(key, lambda: 'computed') == 'computed'
+
+
+@needs_flock
+def test_lock_dir_is_made_private(tmp_path):
+    lock_dir = tmp_path / 'flights'
+    lock_dir.mkdir(mode=0o777)
+    os.chmod(lock_dir, 0o777)
+    SingleFlight(str(lock_dir))
+    assert os.stat(lock_dir).st_mode & 0o777 == 0o700
+
+
+@needs_flock
+def test_prune_removes_only_stale_results(tmp_path):
+    lock_dir = tmp_path / 'flights'
+    flights = SingleFlight(str(lock_dir))
+    flights.run(('report', 2024), lambda: 'value')
+    stale = time.time() - 2 * 3600
+    for path in lock_dir.iterdir():
+        os.utime(path, (stale, stale))
+    flights._prune(time.time())
+    assert [path.suffix for path in lock_dir.iterdir()] == ['.lock']
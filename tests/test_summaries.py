@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from placement_store import YearlySheet, scan_sources, _yearly_files
+from schema import SL, COMPANY, CTC, COLUMN_LEVELS, department_columns
+from summaries import compute_department_packages
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def baseline_packages(df):
+    """The row-by-row loop compute_department_packages replaces, one department at a time."""
+    result = {}
+    if CTC not in df.columns or COMPANY not in df.columns:
+        return result
+    records = df.to_dict('records')
+    for department, columns in department_columns(df).items():
+        highest, company, packages, offers = 0, None, [], 0
+        for record in records:
+            ctc = round(float(record[CTC]), 4) if pd.notna(record[CTC]) else np.nan
+            if any(record[column] > 0 for column in columns) and ctc > 0:
+                packages.append(ctc)
+                if ctc > highest:
+                    highest, company = ctc, record[COMPANY]
+            if SL not in df.columns or pd.notna(record[SL]):
+                offers += sum(record[column] for column in columns)
+        result[department] = {'Highest Package (LPA)': highest, 'Company': company,
+                              'Median Package (LPA)': round(float(np.median(packages)), 4) if packages else np.nan,
+                              'Offers': offers}
+    return result
+
+
+def assert_same_packages(df):
+    expected = baseline_packages(df)
+    actual = compute_department_packages(df)
+    assert list(actual) == list(expected)
+    for department, entry in expected.items():
+        assert actual[department]['Highest Package (LPA)'] == entry['Highest Package (LPA)'], department
+        assert actual[department]['Company'] == entry['Company'], department
+        assert actual[department]['Median Package (LPA)'] == pytest.approx(entry['Median Package (LPA)'],
+                                                                           nan_ok=True), department
+        assert actual[department]['Offers'] == entry['Offers'], department
+
+
+def sheet(rows):
+    keys = [SL, COMPANY, CTC, ('CST', 'UG'), ('CST', 'PG'), ('ETC', 'UG'), ('ME', 'UG')]
+    df = pd.DataFrame(rows, columns=pd.MultiIndex.from_tuples(keys, names=COLUMN_LEVELS))
+    return df.astype({CTC: np.float32})
+
+
+def test_packages_match_the_loop_on_edge_cases():
+    assert_same_packages(sheet([
+        [1, 'Alpha', 12.5, 2, 0, 0, 0],
+        [2, 'Beta', 12.5, 0, 1, 3, 0],       # Ties with Alpha for CST: the first company keeps it
+        [3, 'Gamma', np.nan, 4, 0, 1, 0],    # No CTC: counts as offers, not as a package
+        [4, 'Delta', 0, 0, 0, 2, 0],         # A CTC of 0 isn't a package
+        [5, 'Epsilon', 19.63, 0, 0, 1, 0],   # Stored as float32, reported as 19.63
+        [np.nan, 'Total Offers', 50, 6, 1, 7, 0],  # The foot of the sheet: a package, but no offers
+    ]))
+
+
+def test_department_without_offers_has_no_company_or_median():
+    packages = compute_department_packages(sheet([[1, 'Alpha', 10, 1, 0, 0, 0]]))
+    assert packages['ME']['Highest Package (LPA)'] == 0
+    assert packages['ME']['Company'] is None
+    assert np.isnan(packages['ME']['Median Package (LPA)'])
+    assert packages['ME']['Offers'] == 0
+
+
+def test_sheet_without_ctc_or_company_has_no_packages():
+    df = sheet([[1, 'Alpha', 10, 1, 0, 0, 0]])
+    assert compute_department_packages(df.drop(columns=[CTC])) == {}
+    assert compute_department_packages(df.drop(columns=[COMPANY])) == {}
+
+
+@pytest.mark.parametrize('file_name', [file_name for _, file_name in _yearly_files(scan_sources(DATA_FOLDER))])
+def test_packages_match_the_loop_on_every_sheet(file_name):
+    assert_same_packages(YearlySheet(os.path.join(DATA_FOLDER, file_name)).frame())
@@ -0,0 +1,91 @@
+import os
+import json
+import logging
+from data_processing import write_atomic
+from placement_store import get_store
+from summaries import SUMMARY_DIR
+
+logger = logging.getLogger(__name__)
+
+TREND_MATRIX_FILE = 'trend_matrix.json'
+
+# Metrics of the department trend heatmap: name -> department_packages column, or None for the Overall
+# sheet's placement percentage
+METRICS = {
+    'Highest CTC (LPA)': 'Highest Package (LPA)',
+    'Median CTC (LPA)': 'Median Package (LPA)',
+    'Placement Percentage': None,
+}
+
+
+def build_trend_matrix(snapshot, departments, years, progress=None):
+    """
+    Builds the department x year matrix of every metric in METRICS from the summary tables, one
+    department's row at a time, calling progress(done, total) after each.
+
+    Returns:
+        dict: {'version', 'departments', 'years', 'metrics': {metric: [[value or None per year] per department]}},
+              JSON-serializable. A cell with no data (or a highest CTC of 0, i.e. none recorded) is None.
+    """
+    columns = {int(year): j for j, year in enumerate(years)}
+    packages = snapshot.summaries.department_packages
+    package_years = packages['Year'].to_numpy()
+    package_values = {metric: packages[column].to_numpy() for metric, column in METRICS.items() if column is not None}
+    positions = {}  # Department -> its rows in department_packages
+    for position, department in enumerate(packages['Department']):
+        positions.setdefault(department, []).append(position)
+    percentages = snapshot.placement_percentages
+
+    result = {'version': snapshot.version, 'departments': list(departments), 'years': [str(year) for year in years],
+              'metrics': {metric: [] for metric in METRICS}}
+    for i, department in enumerate(departments):
+        for metric, column in METRICS.items():
+            row = [None] * len(years)
+            if column is None:
+                for year, value in percentages.trend(department).items():
+                    if year in columns and value == value:
+                        row[columns[year]] = round(value, 2)
+            else:
+                values = package_values[metric]
+                for position in positions.get(department, ()):
+                    j = columns.get(int(package_years[position]))
+                    if j is not None and values[position] > 0:
+                        row[j] = round(float(values[position]), 2)
+            result['metrics'][metric].append(row)
+        if progress is not None:
+            progress(i + 1, len(departments))
+    return result
+
+
+def load_trend_matrix(data_folder, departments, years, progress=None):
+    """
+    Returns the department trend matrix of the current data version: from memory, from the copy
+    persisted next to the version's summary tables, or built (and persisted) with build_trend_matrix.
+    """
+    snapshot = get_store(data_folder).snapshot()
+    key = ('trend_matrix', tuple(departments), tuple(str(year) for year in years))
+    folder = os.path.join(data_folder, SUMMARY_DIR, snapshot.version or '')
+
+    def build(snap):
+        try:
+            with open(os.path.join(folder, TREND_MATRIX_FILE)) as f:
+                matrix = json.load(f)
+            if matrix['departments'] == list(departments) and matrix['years'] == [str(year) for year in years]:
+                return matrix
+        except (OSError, ValueError, KeyError):
+            pass
+
+        matrix = build_trend_matrix(snap, departments, years, progress)
+        if os.path.isdir(folder):  # The version's summaries were persisted (the data folder is writable)
+            try:
+                write_atomic(folder, TREND_MATRIX_FILE, lambda path: _dump(matrix, path))
+            except OSError:
+                logger.warning("Could not persist the trend matrix in %s", folder, exc_info=True)
+        return matrix
+
+    return snapshot.derived(key, build)
+
+
+def _dump(matrix, path):
+    with open(path, 'w') as f:
+        json.dump(matrix, f)
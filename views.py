@@ -0,0 +1,49 @@
+import re
+from itertools import combinations
+from schema import DEPARTMENTS
+
+# The options the dashboard's dropdowns offer; the pre-renderer enumerates every view they can select
+YEAR_OPTIONS = [str(year) for year in range(2015, 2025)]
+RECENT_YEAR_OPTIONS = [str(year) for year in range(2020, 2025)]
+TOP_K_OPTIONS = [10, 25, 50, 0]  # 0 shows every company
+DEPARTMENT_OPTIONS = DEPARTMENTS
+PLACEMENT_DEPARTMENT_OPTIONS = DEPARTMENTS + ['']  # '' is Overall
+EXPLORER_GROUP_OPTIONS = ['Year', 'Department', 'Offer Type', 'CTC Bucket', 'Status', 'Company']
+
+
+def slug(value):
+    """A file-name-safe form of a department: 'Food Proc.' -> 'food-proc', '' -> 'overall'."""
+    return re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-') or 'overall'
+
+
+# Paths of pre-rendered views, relative to a version's folder. placements_clientside.js builds the same
+# paths in static mode, so keep the two in step.
+
+def yearly_path(year1, year2):
+    return 'yearly/{}-{}.json'.format(*sorted([str(year1), str(year2)]))
+
+
+def department_path(department, years):
+    return f"department/{slug(department)}/{'-'.join(sorted({str(year) for year in years})) or 'none'}.json"
+
+
+def placement_path(year, department):
+    return f'placement/{year}/{slug(department or "")}.json'
+
+
+def static_views():
+    """
+    Every (view name, arguments, path) the dashboard's dropdowns can select in the views that are
+    pre-rendered: year pairs (in either order, so each unordered pair once), a department with any
+    subset of the recent years, and a placement year with a department or Overall.
+    """
+    views = [('yearly', (year1, year2), yearly_path(year1, year2))
+             for year1, year2 in combinations(YEAR_OPTIONS, 2)]
+    views += [('yearly', (year, year), yearly_path(year, year)) for year in YEAR_OPTIONS]
+    views += [('department', (department, list(years)), department_path(department, years))
+              for department in DEPARTMENT_OPTIONS
+              for size in range(len(RECENT_YEAR_OPTIONS) + 1)
+              for years in combinations(RECENT_YEAR_OPTIONS, size)]
+    views += [('placement', (year, department), placement_path(year, department))
+              for year in RECENT_YEAR_OPTIONS for department in PLACEMENT_DEPARTMENT_OPTIONS]
+    return views